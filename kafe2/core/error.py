@@ -7,6 +7,11 @@ import numpy as np
 import six
 import warnings
 
+from scipy import linalg, sparse
+from scipy.sparse.linalg import LinearOperator, splu
+
+from ..tools import read_only_view
+
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,28 +35,132 @@ def cov_mat_from_float_list(value_list, correlation=0.0):
     else:
         _mat = np.diag(_vals**2 * (1.0 - correlation))
         _mat += np.outer(_vals, _vals) * correlation
-    return CovMat(_mat)
+    return CovMat(_mat, check_symmetry=False)
+
+
+def add_cov_mats(*cov_mats):
+    """
+    Add up covariance matrices. The result is a sparse matrix if all summands are sparse, and a
+    dense :py:obj:`numpy.ndarray` otherwise.
+    """
+    _sum = cov_mats[0]
+    for _cov_mat in cov_mats[1:]:
+        _sum = _sum + _cov_mat
+    if sparse.issparse(_sum):
+        return _sum
+    return np.asarray(_sum)
+
+
+def _diagonal(matrix):
+    """Diagonal of a dense or sparse matrix."""
+    if sparse.issparse(matrix):
+        return matrix.diagonal()
+    return np.diag(matrix)
+
+
+def _scale_sparse(matrix, scale):
+    """Calculate ``D * matrix * D`` for a sparse matrix, where ``D`` is the diagonal matrix of ``scale``."""
+    _d = sparse.diags(np.asarray(scale, dtype=float))
+    return sparse.csc_matrix(_d.dot(matrix).dot(_d))
+
+
+def _scale_rows(array, scale):
+    """Multiply the rows of a vector or matrix with ``scale``."""
+    return (np.asarray(array).T * scale).T
+
+
+def _scale_inverse(inverse, scale):
+    """Calculate the inverse of ``D * V * D`` from the inverse of ``V``, where ``D`` is the diagonal
+    matrix of ``scale``."""
+    if inverse is None:
+        return None
+    _inv_scale = 1.0 / scale
+    if isinstance(inverse, CovMatInverseOperator):
+        return CovMatInverseOperator(
+            lambda b: _scale_rows(inverse.dot(_scale_rows(b, _inv_scale)), _inv_scale), len(scale))
+    return inverse * np.outer(_inv_scale, _inv_scale)
+
+
+def _scale_cholesky(chol, scale):
+    """Calculate the Cholesky factor of ``D * V * D`` from the Cholesky factor ``L`` of ``V``, where ``D``
+    is the diagonal matrix of ``scale``. The columns of ``D * L`` are multiplied with the signs of
+    ``scale`` to keep the diagonal positive."""
+    if chol is None:
+        return None
+    _sign = np.sign(scale)
+    if sparse.issparse(chol):
+        return sparse.csc_matrix(sparse.diags(scale).dot(chol).dot(sparse.diags(_sign)))
+    return chol * np.outer(scale, _sign)
+
+
+class CovMatInverseOperator(LinearOperator):
+    """
+    Inverse of a sparse or block-structured covariance matrix. Such an inverse is dense in general, so it
+    is not calculated explicitly. Instead, products with vectors or matrices are obtained by solving the
+    corresponding linear system with a factorization of the covariance matrix.
+    """
+    def __init__(self, solve, size):
+        super(CovMatInverseOperator, self).__init__(dtype=np.dtype(float), shape=(size, size))
+        self._solve = solve
+
+    def _matvec(self, x):
+        return self._solve(np.asarray(x, dtype=float))
+
+    def _matmat(self, x):
+        return self._solve(np.asarray(x, dtype=float))
+
+    def _adjoint(self):
+        return self  # covariance matrices are symmetric
+
+    def toarray(self):
+        """Calculate the inverse as a dense :py:obj:`numpy.ndarray`."""
+        return self._solve(np.eye(self.shape[0]))
 
 
 # Data structure for Covariance Matrices
 class CovMat(object):
-    def __init__(self, matrix):
-        self.mat = matrix
+    """
+    Covariance matrix and derived quantities (inverse, Cholesky decomposition, correlation matrix).
+
+    The matrix can be either a dense array or a :py:mod:`scipy.sparse` matrix. Sparse matrices are kept
+    sparse: the inverse is then represented by a :py:class:`CovMatInverseOperator` which uses a banded
+    Cholesky decomposition for matrices with a narrow band of non-zero entries and a sparse LU
+    decomposition otherwise.
+
+    Dense matrices and derived quantities are returned as read-only views of the internal arrays.
+    Use ``copy()`` to obtain a writable array.
+
+    :param matrix: the covariance matrix
+    :param check_symmetry: if :py:obj:`False`, the (O(N^2)) check for symmetry is skipped and a dense
+        **matrix** is used without copying it. Only meant for matrices produced by kafe2 itself.
+    :type check_symmetry: bool
+    """
+    # banded storage is used if it needs at most this many times the memory of the sparse storage
+    _MAX_BANDED_STORAGE_RATIO = 4
+
+    def __init__(self, matrix, check_symmetry=True):
+        self._set_mat(matrix, check_symmetry=check_symmetry)
 
     # -- 'magic' methods
 
     def __iadd__(self, other):
-        self.mat += other.mat
+        _other = other._mat if isinstance(other, CovMat) else other
+        self._set_mat(add_cov_mats(self._mat, _other), check_symmetry=not isinstance(other, CovMat))
         return self
 
     def __add__(self, other):
-        _new = CovMat(self.mat)
-        _new += other
-        return _new
+        _other = other._mat if isinstance(other, CovMat) else other
+        return CovMat(add_cov_mats(self._mat, _other), check_symmetry=not isinstance(other, CovMat))
 
     def __eq__(self, other):
-        return np.all(self._mat == other.mat) if isinstance(other, CovMat) \
-            else np.all(self._mat == other)
+        _other = other.mat if isinstance(other, CovMat) else other
+        if self.sparse and sparse.issparse(_other):
+            return (self._mat != _other).nnz == 0
+        if self.sparse:
+            return np.all(self._mat.toarray() == _other)
+        if sparse.issparse(_other):
+            return np.all(self._mat == _other.toarray())
+        return np.all(self._mat == _other)
 
     def __len__(self):
         return self._size
@@ -64,43 +173,152 @@ class CovMat(object):
         self._cor_mat = None
         self._cond = None
         self._inverse = None
+        self._sparse_factorized = False
+        self._scaled_from = None
+        self._low_rank_factor = None
+
+    def _factorize_sparse(self):
+        """Factorize a sparse matrix, setting the inverse operator and (if available) the Cholesky factor."""
+        self._sparse_factorized = True
+        _coo = self._mat.tocoo()
+        _offsets = _coo.col - _coo.row
+        _bandwidth = int(np.max(np.abs(_offsets))) if _coo.nnz else 0
+
+        if (_bandwidth + 1) * self._size <= self._MAX_BANDED_STORAGE_RATIO * max(_coo.nnz, self._size):
+            # store upper triangle in LAPACK banded format: ab[u + i - j, j] = a[i, j] for i <= j
+            _upper = _offsets >= 0
+            _ab = np.zeros((_bandwidth + 1, self._size))
+            np.add.at(_ab, (_bandwidth - _offsets[_upper], _coo.col[_upper]), _coo.data[_upper])
+            try:
+                _cb = linalg.cholesky_banded(_ab, lower=False)
+            except np.linalg.LinAlgError:
+                pass  # not positive definite, try LU decomposition below
+            else:
+                self._inverse = CovMatInverseOperator(
+                    lambda b: linalg.cho_solve_banded((_cb, False), b), self._size)
+                # the rows of the banded factor are the diagonals of the upper triangular factor
+                _chol_upper = sparse.diags(
+                    [_cb[_bandwidth - _k, _k:] for _k in range(_bandwidth + 1)],
+                    offsets=list(range(_bandwidth + 1)), format='csc')
+                self._chol = sparse.csc_matrix(_chol_upper.T)
+                return
+
+        try:
+            _lu = splu(self._mat.tocsc())
+        except (RuntimeError, ValueError):
+            return  # fail silently if matrix is singular
+        self._inverse = CovMatInverseOperator(_lu.solve, self._size)
 
     # -- public interface
 
+    def _inherit_factors(self):
+        """Calculate inverse and Cholesky factor by rescaling those of the matrix this one was scaled from."""
+        _parent, _scale = self._scaled_from
+        self._inverse = _scale_inverse(_parent.I, _scale)
+        self._chol = _scale_cholesky(_parent.chol, _scale)
+        if self._low_rank_factor is None and _parent._low_rank_factor is not None:
+            # keep the low-rank factor available after the reference to the parent is dropped
+            self._low_rank_factor = _scale_rows(_parent._low_rank_factor, _scale)
+        self._sparse_factorized = True
+        self._scaled_from = None
+
     def rescale(self, old_reference_values, new_reference_values):
         """
         Rescale the covariance matrix to new reference values.
+        Already calculated inverse and Cholesky decomposition are rescaled as well.
+        """
+        _scale = np.asarray(new_reference_values, dtype=float) / np.asarray(old_reference_values, dtype=float)
+        if self.sparse:
+            self._mat = _scale_sparse(self._mat, _scale)
+        else:
+            self._mat = self._mat * np.outer(_scale, _scale)
+
+        if np.any(_scale == 0):
+            self._invalidate_cache()
+            return
+        if self._scaled_from is not None:
+            # factors not inherited yet are calculated from the parent with the combined scale
+            _parent, _parent_scale = self._scaled_from
+            self._scaled_from = (_parent, _parent_scale * _scale)
+        self._inverse = _scale_inverse(self._inverse, _scale)
+        self._chol = _scale_cholesky(self._chol, _scale)
+        if self._low_rank_factor is not None:
+            self._low_rank_factor = _scale_rows(self._low_rank_factor, _scale)
+        if self._cor_mat is not None:
+            _sign = np.sign(_scale)
+            self._cor_mat = _scale_sparse(self._cor_mat, _sign) if self.sparse \
+                else self._cor_mat * np.outer(_sign, _sign)
+        self._cond = None
+
+    def scaled(self, scale):
         """
-        _old_outer = np.asarray(np.outer(old_reference_values, old_reference_values))
-        _new_outer = np.asarray(np.outer(new_reference_values, new_reference_values))
-        self._mat *= _new_outer / _old_outer
+        Get the covariance matrix ``D * V * D``, where ``D`` is the diagonal matrix of **scale**. This is
+        used to calculate absolute from relative covariance matrices.
+
+        The inverse, the Cholesky decomposition and the low-rank factor of the new matrix are obtained by
+        rescaling those of this matrix in O(N^2), so this matrix only needs to be factorized once for any
+        number of scales.
+
+        :param scale: the diagonal entries of ``D``
+        :type scale: iterable of float
+        :rtype: CovMat
+        """
+        _scale = np.asarray(scale, dtype=float)
+        if self.sparse:
+            _new = CovMat(_scale_sparse(self._mat, _scale), check_symmetry=False)
+        else:
+            _new = CovMat(self._mat * np.outer(_scale, _scale), check_symmetry=False)
+        if not np.any(_scale == 0):
+            _new._scaled_from = (self, _scale)
+        return _new
+
+    def _set_mat(self, matrix, check_symmetry=True):
+        if isinstance(matrix, CovMat):
+            # already checked, the internal matrix is never modified in place and can be shared
+            matrix = matrix._mat
+            check_symmetry = False
+
+        if sparse.issparse(matrix):
+            self._mat = sparse.csc_matrix(matrix, dtype=float)
+            self._mat.sum_duplicates()
+        elif check_symmetry:
+            self._mat = np.array(matrix)
+        else:
+            self._mat = np.asarray(matrix)
+        if self._mat.ndim != 2 or self._mat.shape[0] != self._mat.shape[1]:
+            raise ValueError(
+                "Covariance matrix must be square matrix, shape %r given." % (self._mat.shape,))
+        if check_symmetry:
+            _asymmetry = self._mat - self._mat.T
+            if not np.allclose(_asymmetry.data if self.sparse else _asymmetry, 0):
+                raise ValueError("Covariance matrix must be symmetric!")
+        self._size = self._mat.shape[0]
+        self._cond = None
+
         self._invalidate_cache()
 
     @property
     def mat(self):
         """
-        Get the covariance matrix.
+        Get the covariance matrix (read-only for dense matrices, sparse matrices are copied).
         """
-        return np.array(self._mat)
+        if self.sparse:
+            return self._mat.copy()
+        return read_only_view(self._mat)
 
     @mat.setter
     def mat(self, matrix):
         """
         Set the covariance matrix.
         """
-        if isinstance(matrix, CovMat):
-            matrix = matrix.mat
-
-        self._mat = np.array(matrix)
-        if self._mat.ndim != 2 or self._mat.shape[0] != self._mat.shape[1]:
-            raise ValueError(
-                "Covariance matrix must be square matrix, shape %r given." % (self._mat.shape,))
-        if not np.allclose(self._mat - self._mat.T, 0):
-            raise ValueError("Covariance matrix must be symmetric!")
-        self._size = self._mat.shape[0]
-        self._cond = None
+        self._set_mat(matrix)
 
-        self._invalidate_cache()
+    @property
+    def sparse(self):
+        """
+        ``True`` if the covariance matrix is stored as a :py:mod:`scipy.sparse` matrix.
+        """
+        return sparse.issparse(self._mat)
 
     @property
     def cor_mat(self):
@@ -108,36 +326,59 @@ class CovMat(object):
         Correlation matrix corresponding to the covariance matrix.
         """
         if self._cor_mat is None:
-            _sqrt_vars = np.sqrt(np.diag(self._mat))
+            _sqrt_vars = np.sqrt(_diagonal(self._mat))
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore")
-                self._cor_mat = self._mat / np.outer(_sqrt_vars, _sqrt_vars)
-        return self._cor_mat
+                if self.sparse:
+                    self._cor_mat = _scale_sparse(self._mat, 1.0 / _sqrt_vars)
+                else:
+                    self._cor_mat = self._mat / np.outer(_sqrt_vars, _sqrt_vars)
+        return self._cor_mat if self.sparse else read_only_view(self._cor_mat)
 
     @property
     def I(self):
         """
         Inverse of the covariance matrix. Returns ``None`` if matrix is singular.
+        For sparse matrices, a :py:class:`CovMatInverseOperator` is returned instead of an array.
         """
+        if self.sparse:
+            if not self._sparse_factorized:
+                if self._scaled_from is not None:
+                    self._inherit_factors()
+                else:
+                    self._factorize_sparse()
+            return self._inverse
+        if self._inverse is None and self._scaled_from is not None:
+            self._inherit_factors()
         if self._inverse is None:
             try:
                 self._inverse = np.linalg.inv(self._mat)
             except np.linalg.LinAlgError:
                 pass  # fail silently if matrix is singular
-        return self._inverse
+        return read_only_view(self._inverse)
 
     @property
     def chol(self):
         """
         Lower diagonal matrix resulting from the Cholesky decomposition of the covariance matrix.
         Returns ``None`` if matrix is not positive definite.
+        For sparse matrices, the factor is only available (as a sparse matrix) if the matrix is banded.
         """
+        if self.sparse:
+            if not self._sparse_factorized:
+                if self._scaled_from is not None:
+                    self._inherit_factors()
+                else:
+                    self._factorize_sparse()
+            return self._chol
+        if self._chol is None and self._scaled_from is not None:
+            self._inherit_factors()
         if self._chol is None:
             try:
                 self._chol = np.linalg.cholesky(self._mat)
             except np.linalg.LinAlgError:
                 pass  # fail silently if matrix is not positive definite
-        return self._chol
+        return read_only_view(self._chol)
 
     @property
     def cond(self):
@@ -145,11 +386,29 @@ class CovMat(object):
         Condition number of the matrix.
         """
         if self._cond is None:
-            self._cond = np.linalg.cond(self._mat)
+            self._cond = np.linalg.cond(self._mat.toarray() if self.sparse else self._mat)
         return self._cond
 
+    @property
+    def low_rank_factor(self):
+        """
+        Matrix ``L`` with as few columns as possible such that ``L * L^T`` is the covariance matrix,
+        calculated from the eigendecomposition. The number of columns is the (numerical) rank of the matrix.
+        """
+        if self._low_rank_factor is None and self._scaled_from is not None:
+            # D * L is a factor of D * V * D with the same number of columns
+            _parent, _scale = self._scaled_from
+            self._low_rank_factor = _scale_rows(_parent.low_rank_factor, _scale)
+        if self._low_rank_factor is None:
+            _eigvals, _eigvecs = np.linalg.eigh(self._mat.toarray() if self.sparse else self._mat)
+            _keep = _eigvals > max(_eigvals[-1], 0.0) * self._size * np.finfo(float).eps
+            self._low_rank_factor = _eigvecs[:, _keep] * np.sqrt(_eigvals[_keep])
+        return read_only_view(self._low_rank_factor)
+
     @property
     def split_svd(self):
+        if self.sparse:
+            return CovMat(self._mat.toarray(), check_symmetry=False).split_svd
         if self.chol is None:
             return None
         _l = []
@@ -160,8 +419,10 @@ class CovMat(object):
 
     @property
     def split_diag_svd(self):
+        if self.sparse:
+            return CovMat(self._mat.toarray(), check_symmetry=False).split_diag_svd
         _m0 = np.diag(np.diag(self._mat))
-        _m = CovMat(self._mat - _m0)
+        _m = CovMat(self._mat - _m0, check_symmetry=False)
         if _m is None:
             return None
         _l = [_m0]
@@ -171,6 +432,150 @@ class CovMat(object):
         return _l
 
 
+class BlockCovMat(object):
+    """
+    Covariance matrix consisting of independent diagonal blocks ``A`` and a low-rank coupling
+    ``U * U^T`` between the blocks, as caused e.g. by uncertainties shared by several fits:
+
+    ``V = A + U * U^T``
+
+    The full matrix is not needed for calculating the inverse. Instead, the blocks are inverted
+    individually and the coupling is taken into account with the Woodbury identity:
+
+    ``V^-1 = A^-1 - A^-1 * U * (1 + U^T * A^-1 * U)^-1 * U^T * A^-1``
+
+    Only matrices with the size of the blocks and with the rank of the coupling need to be factorized.
+    If the blocks on their own are singular the full matrix is inverted instead.
+
+    :param blocks: the diagonal blocks
+    :type blocks: iterable of CovMat, numpy.ndarray or scipy.sparse matrices
+    :param coupling: the factor ``U`` of the coupling with shape ``(N, R)``, or :py:obj:`None` if the
+        blocks are not coupled
+    :type coupling: numpy.ndarray or None
+    """
+    def __init__(self, blocks, coupling=None):
+        self._blocks = [_block if isinstance(_block, CovMat) else CovMat(_block, check_symmetry=False)
+                        for _block in blocks]
+        self._edges = np.cumsum([0] + [len(_block) for _block in self._blocks])
+        self._size = int(self._edges[-1])
+        if coupling is None:
+            coupling = np.zeros((self._size, 0))
+        self._coupling = np.asarray(coupling, dtype=float)
+        if self._coupling.ndim != 2 or self._coupling.shape[0] != self._size:
+            raise ValueError("Coupling must have shape (%d, R), shape %r given."
+                             % (self._size, self._coupling.shape))
+        self._mat = None
+        self._inverse = None
+        self._factorized = False
+
+    # -- 'magic' methods
+
+    def __add__(self, other):
+        if not isinstance(other, BlockCovMat) or not np.array_equal(self._edges, other._edges):
+            raise ValueError("Can only add block covariance matrices with the same block sizes!")
+        return BlockCovMat(
+            blocks=[_block + _other_block for _block, _other_block in zip(self._blocks, other._blocks)],
+            coupling=np.hstack([self._coupling, other._coupling])
+        )
+
+    def __len__(self):
+        return self._size
+
+    # -- private methods
+
+    def _solve_blocks(self, b, block_inverses):
+        """Calculate ``A^-1 * b`` from the inverses of the individual blocks."""
+        _x = np.empty_like(b)
+        for _inverse, _lower, _upper in zip(block_inverses, self._edges[:-1], self._edges[1:]):
+            _x[_lower:_upper] = _inverse.dot(b[_lower:_upper])
+        return _x
+
+    def _factorize(self):
+        self._factorized = True
+        _block_inverses = [_block.I for _block in self._blocks]
+        if any(_inverse is None for _inverse in _block_inverses):
+            # the coupling is needed for the matrix to be regular
+            self._inverse = CovMat(self.mat, check_symmetry=False).I
+            return
+
+        _u = self._coupling
+        if _u.shape[1] == 0:
+            self._inverse = CovMatInverseOperator(lambda b: self._solve_blocks(b, _block_inverses), self._size)
+            return
+        _a_inv_u = self._solve_blocks(_u, _block_inverses)
+        try:
+            _capacitance = linalg.cho_factor(np.eye(_u.shape[1]) + _u.T.dot(_a_inv_u), lower=True)
+        except np.linalg.LinAlgError:
+            # blocks are not positive definite
+            self._inverse = CovMat(self.mat, check_symmetry=False).I
+            return
+
+        def _solve(b):
+            _a_inv_b = self._solve_blocks(b, _block_inverses)
+            return _a_inv_b - _a_inv_u.dot(linalg.cho_solve(_capacitance, _u.T.dot(_a_inv_b)))
+        self._inverse = CovMatInverseOperator(_solve, self._size)
+
+    # -- public interface
+
+    def scaled(self, scale):
+        """
+        Get the block covariance matrix ``D * V * D``, where ``D`` is the diagonal matrix of **scale**.
+
+        :param scale: the diagonal entries of ``D``
+        :type scale: iterable of float
+        :rtype: BlockCovMat
+        """
+        _scale = np.asarray(scale, dtype=float)
+        return BlockCovMat(
+            blocks=[_block.scaled(_scale[_lower:_upper])
+                    for _block, _lower, _upper in zip(self._blocks, self._edges[:-1], self._edges[1:])],
+            coupling=_scale_rows(self._coupling, _scale)
+        )
+
+    def diagonal(self):
+        """
+        Get the diagonal of the covariance matrix.
+        """
+        return np.concatenate(
+            [np.zeros(0)] + [_diagonal(_block._mat) for _block in self._blocks]
+        ) + np.sum(self._coupling ** 2, axis=1)
+
+    @property
+    def blocks(self):
+        """
+        The diagonal blocks as :py:class:`CovMat` objects.
+        """
+        return list(self._blocks)
+
+    @property
+    def coupling(self):
+        """
+        The factor ``U`` of the coupling between the blocks (read-only).
+        """
+        return read_only_view(self._coupling)
+
+    @property
+    def mat(self):
+        """
+        Get the full covariance matrix as a dense array (read-only).
+        """
+        if self._mat is None:
+            self._mat = linalg.block_diag(
+                *[_block._mat.toarray() if _block.sparse else _block._mat for _block in self._blocks])
+            self._mat += self._coupling.dot(self._coupling.T)
+        return read_only_view(self._mat)
+
+    @property
+    def I(self):
+        """
+        Inverse of the covariance matrix as a :py:class:`CovMatInverseOperator`, or as a dense array if
+        the blocks on their own are singular. Returns ``None`` if matrix is singular.
+        """
+        if not self._factorized:
+            self._factorize()
+        return self._inverse
+
+
 # Data structures for Gaussian Errors
 @six.add_metaclass(abc.ABCMeta)
 class GaussianErrorBase(object):
@@ -282,12 +687,26 @@ class GaussianErrorBase(object):
     def fit_indices(self):
         """Indices of fits that have this error when used inside a MultiFit."""
 
+    @property
+    def sparse(self):
+        """``True`` if the covariance matrix of the error is stored as a sparse matrix."""
+        return False
+
     def get_cov_mat_object(self):
         """
         Returns the internally used `CovMat` object used to represent measurement errors. (advanced)
         """
         return self._cov_mat
 
+    def _absolute_reference_changed(self):
+        """Check if the absolute covariance matrix of a relative error is missing or was calculated for
+        different reference values. The reference values used are stored in :py:attr:`_cov_mat_reference`."""
+        _ref = np.asarray(self.reference, dtype=float)
+        if self._cov_mat is not None and np.array_equal(_ref, self._cov_mat_reference):
+            return False
+        self._cov_mat_reference = _ref.copy()
+        return True
+
 
 class SimpleGaussianError(GaussianErrorBase):
     """
@@ -311,6 +730,7 @@ class SimpleGaussianError(GaussianErrorBase):
         self._is_relative = relative
         self.reference = reference
         self._fit_indices = fit_indices
+        self._cov_mat_reference = None
         if self.relative:
             self.error_rel = err_val
         else:
@@ -328,7 +748,7 @@ class SimpleGaussianError(GaussianErrorBase):
             cov_mat_uncor_part = np.diag(error_array ** 2)
             cov_mat_cor_part = np.zeros_like(cov_mat_uncor_part)
 
-        cov_mat = CovMat(cov_mat_uncor_part + cov_mat_cor_part)
+        cov_mat = CovMat(cov_mat_uncor_part + cov_mat_cor_part, check_symmetry=False)
 
         assert np.allclose(np.diag(cov_mat.mat), error_array ** 2, atol=1e-4)
 
@@ -341,11 +761,17 @@ class SimpleGaussianError(GaussianErrorBase):
         if self.relative:
             if self.reference is None:
                 raise AttributeError("Requested 'absolute' errors for error object declared 'relative', but 'reference' not set!")
-            _abs_err = self.error_rel * self.reference
+            # scale the reference-independent relative matrix so its inverse only has to be calculated once
+            if self._cov_mat_rel is None:
+                self._calculate_cov_mat_rel()
+            _ref = self._cov_mat_reference
+            _ref_outer = np.outer(_ref, _ref)
+            self._cov_mat = self._cov_mat_rel.scaled(_ref)
+            self._cov_mat_uncor_part = self._cov_mat_rel_uncor_part * _ref_outer
+            self._cov_mat_cor_part = self._cov_mat_rel_cor_part * _ref_outer
         else:
-            _abs_err = self.error
-
-        self._cov_mat, self._cov_mat_uncor_part, self._cov_mat_cor_part = self._calculate_cov_mat_generic(_abs_err, self._corr_coeff)
+            self._cov_mat, self._cov_mat_uncor_part, self._cov_mat_cor_part = self._calculate_cov_mat_generic(
+                self.error, self._corr_coeff)
 
     def _calculate_cov_mat_rel(self):
         """Calculate relative covariance matrix for error object."""
@@ -444,28 +870,34 @@ class SimpleGaussianError(GaussianErrorBase):
         self._cov_mat = None
         self._cov_mat_rel = None
 
+    def _update_cov_mat(self):
+        """Calculate the absolute covariance matrix if it is missing or outdated."""
+        if self.relative:
+            if self.reference is None:
+                raise AttributeError("Requested 'absolute' errors for error object declared 'relative', but 'reference' not set!")
+            if self._absolute_reference_changed():
+                self._calculate_cov_mat()
+        elif self._cov_mat is None:
+            self._calculate_cov_mat()
+
     @property
     def cov_mat(self):
-        if self._cov_mat is None:
-            self._calculate_cov_mat()
+        self._update_cov_mat()
         return self._cov_mat.mat
 
     @property
     def cov_mat_inverse(self):
-        if self._cov_mat is None:
-            self._calculate_cov_mat()
+        self._update_cov_mat()
         return self._cov_mat.I
 
     @property
     def cov_mat_uncor(self):
-        if self._cov_mat is None:
-            self._calculate_cov_mat()
+        self._update_cov_mat()
         return self._cov_mat_uncor_part
 
     @property
     def cov_mat_cor(self):
-        if self._cov_mat is None:
-            self._calculate_cov_mat()
+        self._update_cov_mat()
         return self._cov_mat_cor_part
 
     @property
@@ -476,7 +908,7 @@ class SimpleGaussianError(GaussianErrorBase):
 
     @property
     def cov_mat_rel_inverse(self):
-        if self._cov_mat is None:
+        if self._cov_mat_rel is None:
             self._calculate_cov_mat_rel()
         return self._cov_mat_rel.I
 
@@ -498,7 +930,7 @@ class SimpleGaussianError(GaussianErrorBase):
             _ = self.cov_mat_rel  # call to calculate CovMat
             return self._cov_mat_rel.cor_mat
         else:
-            _ = self.cov_mat  # call to calculate CovMat
+            self._update_cov_mat()
             return self._cov_mat.cor_mat
 
     @property
@@ -537,6 +969,7 @@ class MatrixGaussianError(GaussianErrorBase):
         self._err_rel = None
         self._cov_mat = None
         self._cov_mat_rel = None
+        self._cov_mat_reference = None
 
         # set the main matrix
         if matrix_type.lower() in ('covariance', 'cov'):
@@ -567,25 +1000,22 @@ class MatrixGaussianError(GaussianErrorBase):
     def _calculate_cov_mat_from_cor_mat_and_error_array(error_array, corr_mat):
         """Calculate a covariance matrix from an array of error values and a correlation matrix."""
         # check if corr_mat has ones on diagonal
-        if not np.allclose(np.diag(corr_mat), 1.0):
+        if not np.allclose(_diagonal(corr_mat), 1.0):
             raise ValueError("Corelation matrix has non-unit entry on diagonal!")
         # TODO: check if corr_mat is symmetric and positive definite (?)
+        if sparse.issparse(corr_mat):
+            return CovMat(_scale_sparse(corr_mat, error_array))
         cov_mat = np.asarray(np.outer(error_array, error_array)) * np.asarray(corr_mat)
         return CovMat(cov_mat)
 
     @staticmethod
     def _calculate_cov_mat_rel_from_cov(cov_mat, reference):
         _ref = np.asarray(reference)
+        if sparse.issparse(cov_mat):
+            return CovMat(_scale_sparse(cov_mat, 1.0 / _ref), check_symmetry=False)
         _refmat = np.outer(_ref, _ref)
         _mat = np.asarray(cov_mat)
-        return CovMat(_mat / _refmat)
-
-    @staticmethod
-    def _calculate_cov_mat_from_cov_rel(cov_mat_rel, reference):
-        _ref = np.asarray(reference)
-        _refmat = np.outer(_ref, _ref)
-        _mat_rel = np.asarray(cov_mat_rel)
-        return CovMat(_mat_rel * _refmat)
+        return CovMat(_mat / _refmat, check_symmetry=False)
 
     # -- public methods
 
@@ -594,6 +1024,12 @@ class MatrixGaussianError(GaussianErrorBase):
         """Returns ``True`` if error is marked as a relative error."""
         return self._is_relative
 
+    @property
+    def sparse(self):
+        """``True`` if the covariance matrix of the error is stored as a sparse matrix."""
+        _cov_mat = self._cov_mat_rel if self.relative else self._cov_mat
+        return _cov_mat.sparse
+
     @property
     def cov_mat(self):
         """"""
@@ -602,13 +1038,16 @@ class MatrixGaussianError(GaussianErrorBase):
                 raise AttributeError(
                     "Requested 'absolute' covariance matrix for error object declared 'relative', "
                     "but 'reference' not set!")
-            self._cov_mat = self._calculate_cov_mat_from_cov_rel(self.cov_mat_rel, self.reference)
+            if self._absolute_reference_changed():
+                # rescaling keeps the factorization of the reference-independent relative matrix
+                self._cov_mat = self._cov_mat_rel.scaled(self._cov_mat_reference)
         return self._cov_mat.mat
 
     @cov_mat.setter
     def cov_mat(self, cov_mat):
         """"""
-        self._cov_mat = CovMat(cov_mat)
+        # CovMat objects are used as they are so that cached inverses are shared
+        self._cov_mat = cov_mat if isinstance(cov_mat, CovMat) else CovMat(cov_mat)
         self._cov_mat_rel = None
 
     @property
@@ -640,7 +1079,7 @@ class MatrixGaussianError(GaussianErrorBase):
                 if self.reference is None:
                     raise AttributeError(
                         "Requested 'absolute' error array for error object declared 'relative', but 'reference' not set!")
-            self._err = np.sqrt(np.diag(self.cov_mat))
+            self._err = np.sqrt(_diagonal(self.cov_mat))
         return self._err
 
     @property
@@ -651,7 +1090,7 @@ class MatrixGaussianError(GaussianErrorBase):
                 if self.reference is None:
                     raise AttributeError(
                         "Requested 'relative' error array for error object declared 'absolute', but 'reference' not set!")
-            self._err_rel = np.sqrt(np.diag(self.cov_mat_rel))
+            self._err_rel = np.sqrt(_diagonal(self.cov_mat_rel))
         return self._err_rel
 
     @property
@@ -3,6 +3,7 @@ from copy import deepcopy
 
 from .minimizer_base import MinimizerBase, MinimizerException
 from ..contour import ContourFactory
+from ...tools import read_only_view
 
 try:
     import iminuit
@@ -126,7 +127,7 @@ class MinimizerIMinuit(MinimizerBase):
                 _submat = self._remove_zeroes_for_fixed(_cov_mat)
                 _submat_inv = 2.0 * self.errordef * np.linalg.inv(_submat)
                 self._hessian = self._fill_in_zeroes_for_fixed(_submat_inv)
-        return None if self._hessian is None else self._hessian.copy()
+        return read_only_view(self._hessian)
 
     @property
     def cov_mat(self):
@@ -148,7 +149,7 @@ class MinimizerIMinuit(MinimizerBase):
                 _mat = None
             self._load_state()
             self._par_cov_mat = _mat
-        return None if self._par_cov_mat is None else self._par_cov_mat.copy()
+        return read_only_view(self._par_cov_mat)
 
     @property
     def cor_mat(self):
@@ -170,7 +171,7 @@ class MinimizerIMinuit(MinimizerBase):
                 _mat = None
             self._load_state()
             self._par_cor_mat = _mat
-        return None if self._par_cor_mat is None else self._par_cor_mat.copy()
+        return read_only_view(self._par_cor_mat)
 
     @property
     def hessian_inv(self):
@@ -178,7 +179,7 @@ class MinimizerIMinuit(MinimizerBase):
             return None
         if self._hessian_inv is None:
             self._hessian_inv = self.cov_mat / (2.0 * self.errordef)
-        return None if self._hessian_inv is None else self._hessian_inv.copy()
+        return read_only_view(self._hessian_inv)
 
     @property
     def parameter_values(self):
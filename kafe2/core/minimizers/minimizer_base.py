@@ -6,6 +6,7 @@ import numdifftools as nd
 from scipy.optimize import brentq
 
 from ..error import CovMat
+from ...tools import read_only_view
 
 
 class MinimizerException(Exception):
@@ -363,7 +364,7 @@ class MinimizerBase(object):
             assert(np.all(self._hessian == self._hessian.T))
             # Write back parameter values to nexus parameter nodes:
             self._func_wrapper_unpack_args(self.parameter_values)
-        return self._hessian.copy()
+        return read_only_view(self._hessian)
 
     @property
     def hessian_inv(self):
@@ -381,7 +382,7 @@ class MinimizerBase(object):
             # ensure symmetric
             self._hessian_inv = 0.5 * (self._hessian_inv + self._hessian_inv.T)
             assert (np.all(self._hessian_inv == self._hessian_inv.T))
-        return self._hessian_inv.copy()
+        return read_only_view(self._hessian_inv)
 
     @property
     def cov_mat(self):
@@ -393,7 +394,7 @@ class MinimizerBase(object):
             return None
         if self._par_cov_mat is None:
             self._par_cov_mat = self.hessian_inv * 2.0 * self.errordef
-        return self._par_cov_mat.copy()
+        return read_only_view(self._par_cov_mat)
 
     @property
     def cor_mat(self):
@@ -407,7 +408,7 @@ class MinimizerBase(object):
             _subcov_mat = self._remove_zeroes_for_fixed(self.cov_mat)
             _subcor_mat = CovMat(_subcov_mat).cor_mat
             self._par_cor_mat = self._fill_in_zeroes_for_fixed(_subcor_mat)
-        return self._par_cor_mat.copy()
+        return read_only_view(self._par_cor_mat)
 
     def reset(self):
         """Clears caches and resets the internal state of the used backend (if any)."""
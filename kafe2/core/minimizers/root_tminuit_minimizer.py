@@ -3,6 +3,7 @@ import six
 import ctypes
 from .minimizer_base import MinimizerBase, MinimizerException
 from ..contour import ContourFactory
+from ...tools import read_only_view
 try:
     from ROOT import TMinuit, Double, Long
     from ROOT import TMath  # for using ROOT's chi2prob function
@@ -207,7 +208,7 @@ class MinimizerROOTTMinuit(MinimizerBase):
             _submat = self._remove_zeroes_for_fixed(self.cov_mat)
             _submat_inv = 2.0 * self.errordef * np.linalg.inv(_submat)
             self._hessian = self._fill_in_zeroes_for_fixed(_submat_inv)
-        return self._hessian.copy()
+        return read_only_view(self._hessian)
 
     @property
     def cov_mat(self):
@@ -229,7 +230,7 @@ class MinimizerROOTTMinuit(MinimizerBase):
             _num_pars_free = np.sum(np.invert(self._par_fixed))
             _sub_cov_mat = _sub_cov_mat[:_num_pars_free, :_num_pars_free]
             self._par_cov_mat = self._fill_in_zeroes_for_fixed(_sub_cov_mat)
-        return self._par_cov_mat.copy()
+        return read_only_view(self._par_cov_mat)
 
     @property
     def hessian_inv(self):
@@ -237,7 +238,7 @@ class MinimizerROOTTMinuit(MinimizerBase):
             return None
         if self._hessian_inv is None:
             self._hessian_inv = self.cov_mat / (2.0 * self.errordef)
-        return self._hessian_inv.copy()
+        return read_only_view(self._hessian_inv)
 
     @property
     def parameter_values(self):
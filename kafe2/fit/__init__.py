@@ -153,3 +153,4 @@ from .xy import *
 
 from ._base.plot import Plot
 from .tools.fit_wrapper import Fit  # import after every fit to avoid import conflicts with other tools
+from .tools.bootstrap import *  # import after every fit, the bootstrap resamples the data of the specific fit types
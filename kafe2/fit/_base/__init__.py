@@ -6,8 +6,9 @@
 
 from .container import *
 from .cost import *
-from .ensemble import *
 from .fit import *
 from .format import *
 from .model import *
 from .plot import *
+# imports the ensemble tools, which depend on the other base classes
+from .ensemble import *
@@ -5,9 +5,10 @@ from copy import copy
 
 import numpy as np
 import six
+from scipy import sparse
 
 from ..io.file import FileIOMixin
-from ...core.error import SimpleGaussianError, MatrixGaussianError
+from ...core.error import CovMat, SimpleGaussianError, MatrixGaussianError, add_cov_mats
 from ...tools import random_alphanumeric  # relative import of kafe2.tools not kafe2.fit.tools
 
 __all__ = ["DataContainerBase", "DataContainerException"]
@@ -27,9 +28,11 @@ class DataContainerBase(FileIOMixin, object):
     def __init__(self):
         self._error_dicts = dict()
         self._total_error = None
+        self._total_cov_mats = dict()  # cached sums of the enabled error covariance matrices for each axis
         self._label = None
         self._axis_labels = (None, None)
         self._on_error_change_callback = None
+        self._sparse_errors = False  # if True, use sparse matrices even if there are no sparse errors
         super(DataContainerBase, self).__init__()
 
     # -- private methods
@@ -46,9 +49,10 @@ class DataContainerBase(FileIOMixin, object):
     def _calculate_total_error(self):
         pass
 
-    @abc.abstractmethod
     def _clear_total_error_cache(self):
-        pass
+        """recalculate total errors from scratch next time they are needed"""
+        self._total_error = None
+        self._total_cov_mats = dict()
 
     def _add_error_object(self, name, error_object, **additional_error_dict_keys):
         """create a new entry <name> under self._error_dicts,
@@ -75,6 +79,62 @@ class DataContainerBase(FileIOMixin, object):
         self._on_error_change()
         return _name
 
+    def _sum_cov_mats(self, errors):
+        """Add up the covariance matrices of error sources, returning a :py:class:`~kafe2.core.error.CovMat`.
+        Gives a zero matrix if there are no error sources. The zero matrix is sparse if the container has
+        sparse errors, to avoid a dense allocation.
+        For a single error source its :py:class:`~kafe2.core.error.CovMat` object is returned, so that
+        cached inverses are shared with the total error.
+        """
+        if len(errors) == 1:
+            _ = errors[0].cov_mat  # call to update CovMat
+            return errors[0].get_cov_mat_object()
+        if errors:
+            return CovMat(add_cov_mats(*[_err.cov_mat for _err in errors]), check_symmetry=False)
+        _sz = self.size
+        if self._sparse_errors or self.has_sparse_errors:
+            return CovMat(sparse.csc_matrix((_sz, _sz)), check_symmetry=False)
+        return CovMat(np.zeros((_sz, _sz)), check_symmetry=False)
+
+    def _get_total_cov_mat(self, axis=None):
+        """Sum of the covariance matrices of all enabled error sources for an axis. The sum is cached
+        and updated incrementally when error sources are enabled or disabled."""
+        _total = self._total_cov_mats.get(axis, None)
+        if _total is None:
+            _total = self._sum_cov_mats(self._get_enabled_errors(axis))
+            self._total_cov_mats[axis] = _total
+        return _total
+
+    def _get_enabled_errors(self, axis=None):
+        """list of the enabled error objects for an axis"""
+        return [_err_dict['err'] for _err_dict in self._error_dicts.values()
+                if _err_dict['enabled'] and _err_dict.get('axis', None) == axis]
+
+    def _set_error_enabled(self, error_name, enabled):
+        """Enable or disable an error source. If the total covariance matrix is cached, only the
+        covariance matrix of this error source is added to or subtracted from it."""
+        _err_dict = self._get_error_by_name_raise(error_name)
+        _axis = _err_dict.get('axis', None)
+        _total = self._total_cov_mats.get(_axis, None)
+        if _total is None or _err_dict['enabled'] == enabled:
+            # also recalculate if nothing changed, error objects may have been modified by the user
+            _err_dict['enabled'] = enabled
+            self._on_error_change()
+            return
+
+        _err_dict['enabled'] = enabled
+        _enabled_errors = self._get_enabled_errors(_axis)
+        if len(_enabled_errors) <= 1:
+            # avoid round-off errors for zero matrices and share the CovMat of a single error source
+            _total = self._sum_cov_mats(_enabled_errors)
+        else:
+            _cov_mat = _err_dict['err'].cov_mat
+            _total = CovMat(add_cov_mats(_total.mat, _cov_mat if enabled else -_cov_mat), check_symmetry=False)
+        self._total_cov_mats[_axis] = _total
+        self._total_error = None
+        if self._on_error_change_callback is not None:
+            self._on_error_change_callback()
+
     def _get_error_by_name_raise(self, error_name):
         """return a dictionary containing the error object for error 'name' and additional information"""
         _err_dict = self._error_dicts.get(error_name, None)
@@ -189,6 +249,14 @@ class DataContainerBase(FileIOMixin, object):
         """
         return True if self._error_dicts else False
 
+    @property
+    def has_sparse_errors(self):
+        """:py:obj:`True` if at least one uncertainty source uses a sparse covariance matrix.
+
+        :rtype: bool
+        """
+        return any(_err_dict['err'].sparse for _err_dict in self._error_dicts.values())
+
     # -- public methods
 
     # error-related methods
@@ -228,7 +296,7 @@ class DataContainerBase(FileIOMixin, object):
                          name=None, err_val=None, relative=False, reference=None):
         """Add a matrix uncertainty source to the data container.
 
-        :param err_matrix: Covariance or correlation matrix.
+        :param err_matrix: Covariance or correlation matrix. :py:mod:`scipy.sparse` matrices are kept sparse.
         :param matrix_type: One of ``'covariance'``/``'cov'`` or ``'correlation'``/``'cor'``.
         :type matrix_type: str
         :param name: Unique name for this uncertainty source. If :py:obj`None`, the name of the error source will be set to a
@@ -256,9 +324,7 @@ class DataContainerBase(FileIOMixin, object):
         :param error_name: error name
         :type error_name: str
         """
-        _err_dict = self._get_error_by_name_raise(error_name)
-        _err_dict['enabled'] = False
-        self._on_error_change()
+        self._set_error_enabled(error_name, False)
 
     def enable_error(self, error_name):
         """(Re-)Enable an uncertainty source so that it counts towards calculating the total uncertainty.
@@ -266,9 +332,7 @@ class DataContainerBase(FileIOMixin, object):
         :param error_name: error name
         :type error_name: str
         """
-        _err_dict = self._get_error_by_name_raise(error_name)
-        _err_dict['enabled'] = True
-        self._on_error_change()
+        self._set_error_enabled(error_name, True)
 
     def get_matching_errors(self, matching_criteria=None, matching_type='equal'):
         """Return a list of uncertainty objects fulfilling the specified matching criteria.
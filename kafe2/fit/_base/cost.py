@@ -265,7 +265,8 @@ class CostFunction_Chi2(CostFunction):
 
         # if a covariance matrix inverse is given, use it
         if cov_mat_inverse is not None:
-            _cost = _res.dot(cov_mat_inverse).dot(_res)
+            # multiply from the right first so that implicit (sparse) inverses work as well
+            _cost = _res.dot(cov_mat_inverse.dot(_res))
             if np.isnan(_cost):
                 _cost = np.inf
             return _cost
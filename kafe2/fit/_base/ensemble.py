@@ -1,10 +1,114 @@
 import abc
+import hashlib
+import json
+import multiprocessing
+import os
+import warnings
+
+import numpy as np
+import scipy.stats
 import six
+from scipy import sparse
+
+from ..tools.ensemble import EnsembleVariable, EnsembleVariablePlotter
+
+import matplotlib as mpl
+from matplotlib import pyplot as plt
+from matplotlib import gridspec as gs
 
 
 __all__ = ["FitEnsembleBase", "FitEnsembleException"]
 
 
+# fit ensemble used by the worker processes (fits cannot be pickled, so the workers inherit it when forking)
+_WORKER_ENSEMBLE = None
+
+
+def _do_pseudoexperiments_in_worker(task):
+    _start, _seed_sequences, _accumulate = task
+    return _start, _WORKER_ENSEMBLE._do_pseudoexperiments(_seed_sequences, accumulate=_accumulate)
+
+
+def _get_json_seed(seed):
+    """the seed (an integer or a sequence of integers) as plain Python integers for the JSON manifest"""
+    if seed is None:
+        return None
+    if np.ndim(seed) == 0:
+        return int(seed)
+    return [int(_entropy) for _entropy in seed]
+
+
+def _add_range(ranges, start, stop):
+    """Add the range [start, stop) to a sorted list of disjoint ranges, merging adjacent ranges."""
+    _merged = []
+    for _start, _stop in sorted(list(ranges) + [[start, stop]]):
+        if _merged and _start <= _merged[-1][1]:
+            _merged[-1][1] = max(_merged[-1][1], _stop)
+        else:
+            _merged.append([_start, _stop])
+    return _merged
+
+
+def _get_fork_context():
+    """Return a multiprocessing context which forks worker processes or ``None`` if forking is not available."""
+    try:
+        return multiprocessing.get_context('fork')
+    except AttributeError:  # Python 2: processes are forked on POSIX systems
+        return multiprocessing if os.name == 'posix' else None
+    except ValueError:
+        return None
+
+
+def _heuristic_optimal_subplot_grid_size(n_subplots, aspect_ratio_priority=0.5):
+    def f2(s, k):
+        if n_subplots > s * (s + k):
+            return 100000
+        return ((s * (s + k) - n_subplots) ** 2 * (1.0 - aspect_ratio_priority)
+                + (float(k) / float(s)) ** 2 * (aspect_ratio_priority))
+
+    _optimal_f = np.inf
+    _optimal_sk = n_subplots, 0
+    for s in six.moves.range(1, n_subplots):
+        for k in six.moves.range(0, n_subplots):
+            _f = f2(s, k)
+            if _f < _optimal_f:
+                _optimal_f = _f
+                _optimal_sk = s, k
+
+    s, k = _optimal_sk
+    return s, s+k
+
+
+def _factorize_cov_mat(cov_mat):
+    """
+    Factorize a covariance matrix *C* such that *C = L L^T*. Positive semi-definite matrices are
+    factorized by an eigendecomposition if the Cholesky decomposition fails.
+
+    :param cov_mat: the covariance matrix
+    :type cov_mat: ``numpy.ndarray`` or ``scipy.sparse`` matrix
+    :return: the factor *L* or, for diagonal matrices, the square root of the diagonal
+    :rtype: ``numpy.ndarray``
+    """
+    _mat = cov_mat.toarray() if sparse.issparse(cov_mat) else np.asarray(cov_mat, dtype=float)
+    _diag = np.diag(_mat)
+    if np.count_nonzero(_mat) == np.count_nonzero(_diag):
+        return np.sqrt(np.clip(_diag, 0.0, None))
+    try:
+        return np.linalg.cholesky(_mat)
+    except np.linalg.LinAlgError:
+        _eigenvalues, _eigenvectors = np.linalg.eigh(_mat)
+        # clip eigenvalues which are negative due to rounding errors
+        return _eigenvectors * np.sqrt(np.clip(_eigenvalues, 0.0, None))
+
+
+def _correlate(standard_normal, cov_mat_factor):
+    """Turn rows of independent standard normal values into rows of correlated normal values
+    with the covariance matrix corresponding to **cov_mat_factor** (see :py:func:`_factorize_cov_mat`)."""
+    if cov_mat_factor.ndim == 1:
+        return standard_normal * cov_mat_factor
+    return np.dot(standard_normal, cov_mat_factor.T)
+
+
 class FitEnsembleException(Exception):
     pass
 
@@ -15,8 +119,756 @@ class FitEnsembleBase(object):
     Object for generating ensembles of fits to pseudo-data generated according to the
     specified uncertainty model.
 
-    This is a purely abstract class implementing the minimal interface required by all
-    types of fit ensembles.
+    This is an abstract class implementing the functionality shared by all types of fit ensembles:
+    performing the pseudo-experiments (optionally in parallel worker processes and with reproducible
+    seeds), collecting or accumulating the result variables, writing them to disk and plotting them.
+    Derived classes create the toy fit and generate the pseudo-data for a batch of pseudo-experiments.
     """
 
     FIT_TYPE = None
+    EXCEPTION_TYPE = FitEnsembleException
+
+    # number of pseudo-experiments for which the pseudo-data is generated at once
+    _PSEUDODATA_BATCH_SIZE = 256
+    # number of histogram bins for result variables which are not stored
+    _HISTOGRAM_BINS = 51
+    # maximum number of pseudo-experiments per checkpoint when writing the results to disk
+    _STORAGE_CHUNK_SIZE = 1000
+    _STORAGE_MANIFEST_NAME = 'manifest.json'
+
+    AVAILABLE_STATISTICS = {
+        'mean': EnsembleVariable.mean,
+        'mean_error': EnsembleVariable.mean_error,
+        'std': EnsembleVariable.std,
+        'skew': EnsembleVariable.skew,
+        'kurtosis': EnsembleVariable.kurtosis,
+        'cor_mat': EnsembleVariable.cor_mat,
+        'cov_mat': EnsembleVariable.cov_mat,
+    }
+    _DEFAULT_STATISTICS = {'mean', 'std'}
+
+    def __init__(self, n_experiments, model_parameters, requested_results=None,
+                 store_results=True, storage_path=None):
+        """
+        Initialize the state shared by all fit ensembles. Derived classes set up everything needed by
+        :py:meth:`_create_toy_fit` before calling this.
+
+        :param n_experiments: number of pseudoexperiments to perform
+        :type n_experiments: int
+        :param model_parameters: parameters of the "true" model
+        :type model_parameters: iterable of float
+        :param requested_results: list of result variables to collect for each toy fit
+        :type requested_results: iterable of str
+        :param store_results: if ``False``, do not store the result variables of each toy fit. Only their
+                              statistics and histograms for plotting are accumulated, so that the memory
+                              needed does not depend on the number of pseudo-experiments.
+        :type store_results: bool
+        :param storage_path: if not ``None``, write the result variables to ``.npy`` files in this directory
+                             as the pseudo-experiments are completed, so that interrupted runs can be resumed
+                             (see :py:meth:`run`) and ensembles larger than the memory can be generated.
+        :type storage_path: str or None
+        """
+        self._store_results = store_results
+        self._storage_path = storage_path
+        self._storage_arrays = None  # memory-mapped result arrays while running
+        self._storage_manifest = None
+        self._n_exp = n_experiments
+        self._model_parameters = np.asarray(model_parameters, dtype=float)
+        self._n_par = len(self._model_parameters)
+
+        # initialize Fit object used for fitting the pseudo-data
+        self._toy_fit = self._create_toy_fit()
+
+        # set the model parameters of the toy fit to the reference values
+        self._set_toy_fit_parameters_to_reference()
+
+        # get reference quantities (data, covariance matrices...) from toy fit
+        self._update_reference_quantities_from_toy_fit()
+
+        # store and validate names of requested ensemble variables
+        self._requested_results = requested_results
+        if self._requested_results is None:
+            self._requested_results = self._DEFAULT_RESULTS
+        else:
+            # validate list of results requested by user
+            _unavailable_results = set(self._requested_results) - set(self.AVAILABLE_RESULTS.keys())
+            if _unavailable_results:
+                raise ValueError("Requested unavailable result variable(s): %r"
+                                 % (_unavailable_results,))
+
+        # initialize `EnsembleVariable` objects to store ensembles
+        self._initialize_ensemble_variables()
+
+    # -- private methods
+
+    @abc.abstractmethod
+    def _create_toy_fit(self):
+        """create the fit object used for fitting the pseudo-data, initialized with the reference data"""
+        pass
+
+    @abc.abstractmethod
+    def _update_reference_quantities_from_toy_fit(self):
+        """calculate the quantities needed for generating pseudo-data (reference data, covariance matrices...)"""
+        pass
+
+    @abc.abstractmethod
+    def _generate_pseudodata_batch(self, seed_sequences):
+        """Generate pseudo-data for a batch of pseudo-experiments, one per seed sequence. If the seed sequences
+        are ``None``, the global random state is used. Returns a tuple of arrays with one row per
+        pseudo-experiment, which are passed to :py:meth:`_set_toy_fit_data` row by row."""
+        pass
+
+    @abc.abstractmethod
+    def _set_toy_fit_data(self, *data):
+        """commit pseudo-data to the toy fit data container"""
+        pass
+
+    def _set_toy_fit_parameters_to_reference(self):
+        """set the model parameters of the toy fit to the reference values"""
+        self._toy_fit.set_all_parameter_values(self._model_parameters)
+
+    @staticmethod
+    def _draw_random_batch(seed_sequences, draw):
+        """Draw random values for a batch of pseudo-experiments. **draw** is called with a random state
+        (either :py:mod:`numpy.random` or a :py:obj:`numpy.random.Generator`) and a number of
+        pseudo-experiments and returns an array with one row per pseudo-experiment. If the seed
+        sequences are ``None``, the global random state is used for the whole batch. Otherwise each
+        pseudo-experiment draws from its own random stream."""
+        if all(_seed_sequence is None for _seed_sequence in seed_sequences):
+            return draw(np.random, len(seed_sequences))
+        return np.concatenate([
+            draw(np.random.Generator(np.random.PCG64(_seed_sequence)), 1)
+            for _seed_sequence in seed_sequences
+        ])
+
+    def _do_pseudoexperiments(self, seed_sequences, accumulate=False):
+        """Perform one pseudo-experiment per seed sequence and return the requested result variables,
+        either as arrays with one row per pseudo-experiment or, if **accumulate** is ``True``, as
+        accumulating :py:obj:`EnsembleVariable` objects to be merged.
+        If the seed sequences are ``None``, the global random state is used."""
+        if not accumulate:
+            _results = {_var_name: [] for _var_name in self._requested_results}
+        else:
+            _results = {_var_name: self._ensemble_variables[_var_name].empty_copy()
+                        for _var_name in self._requested_results}
+        for _batch_start in six.moves.range(0, len(seed_sequences), self._PSEUDODATA_BATCH_SIZE):
+            _data_batch = self._generate_pseudodata_batch(
+                seed_sequences[_batch_start:_batch_start + self._PSEUDODATA_BATCH_SIZE])
+            for _var_name, _values in six.iteritems(self._get_batch_results(_data_batch)):
+                if not accumulate:
+                    _results[_var_name].append(_values)
+                else:
+                    _results[_var_name].add_values(_values)
+        if not accumulate:
+            return {_var_name: np.concatenate(_values) for _var_name, _values in six.iteritems(_results)}
+        return _results
+
+    def _get_batch_results(self, data_batch):
+        """Fit the pseudo-data of a batch of pseudo-experiments, as returned by
+        :py:meth:`_generate_pseudodata_batch`, and return the requested result variables as arrays
+        with one row per pseudo-experiment."""
+        _batch_results = {_var_name: [] for _var_name in self._requested_results}
+        for _data in zip(*data_batch):
+            # start each fit from the reference values so that the result does not depend on previous fits
+            self._toy_fit.set_all_parameter_values(self._model_parameters)
+            self._set_toy_fit_data(*_data)
+            self._do_toy_fit()
+            for _var_name in self._requested_results:
+                _batch_results[_var_name].append(np.array(self._get_var(_var_name)))
+        return {_var_name: np.array(_values) for _var_name, _values in six.iteritems(_batch_results)}
+
+    def _do_toy_fit(self):
+        """run fit with current pseudo-data"""
+        self._toy_fit.do_fit()
+
+    def _get_var(self, var_name):
+        """get the value of the result variables for the current fit"""
+        return self.AVAILABLE_RESULTS[var_name].fget(self)
+
+    def _add_ensemble_variable(self, name, variable_shape, distribution, distribution_parameters,
+                               value_ranges, variable_labels):
+        """create an `EnsembleVariable` for a result variable and the corresponding plotter"""
+        if self._store_results and self._storage_path is None:
+            _variable = EnsembleVariable(
+                ensemble_array=np.zeros((self._n_exp,) + variable_shape),
+                distribution=distribution,
+                distribution_parameters=distribution_parameters
+            )
+        else:
+            # accumulate statistics and histograms for plotting instead of storing all values
+            _variable = EnsembleVariable(
+                variable_shape=variable_shape,
+                distribution=distribution,
+                distribution_parameters=distribution_parameters,
+                histogram_bins=self._HISTOGRAM_BINS,
+                histogram_ranges=value_ranges
+            )
+        self._ensemble_variables[name] = _variable
+        self._ensemble_variable_plotters[name] = EnsembleVariablePlotter(
+            ensemble_variable=_variable,
+            value_ranges=value_ranges,
+            variable_labels=variable_labels
+        )
+
+    def _initialize_ensemble_variables(self):
+        self._ensemble_variables = {}
+        self._ensemble_variable_plotters = {}
+        if 'parameter_pulls' in self._requested_results:
+            self._add_ensemble_variable(
+                'parameter_pulls',
+                variable_shape=(self._n_par,),
+                distribution=scipy.stats.norm,
+                distribution_parameters=dict(loc=0, scale=1),
+                value_ranges=(-3, 3),
+                variable_labels=["Pull ${}$".format(_arg_formatter.latex_name)
+                                 for _arg_formatter in self._toy_fit._model_function.formatter.arg_formatters]
+            )
+
+        if 'cost' in self._requested_results:
+            self._add_ensemble_variable(
+                'cost',
+                variable_shape=(),
+                distribution=scipy.stats.chi2,  # FIXME: assume chi2 for all cost functions -> change
+                distribution_parameters=dict(loc=0, df=self.n_df),
+                value_ranges=(0, 3*self.n_df),
+                variable_labels="${}$".format(self._toy_fit._cost_function.formatter.latex_name)
+            )
+
+    def _make_figure_gs(self, figsize=(8, 8), nrows=1, ncols=1,
+                        left=0.1, bottom=0.1,
+                        right=0.9, top=0.9):
+        """create a new matplotlib figure with a GridSpec controlling the subplot layout"""
+        _fig = plt.figure(figsize=figsize)  # defaults from matplotlibrc
+        _gs = gs.GridSpec(nrows=nrows,
+                          ncols=ncols,
+                          left=left,
+                          bottom=bottom,
+                          right=right,
+                          top=top,
+                          wspace=None,
+                          hspace=None,
+                          height_ratios=None)
+        return _fig, _gs
+
+    def _get_config_arrays(self):
+        """arrays defining the ensemble configuration, see :py:meth:`_get_config_hash`"""
+        return [self._model_parameters]
+
+    def _get_config_description(self):
+        """other settings defining the ensemble configuration, see :py:meth:`_get_config_hash`"""
+        _model_function = self._toy_fit._model_function.func
+        return (self.n_exp, sorted(self._requested_results),
+                getattr(_model_function, '__name__', str(_model_function)),
+                type(self._toy_fit._cost_function).__name__)
+
+    def _get_config_hash(self):
+        """hash of the ensemble configuration, used to check if stored results can be resumed"""
+        _hash = hashlib.sha256()
+        for _array in self._get_config_arrays():
+            _hash.update(np.ascontiguousarray(_array, dtype=float).tobytes())
+        _hash.update(repr(self._get_config_description()).encode('utf-8'))
+        return _hash.hexdigest()
+
+    def _get_storage_file_path(self, file_name):
+        return os.path.join(self._storage_path, file_name)
+
+    def _read_storage_manifest(self):
+        """read the manifest of the stored results, ``None`` if there are no stored results"""
+        _manifest_path = self._get_storage_file_path(self._STORAGE_MANIFEST_NAME)
+        if not os.path.exists(_manifest_path):
+            return None
+        with open(_manifest_path, 'r') as _file:
+            return json.load(_file)
+
+    def _write_storage_manifest(self, manifest):
+        """replace the manifest atomically so that it is consistent if the run is interrupted"""
+        _manifest_path = self._get_storage_file_path(self._STORAGE_MANIFEST_NAME)
+        with open(_manifest_path + '.tmp', 'w') as _file:
+            json.dump(manifest, _file)
+        getattr(os, 'replace', os.rename)(_manifest_path + '.tmp', _manifest_path)
+
+    def _open_storage(self, seed, resume, chunk_size):
+        """Create the storage for the results or open it for resuming a run. Returns the manifest."""
+        seed = _get_json_seed(seed)
+        _manifest = self._read_storage_manifest()
+        if _manifest is not None:
+            if not resume:
+                raise self.EXCEPTION_TYPE("Results are already stored in '%s': pass `resume=True` to resume the "
+                                          "run or choose a different storage path!" % (self._storage_path,))
+            if _manifest['config_hash'] != self._get_config_hash():
+                raise self.EXCEPTION_TYPE("Cannot resume run: the results in '%s' were generated with a "
+                                          "different ensemble configuration!" % (self._storage_path,))
+            if seed is not None and seed != _manifest['seed']:
+                raise self.EXCEPTION_TYPE("Cannot resume run: the results in '%s' were generated with seed "
+                                          "%r!" % (self._storage_path, _manifest['seed']))
+            _mode = 'r+'
+        else:
+            if seed is None:
+                seed = np.random.SeedSequence().entropy
+            if not os.path.isdir(self._storage_path):
+                os.makedirs(self._storage_path)
+            _manifest = dict(seed=seed, config_hash=self._get_config_hash(), n_experiments=self.n_exp,
+                             chunk_size=chunk_size, results=sorted(self._requested_results), completed=[])
+            # write the manifest first so that a failure does not leave result files without a manifest
+            self._write_storage_manifest(_manifest)
+            _mode = 'w+'
+        self._storage_arrays = {
+            _var_name: np.lib.format.open_memmap(
+                self._get_storage_file_path(_var_name + '.npy'), mode=_mode, dtype=float,
+                shape=(self.n_exp,) + self._ensemble_variables[_var_name].shape)
+            for _var_name in self._requested_results
+        }
+        self._storage_manifest = _manifest
+        return _manifest
+
+    def _write_to_storage(self, start, chunk_results):
+        """write the results of a chunk of pseudo-experiments to disk and record them as completed"""
+        _stop = start
+        for _var_name, _values in six.iteritems(chunk_results):
+            _array = self._storage_arrays[_var_name]
+            _stop = start + len(_values)
+            _array[start:_stop] = _values
+            _array.flush()
+        self._storage_manifest['completed'] = _add_range(self._storage_manifest['completed'], start, _stop)
+        self._write_storage_manifest(self._storage_manifest)
+
+    def _read_results_from_storage(self, var_name):
+        """read the completed results of a variable from disk without loading them into memory"""
+        _manifest = self._read_storage_manifest()
+        if _manifest is None or var_name not in _manifest['results']:
+            raise FitEnsembleException("Cannot retrieve result '{}': no results stored "
+                                       "in '{}'!".format(var_name, self._storage_path))
+        _array = np.load(self._get_storage_file_path(var_name + '.npy'), mmap_mode='r')
+        _completed = _manifest['completed']
+        if len(_completed) == 1 and _completed[0][0] == 0:
+            return _array[:_completed[0][1]]
+        if not _completed:
+            return _array[:0]
+        return np.concatenate([_array[_start:_stop] for _start, _stop in _completed])
+
+    def _load_results_from_storage(self):
+        """accumulate the statistics and histograms of the completed results stored on disk"""
+        self._initialize_ensemble_variables()
+        _manifest = self._read_storage_manifest()
+        if _manifest is None:
+            return
+        for _var_name in self._requested_results:
+            _array = np.load(self._get_storage_file_path(_var_name + '.npy'), mmap_mode='r')
+            for _start, _stop in _manifest['completed']:
+                for _chunk_start in six.moves.range(_start, _stop, self._STORAGE_CHUNK_SIZE):
+                    _chunk_stop = min(_chunk_start + self._STORAGE_CHUNK_SIZE, _stop)
+                    self._ensemble_variables[_var_name].add_values(np.asarray(_array[_chunk_start:_chunk_stop]))
+
+    # -- private properties
+
+    @property
+    def _parameter_pulls(self):
+        """property for ensemble variable 'parameter_pulls'"""
+        return (self._toy_fit.parameter_values - self._model_parameters)/self._toy_fit.parameter_errors
+
+    @property
+    def _cost(self):
+        """property for ensemble variable 'cost'"""
+        return self._toy_fit.cost_function_value
+
+    # -- public properties
+
+    @property
+    def n_exp(self):
+        """the number of pseudo-experiments to perform"""
+        return self._n_exp
+
+    @property
+    def n_par(self):
+        """the number of parameters"""
+        return self._n_par
+
+    @property
+    def n_dat(self):
+        """the number of data points"""
+        return self._toy_fit.data_container.size
+
+    @property
+    def n_df(self):
+        """the number of degrees of freedom for the fit"""
+        # FIXME: not generally true -> update to handle constrained parameters
+        # TODO: not applicable for all cost functions -> find a flexible solution
+        return self.n_dat - self.n_par
+
+    # -- public methods
+
+    def run(self, n_jobs=None, seed=None, resume=False):
+        """
+        Perform the pseudo-experiments. Retrieve and store the requested fit result variables.
+
+        If a **seed** is given, each pseudo-experiment draws its pseudo-data from its own random stream,
+        spawned from a :py:obj:`numpy.random.SeedSequence`. The results are then reproducible and do not
+        depend on the number of worker processes. Without a seed, the pseudo-data for sequential runs is
+        drawn from the global :py:mod:`numpy.random` state.
+
+        The pseudo-experiments can be split across **n_jobs** worker processes. Each worker process gets
+        a copy of the toy fit by forking the current process. If forking is not available on the
+        platform, the pseudo-experiments are performed sequentially.
+
+        If a storage path was specified, the results are written to disk in chunks of pseudo-experiments.
+        A manifest records the seed (a random one is drawn if no seed is given), a hash of the ensemble
+        configuration and the completed ranges of pseudo-experiments. With **resume**, an interrupted run
+        continues with the pseudo-experiments which have not been completed.
+
+        :param n_jobs: number of worker processes (if ``None`` or ``1``, run in the current process,
+                       if ``-1``, use one worker process per CPU)
+        :type n_jobs: int or None
+        :param seed: seed for generating the pseudo-data
+        :type seed: int, sequence of int or None
+        :param resume: if ``True``, resume the run whose results are in the storage path
+        :type resume: bool
+        """
+        if n_jobs == -1:
+            n_jobs = multiprocessing.cpu_count()
+        if n_jobs is not None and n_jobs < 1:
+            raise self.EXCEPTION_TYPE("Number of jobs must be a positive integer or -1: %r" % (n_jobs,))
+        if resume and self._storage_path is None:
+            raise self.EXCEPTION_TYPE("Cannot resume run: no storage path specified!")
+        _parallel = n_jobs is not None and n_jobs > 1 and self.n_exp > 1
+        _accumulate = not self._store_results and self._storage_path is None
+
+        self._set_toy_fit_parameters_to_reference()
+        self._update_reference_quantities_from_toy_fit()
+        self._initialize_ensemble_variables()
+
+        if self._storage_path is not None:
+            _chunk_size = self._STORAGE_CHUNK_SIZE
+            if _parallel:
+                # several contiguous chunks per worker even out differences in fit duration
+                _chunk_size = min(_chunk_size, -(-self.n_exp // (4 * n_jobs)))
+            _manifest = self._open_storage(seed=seed, resume=resume, chunk_size=_chunk_size)
+            seed = _manifest['seed']
+            _chunk_size = _manifest['chunk_size']
+            _ranges = [(_start, min(_start + _chunk_size, self.n_exp))
+                       for _start in six.moves.range(0, self.n_exp, _chunk_size)]
+            # skip the completed chunks
+            _ranges = [(_start, _stop) for _start, _stop in _ranges
+                       if not any(_done_start <= _start and _stop <= _done_stop
+                                  for _done_start, _done_stop in _manifest['completed'])]
+        elif _parallel:
+            # several contiguous chunks per worker even out differences in fit duration
+            _chunk_starts = [_chunk[0] for _chunk in
+                             np.array_split(np.arange(self.n_exp), min(4 * n_jobs, self.n_exp))]
+            _ranges = list(zip(_chunk_starts, _chunk_starts[1:] + [self.n_exp]))
+        else:
+            _ranges = [(0, self.n_exp)]
+
+        if seed is None and not _parallel:
+            _seed_sequences = [None] * self.n_exp
+        elif not hasattr(np.random, 'SeedSequence'):
+            raise self.EXCEPTION_TYPE("Seeded or parallel runs require numpy>=1.17!")
+        else:
+            # the workers must not share the global random state
+            _seed_sequences = np.random.SeedSequence(seed).spawn(self.n_exp)
+        _tasks = [(_start, _seed_sequences[_start:_stop], _accumulate) for _start, _stop in _ranges]
+
+        _fork_context = _get_fork_context() if _parallel else None
+        if _parallel and _fork_context is None:
+            warnings.warn("Cannot fork worker processes on this platform: performing pseudo-experiments "
+                          "sequentially.")
+        global _WORKER_ENSEMBLE
+        _WORKER_ENSEMBLE = self
+        _pool = _fork_context.Pool(n_jobs) if _fork_context is not None else None
+        try:
+            if _pool is None:
+                _results = six.moves.map(_do_pseudoexperiments_in_worker, _tasks)
+            else:
+                _results = _pool.imap(_do_pseudoexperiments_in_worker, _tasks)
+            # gather the results in the order of the pseudo-experiments as they are completed
+            for _start, _chunk_results in _results:
+                if self._storage_path is not None:
+                    self._write_to_storage(_start, _chunk_results)
+                    continue
+                for _var_name, _values in six.iteritems(_chunk_results):
+                    if _accumulate:
+                        self._ensemble_variables[_var_name].merge(_values)
+                    else:
+                        self._ensemble_variables[_var_name].set_value(index=slice(_start, _start + len(_values)),
+                                                                      variable_value=_values)
+        except BaseException:
+            if _pool is not None:
+                # don't wait for the remaining pseudo-experiments, e.g. after a keyboard interrupt
+                _pool.terminate()
+                _pool.join()
+                _pool = None
+            raise
+        finally:
+            if _pool is not None:
+                _pool.close()
+                _pool.join()
+            _WORKER_ENSEMBLE = None
+            self._storage_arrays = None
+
+        if self._storage_path is not None:
+            self._load_results_from_storage()
+
+    def get_results(self, *results):
+        """
+        Return a dictionary containing the ensembles of result variables.
+
+        :param results: names of result variables to retrieve
+        :type results: iterable of str. Calling without arguments retrieves *all* collected results.
+        :return: dict
+        """
+        if not results:
+            results = self._requested_results
+        else:
+            # validate list of results requested by user
+            _unavailable_results = set(self._requested_results) - set(self.AVAILABLE_RESULTS.keys())
+            if _unavailable_results:
+                raise ValueError("Requested unavailable result variable(s): %r"
+                                 % (_unavailable_results,))
+
+        _dict_to_return = dict()
+        for _result_name in results:
+            _var = self._ensemble_variables.get(_result_name, None)
+            if _var is None:
+                raise FitEnsembleException("Cannot retrieve result '{}': "
+                                           "variable not collected!".format(_result_name))
+            if self._storage_path is not None:
+                # read lazily from disk, including the results of runs which are still in progress
+                _dict_to_return[_result_name] = self._read_results_from_storage(_result_name)
+            else:
+                _dict_to_return[_result_name] = _var.values
+
+        return _dict_to_return
+
+    def get_results_statistics(self, results='all', statistics='all'):
+        """
+        Return a dictionary containing statistics (e.g. mean) of the result variables.
+
+        :param results: names of retrieved fit variable for which to return statistics
+        :type results: iterable of str or ``'all'`` (get statistics for all retrieved variables)
+        :param statistics: names of statistics to retrieve for each result variable
+        :type statistics: iterable of str or ``'all'`` (get all statistics for each retrieved variable)
+        :return: dict
+        """
+        if results == 'all':
+            results = self._requested_results
+
+        if statistics == 'all':
+            statistics = self.__class__._DEFAULT_STATISTICS
+
+        if self._storage_path is not None:
+            self._load_results_from_storage()
+
+        _dict_to_return = dict()
+        for _result_name in results:
+            #_result_array = self._result_array_dicts.get(_result_name, None)
+            _result_variable = self._ensemble_variables.get(_result_name, None)
+            if _result_variable is None:
+                raise FitEnsembleException("Cannot retrieve statistics for result "
+                                           "variable '{}': variable not collected!".format(_result_name))
+
+            _current_result_dict = _dict_to_return[_result_name] = dict()
+
+            # calculate and store statistics
+            for _stat_name in statistics:
+                _stat_unbound_method = self.__class__.AVAILABLE_STATISTICS.get(_stat_name, None)
+                if _stat_unbound_method is None:
+                    raise FitEnsembleException(
+                        "Unknown statistic '%s' requested!" % (_stat_name,))
+                _stat = _stat_unbound_method.__get__(_result_variable, EnsembleVariable)
+                _current_result_dict[_stat_name] = _stat
+
+        return _dict_to_return
+
+    def plot_result_distributions(self, results='all',
+                                  show_legend=True):
+        """
+        Make plots with histograms of the requested fit variable values across all pseudo-experiments.
+
+        :param results: names of retrieved fit variable for which to generate plots
+        :type results: iterable of str or ``'all'`` (make plots for all retrieved variables)
+        :param show_legend: if ``True``, show a plot legend on each figure
+        :type show_legend: bool
+        """
+        if results == 'all':
+            results = self._requested_results
+        else:
+            # validate list of results requested by user
+            _unavailable_results = set(self._requested_results) - set(self.AVAILABLE_RESULTS.keys())
+            if _unavailable_results:
+                raise ValueError("Requested unavailable result variable(s): %r"
+                                 % (_unavailable_results,))
+
+        if self._storage_path is not None:
+            self._load_results_from_storage()
+
+        for _result_name in results:
+            _result_variable = self._ensemble_variables.get(_result_name, None)
+
+            if _result_variable is None:
+                raise FitEnsembleException("Cannot plot result for variable '%s': "
+                                           "variable not collected!" % (_result_name,))
+
+            _result_variable_plotter = self._ensemble_variable_plotters.get(_result_name, None)
+
+            if _result_variable_plotter is None:
+                raise FitEnsembleException("Cannot plot result for variable '%s': "
+                                           "no plotter defined!" % (_result_name,))
+
+            # -- decide how to lay out plots depending on the result variable dimensionality
+            if _result_variable.ndim == 0:
+                # if the ensemble variable is a scalar,
+                # plot it into a single `Axes` object
+                _fig, _gs = self._make_figure_gs(figsize=(8, 8), nrows=1, ncols=1)
+                _ax = plt.subplot(_gs[0, 0])
+                # call the plotting routine on the axes grid
+                _plot_result_dict = _result_variable_plotter.plot_hist(_ax)
+
+            elif _result_variable.ndim == 1:
+                # if the ensemble variable is a one-dimensional vector,
+                # plot each entry into a separate `Axes` object and display
+                # them in a grid-like layout
+                _nplots = int(_result_variable.shape[0])
+                _nrows, _ncols = _heuristic_optimal_subplot_grid_size(_nplots, aspect_ratio_priority=0.8)
+                _fig, _gs = self._make_figure_gs(figsize=(8, 8), nrows=_nrows, ncols=_ncols)
+
+                # create an array 'a' with a[i, j] = [i, j]
+                _axes_grid = np.dstack((np.meshgrid(np.arange(_nrows), np.arange(_ncols))))
+                # replace [i, j] by the `Axes` object for _gs[i, j] -> array of `Axes`
+                _axes_grid = np.apply_along_axis(
+                    lambda irow_icol: plt.subplot(_gs[irow_icol[0], irow_icol[1]]) if irow_icol[0]*_ncols+irow_icol[1] < _nplots else None,
+                    -1, _axes_grid)
+                # reshape the `Axes` array to match the variable shape
+                _axes_grid = _axes_grid.T.flatten()[:_result_variable.shape[0]]
+                # call the plotting routine on the axes grid
+                _plot_result_dict = _result_variable_plotter.plot_hist(_axes_grid)
+
+            elif _result_variable.ndim == 2:
+                # if the ensemble variable is a two-dimensional vector,
+                # plot the (i,j)-th entry into a an `Axes` object at the
+                # (i,j)-th position in a grid
+
+                _nrows = _result_variable.shape[0]
+                _ncols = _result_variable.shape[1]
+
+                _fig, _gs = self._make_figure_gs(figsize=(8, 8), nrows=_nrows, ncols=_ncols)
+
+                # create an array 'a' with a[i, j] = [i, j]
+                _axes_grid = np.dstack(reversed(np.meshgrid(np.arange(_nrows), np.arange(_ncols))))
+                # replace [i, j] by the `Axes` object for _gs[i, j] -> array of `Axes`
+                _axes_grid = np.apply_along_axis(
+                    lambda irow_icol: plt.subplot(_gs[irow_icol[0], irow_icol[1]]),
+                    -1, _axes_grid)
+                # do not reshape _axes_grid -> its shape already matches variable shape
+
+                # call the plotting routine on the axes grid
+                _plot_result_dict = _result_variable_plotter.plot_hist(_axes_grid)
+            else:
+                # cannot plot variables with 3 or more dimensions...
+                raise FitEnsembleException("Cannot plot result for variable '%s': variable entry dimensionality "
+                                           "too high (%d)!" % (_result_name, _result_variable.ndim))
+
+            if show_legend:
+                _fig.legend(_plot_result_dict['legend_handles'],
+                            _plot_result_dict['legend_labels'], loc='lower center')
+                # add extra space at figure bottom for legend
+                _figure_extra_bottom = 0.05 * len(_plot_result_dict['legend_labels'])
+            else:
+                # no extra space at figure bottom
+                _figure_extra_bottom = 0.0
+
+            _fig.canvas.manager.set_window_title(_result_name)
+
+            _gs.tight_layout(_fig,
+                             pad=0.0, w_pad=0, h_pad=-0.2,
+                             rect=(0.01, 0.02+_figure_extra_bottom, 0.98, 0.98))
+
+        return _plot_result_dict
+
+    def plot_result_scatter(self, results='all',
+                                  show_legend=True):
+        """
+        Make plots with histograms of the requested fit variable values across all pseudo-experiments.
+
+        :param results: names of retrieved fit variable for which to generate plots
+        :type results: iterable of str or ``'all'`` (make plots for all retrieved variables)
+        :param show_legend: if ``True``, show a plot legend on each figure
+        :type show_legend: bool
+        """
+        if results == 'all':
+            results = self._requested_results
+        else:
+            # validate list of results requested by user
+            _unavailable_results = set(self._requested_results) - set(self.AVAILABLE_RESULTS.keys())
+            if _unavailable_results:
+                raise ValueError("Requested unavailable result variable(s): %r"
+                                 % (_unavailable_results,))
+
+        if not self._store_results and self._storage_path is None:
+            raise self.EXCEPTION_TYPE("Cannot create scatter plots: the results of the individual "
+                                         "pseudo-experiments are not kept with `store_results=False`!")
+
+        if self._storage_path is not None:
+            self._load_results_from_storage()
+
+        for _result_name in results:
+            _result_variable = self._ensemble_variables.get(_result_name, None)
+
+            if _result_variable is None:
+                raise FitEnsembleException("Cannot plot result for variable '%s': "
+                                           "variable not collected!" % (_result_name,))
+
+            _result_variable_plotter = self._ensemble_variable_plotters.get(_result_name, None)
+
+            if _result_variable_plotter is None:
+                raise FitEnsembleException("Cannot plot result for variable '%s': "
+                                           "no plotter defined!" % (_result_name,))
+
+            # -- decide how to lay out plots depending on the result variable dimensionality
+            if _result_variable.ndim != 1:
+                raise ValueError()
+
+            # if the ensemble variable is a one-dimensional vector,
+            # plot each entry into a separate `Axes` object and display
+            # them in a grid-like layout
+            _nrows = _ncols = int(_result_variable.shape[0])
+            if _nrows <= 1:
+                raise FitEnsembleException("Cannot create scatter plot for result variable '%s': "
+                                           "vector has less than two entries!" % (_result_name,))
+            _fig, _gs = self._make_figure_gs(figsize=(8, 8), nrows=_nrows-1, ncols=_ncols-1)
+
+            # create an array 'a' with a[i, j] = [i, j]
+            _axes_grid = np.dstack((np.meshgrid(np.arange(_nrows), np.arange(_ncols))))
+            # replace [i, j] by the `Axes` object for _gs[i, j] -> array of `Axes`
+            _axes_grid = np.apply_along_axis(
+                lambda irow_icol: plt.subplot(_gs[irow_icol[0] - 1, irow_icol[1]]) if irow_icol[0] > irow_icol[1] else None,
+                -1, _axes_grid)
+
+            _values = None
+            if self._storage_path is not None:
+                # the values are not kept in memory -> read them from disk
+                _values = self._read_results_from_storage(_result_name)
+
+            # call the plotting routine on the axes grid
+            _plot_result_dict = _result_variable_plotter.plot_scatter(_axes_grid, values=_values)
+
+            if show_legend:
+                _fig.legend(_plot_result_dict['legend_handles'],
+                            _plot_result_dict['legend_labels'], loc='lower center')
+                # add extra space at figure bottom for legend
+                _figure_extra_bottom = 0.05 * len(_plot_result_dict['legend_labels'])
+            else:
+                # no extra space at figure bottom
+                _figure_extra_bottom = 0.0
+
+            _fig.canvas.manager.set_window_title(_result_name)
+
+            _gs.tight_layout(_fig,
+                             pad=0.0, w_pad=0, h_pad=-0.2,
+                             rect=(0.01, 0.02+_figure_extra_bottom, 0.98, 0.98))
+
+        return _plot_result_dict
+
+    AVAILABLE_RESULTS = {
+        'parameter_pulls': _parameter_pulls,
+        'cost': _cost,
+    }
+    _DEFAULT_RESULTS = {'parameter_pulls', 'cost'}
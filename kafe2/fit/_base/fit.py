@@ -13,7 +13,7 @@ from ...config import kc
 from ...core.fitters.nexus import Nexus, NexusError, Parameter
 from ...core.fitters.nexus_fitter import NexusFitter
 from ...core.constraint import GaussianMatrixParameterConstraint, GaussianSimpleParameterConstraint
-from ...core.error import CovMat
+from ...core.error import CovMat, add_cov_mats
 from ...tools import print_dict_as_table
 from .._base.cost import CostFunction, STRING_TO_COST_FUNCTION
 from ..util import invert_matrix, add_in_quadrature
@@ -65,6 +65,7 @@ class FitBase(FileIOMixin, object):
         self._fit_param_names = []  # names of all fit parameters
         self._fit_param_constraints = []
         self._loaded_result_dict = None  # contains potential fit results from a file or multifit
+        self._model_cache_settings = None  # (max_entries, max_bytes) if the model cache is enabled
 
         # save minimizer, minimizer_kwargs for serialization
         self._minimizer = minimizer
@@ -350,8 +351,26 @@ class FitBase(FileIOMixin, object):
             for _fpf, _ape in zip(self._get_model_function_parameter_formatters(), self.asymmetric_parameter_errors):
                 _fpf.asymmetric_error = _ape
 
+    def _sync_sparse_errors(self):
+        """Let data container and parametric model use sparse matrices if either of them has sparse errors.
+
+        :return: :py:obj:`True` if the setting changed for any of them.
+        :rtype: bool
+        """
+        if self._data_container is None or self._param_model is None:
+            return False
+        _sparse = self._data_container.has_sparse_errors or self._param_model.has_sparse_errors
+        _changed = False
+        for _container in (self._data_container, self._param_model):
+            if _container._sparse_errors != _sparse:
+                _container._sparse_errors = _sparse
+                _container._clear_total_error_cache()
+                _changed = True
+        return _changed
+
     def _on_error_change(self):
         """Mark all error nodes in :py:attr:`~_BASIC_ERROR_NAMES` for updates in the nexus."""
+        self._sync_sparse_errors()
         self._fitter.reset_minimizer()
         for _error_name in self._BASIC_ERROR_NAMES:
             self._nexus.get(_error_name).mark_for_update()
@@ -412,6 +431,9 @@ class FitBase(FileIOMixin, object):
             raise self.EXCEPTION_TYPE('Fit data and cost function are not compatible: %s' % _reason)
         self._set_new_parametric_model()
         self._param_model._on_error_change_callbacks = [self._on_error_change]
+        if self._model_cache_settings is not None:
+            self._param_model.set_model_cache(*self._model_cache_settings)
+        self._sync_sparse_errors()
 
     @property
     def data_error(self):
@@ -478,17 +500,26 @@ class FitBase(FileIOMixin, object):
     @property
     def total_cov_mat(self):
         """the total covariance matrix"""
-        return self.data_cov_mat + self.model_cov_mat
+        return add_cov_mats(self.data_cov_mat, self.model_cov_mat)
 
     @property
     def total_cov_mat_inverse(self):
         """inverse of the total covariance matrix (or ``None`` if singular)"""
-        return invert_matrix(self.total_cov_mat)
+        # reuse the cached inverse of the data or model errors if only one of them contributes,
+        # e.g. the rescaled inverse of relative model errors
+        _inverse = None
+        if not self.has_model_errors:
+            _inverse = self.data_cov_mat_inverse
+        elif not self.has_data_errors:
+            _inverse = self.model_cov_mat_inverse
+        if _inverse is None:
+            _inverse = invert_matrix(self.total_cov_mat)
+        return _inverse
 
     @property
     def total_cor_mat(self):
         """the total correlation matrix"""
-        return CovMat(self.total_cov_mat).cor_mat
+        return CovMat(self.total_cov_mat, check_symmetry=False).cor_mat
 
     @property
     def model_function(self):
@@ -694,6 +725,21 @@ class FitBase(FileIOMixin, object):
         """
         return self._fitter.set_all_fit_parameter_values(param_value_list)
 
+    def set_model_cache(self, max_entries=128, max_bytes=64 * 2**20):
+        """Cache the model values for previously evaluated parameter values instead of recalculating them.
+        This speeds up profiles, contours and repeated fits with expensive model functions.
+
+        :param int max_entries: Maximum number of cached model value arrays. ``0`` disables the cache.
+        :param int max_bytes: Maximum memory used by the cached model values in bytes.
+        """
+        self._model_cache_settings = (max_entries, max_bytes) if max_entries else None
+        self._param_model.set_model_cache(max_entries=max_entries, max_bytes=max_bytes)
+
+    @property
+    def model_cache_info(self):
+        """Hit/miss statistics of the model cache as a :py:obj:`dict`."""
+        return self._param_model.model_cache_info
+
     def fix_parameter(self, name, value=None):
         """Fix a parameter so that its value doesn't change when calling :py:meth:`~do_fit()`.
 
@@ -888,7 +934,7 @@ class FitBase(FileIOMixin, object):
                          name=None, err_val=None, relative=False, reference='data', **kwargs):
         """Add a matrix uncertainty source for use in the fit.
 
-        :param err_matrix: covariance or correlation matrix
+        :param err_matrix: covariance or correlation matrix. :py:mod:`scipy.sparse` matrices are kept sparse.
         :param matrix_type: One of ``'covariance'``/``'cov'`` or ``'correlation'``/``'cor'``
         :type matrix_type: str
         :param name: Unique name for this uncertainty source. If :py:obj:`None`, the name of the error source will be
@@ -919,6 +965,8 @@ class FitBase(FileIOMixin, object):
 
         _ret = _reference_object.add_matrix_error(err_matrix=err_matrix, matrix_type=matrix_type,
                                                   name=name, err_val=err_val, relative=relative, **kwargs)
+        if self._sync_sparse_errors():
+            self._on_error_change()
 
         return _ret
 
@@ -80,6 +80,7 @@ class ModelFunctionBase(FileIOMixin, object):
         self._validate_model_function_raise()
         self._assign_function_formatter()
         self._source_code = None
+        self._derivative_by_x = None
         super(ModelFunctionBase, self).__init__()
 
     @classmethod
@@ -171,6 +172,25 @@ class ModelFunctionBase(FileIOMixin, object):
             return _pars[0]
         return _pars[0:self._independent_argcount]
 
+    @property
+    def derivative_by_x(self):
+        """Optional analytic derivative of the model function with respect to the independent variable.
+        It must accept the same arguments as the model function. If ``None``, the derivative is
+        calculated numerically where needed (e.g. for projecting *x* uncertainties onto the *y* axis)."""
+        return self._derivative_by_x
+
+    @derivative_by_x.setter
+    def derivative_by_x(self, derivative_function):
+        if derivative_function is not None:
+            if not callable(derivative_function):
+                raise self.__class__.EXCEPTION_TYPE(
+                    "Cannot use {} as model function derivative: object not callable!".format(derivative_function))
+            if self._independent_argcount != 1:
+                raise self.__class__.EXCEPTION_TYPE(
+                    "A derivative by x requires exactly one independent variable, the model function "
+                    "has {}!".format(self._independent_argcount))
+        self._derivative_by_x = derivative_function
+
     @property
     def formatter(self):
         """The :py:obj:`ModelFunctionFormatter`-derived object for this function"""
@@ -243,6 +263,8 @@ class ParametricModelBaseMixin(object):
     relevant data container (in that order).
     """
     MODEL_FUNCTION_TYPE = ModelFunctionBase
+    JACOBIAN_METHODS = ('forward', 'central', 'complex')
+    _JACOBIAN_RELATIVE_STEPS = dict(forward=np.sqrt(np.finfo(float).eps), central=1e-2, complex=1e-20)
 
     def __init__(self, model_func, model_parameters, *args, **kwargs):
         """
@@ -255,9 +277,117 @@ class ParametricModelBaseMixin(object):
             self._model_function_object = model_func
         else:
             self._model_function_object = self.MODEL_FUNCTION_TYPE(model_func)
+        self._model_function_broadcasts = None  # determined on first use
+        self._jacobian_cache = None
+        self._model_cache = OrderedDict()  # least recently used entries first
+        self._model_cache_max_entries = 0  # disabled by default
+        self._model_cache_max_bytes = 0
+        self._model_cache_bytes = 0
+        self._model_cache_hits = 0
+        self._model_cache_misses = 0
+        self._support_version = 0  # incremented whenever the support values (e.g. x) change
         self.parameters = model_parameters
         super(ParametricModelBaseMixin, self).__init__(*args, **kwargs)
 
+    def _get_cached_model_values(self, calculate):
+        """Look up the model values for the current parameters and support values in the model cache.
+        If they are not cached, they are calculated by calling **calculate** and added to the cache."""
+        if not self._model_cache_max_entries:
+            return calculate()
+        _key = (tuple(np.asarray(self._model_parameters, dtype=float).ravel()), self._support_version)
+        _values = self._model_cache.pop(_key, None)
+        if _values is not None:
+            self._model_cache[_key] = _values  # re-insert as most recently used
+            self._model_cache_hits += 1
+            return _values
+        self._model_cache_misses += 1
+        _values = np.array(calculate(), dtype=float)
+        _values.setflags(write=False)
+        self._model_cache[_key] = _values
+        self._model_cache_bytes += _values.nbytes
+        # evict least recently used entries, always keeping the newest one
+        while len(self._model_cache) > 1 and (
+                len(self._model_cache) > self._model_cache_max_entries
+                or self._model_cache_bytes > self._model_cache_max_bytes):
+            _, _evicted = self._model_cache.popitem(last=False)
+            self._model_cache_bytes -= _evicted.nbytes
+        return _values
+
+    def _on_support_change(self):
+        """Mark the model values as stale after the support values have changed."""
+        self._support_version += 1
+        self._pm_calculation_stale = True
+
+    def _eval_for_parameter_rows(self, func, par_matrix):
+        """Evaluate **func** for each row of **par_matrix**. If possible, this is done in a single call
+        by passing each parameter as a column vector and relying on numpy broadcasting. Whether the model
+        function supports this is checked against individual calls the first time."""
+        if self._model_function_broadcasts is not False:
+            try:
+                _values = np.asarray(func(*[_column[:, np.newaxis] for _column in par_matrix.T]))
+            except Exception:  # the model function may fail in any way for column vectors
+                _values = None
+            if self._model_function_broadcasts is None:
+                _first = np.asarray(func(*par_matrix[0]))
+                _last = np.asarray(func(*par_matrix[-1]))
+                self._model_function_broadcasts = (
+                    _values is not None and _values.shape == (len(par_matrix),) + _first.shape
+                    and np.allclose(_values[0], _first, equal_nan=True)
+                    and np.allclose(_values[-1], _last, equal_nan=True)
+                )
+            if self._model_function_broadcasts and _values is not None:
+                return _values
+        return np.array([func(*_pars) for _pars in par_matrix])
+
+    def _eval_jacobian(self, func, model_parameters, par_dx=None, method='central', cache_key=None):
+        """
+        Calculate the derivatives of **func** with respect to the model parameters numerically.
+        All parameter variations are evaluated at once (see :py:meth:`_eval_for_parameter_rows`).
+        The result for the most recent arguments is cached.
+
+        :param func: function taking the model parameters as positional arguments
+        :param model_parameters: values of the model parameters
+        :param par_dx: step size(s) for numeric differentiation (if ``None``, chosen for each parameter)
+        :param method: one of ``'forward'``, ``'central'`` or ``'complex'`` (complex step, **func** must
+                       accept complex parameter values)
+        :param cache_key: additional hashable value identifying **func**, e.g. the *x* values
+        :return: the derivatives, one row per parameter (read-only)
+        :rtype: :py:obj:`numpy.ndarray`
+        """
+        if method not in self.JACOBIAN_METHODS:
+            raise ValueError("Unknown differentiation method %r, must be one of %r!" % (method, self.JACOBIAN_METHODS))
+        _pars = np.array(model_parameters, dtype=float)
+        if par_dx is None:
+            # forward differences: sqrt(eps) balances truncation and rounding errors,
+            # complex steps: no cancellation, so the step can be arbitrarily small
+            _scale = np.abs(_pars) + 1.0 / (1.0 + np.abs(_pars))
+            _par_dxs = self._JACOBIAN_RELATIVE_STEPS[method] * _scale
+        else:
+            _par_dxs = np.ones_like(_pars) * par_dx
+
+        _key = (method, tuple(_pars), tuple(_par_dxs), cache_key)
+        if self._jacobian_cache is not None and self._jacobian_cache[0] == _key:
+            return self._jacobian_cache[1]
+
+        _n_pars = len(_pars)
+        _steps = np.diag(_par_dxs)
+        if method == 'forward':
+            _values = self._eval_for_parameter_rows(func, np.vstack([_pars, _pars + _steps]))
+            _differences = _values[1:] - _values[0]
+        elif method == 'central':
+            _values = self._eval_for_parameter_rows(func, np.vstack([_pars + _steps, _pars - _steps]))
+            _differences = (_values[:_n_pars] - _values[_n_pars:]) / 2.0
+        else:
+            _values = self._eval_for_parameter_rows(func, _pars + 1j * _steps)
+            if not np.iscomplexobj(_values):
+                raise ValueError("Complex step differentiation requires a model function that "
+                                 "accepts complex parameter values!")
+            _differences = np.imag(_values)
+        _jacobian = (_differences.T / _par_dxs).T
+        _jacobian.setflags(write=False)
+        self._jacobian_cache = (_key, _jacobian)
+        return _jacobian
+
     @classmethod
     def _get_base_class(cls):
         return ParametricModelBaseMixin
@@ -270,6 +400,14 @@ class ParametricModelBaseMixin(object):
     def ndf(self):
         return self.size - self._model_function_object.parcount
 
+    @property
+    def model_cache_info(self):
+        """Statistics of the model cache as a :py:obj:`dict` with the keys ``hits``, ``misses``,
+        ``entries``, ``bytes``, ``max_entries`` and ``max_bytes``."""
+        return dict(hits=self._model_cache_hits, misses=self._model_cache_misses,
+                    entries=len(self._model_cache), bytes=self._model_cache_bytes,
+                    max_entries=self._model_cache_max_entries, max_bytes=self._model_cache_max_bytes)
+
     @property
     def parameters(self):
         """Model parameter values"""
@@ -284,3 +422,26 @@ class ParametricModelBaseMixin(object):
         self._pm_calculation_stale = True
         self._clear_total_error_cache()  # declared in the container class
 
+    def set_model_cache(self, max_entries=128, max_bytes=64 * 2**20):
+        """
+        Configure the cache for model values. Model values for previously evaluated parameter values
+        are then looked up instead of being recalculated. This is useful for expensive model functions
+        since parameter values are revisited e.g. by profiles, contours and repeated fits.
+        The least recently used values are discarded once one of the limits is reached.
+
+        :param max_entries: maximum number of cached model value arrays. ``0`` disables the cache.
+        :type max_entries: int
+        :param max_bytes: maximum memory used by the cached model values in bytes
+        :type max_bytes: int
+        """
+        self._model_cache_max_entries = int(max_entries)
+        self._model_cache_max_bytes = int(max_bytes)
+        self.clear_model_cache()
+
+    def clear_model_cache(self):
+        """Remove all entries from the model cache and reset its statistics."""
+        self._model_cache.clear()
+        self._model_cache_bytes = 0
+        self._model_cache_hits = 0
+        self._model_cache_misses = 0
+
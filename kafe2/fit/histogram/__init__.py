@@ -9,6 +9,7 @@ as saving and loading those to and from a file is not yet supported.
 
 from .container import *
 from .cost import *
+from .ensemble import *
 from .fit import *
 from .model import *
 from .plot import *
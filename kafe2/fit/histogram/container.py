@@ -1,4 +1,5 @@
 import numpy as np
+import six
 
 from ..indexed import IndexedContainer
 from ..indexed.container import IndexedContainerException
@@ -24,7 +25,10 @@ class HistContainer(IndexedContainer):
     ..    :parts: 1
 
     """
-    def __init__(self, n_bins, bin_range, bin_edges=None, fill_data=None, dtype=int):
+    # name of the error source registered for histograms filled with weighted entries
+    WEIGHT_ERROR_NAME = 'weights'
+
+    def __init__(self, n_bins, bin_range, bin_edges=None, fill_data=None, dtype=int, store_raw_data=True):
         """
         Construct a histogram:
 
@@ -38,12 +42,16 @@ class HistContainer(IndexedContainer):
         :type fill_data: list of floats
         :param dtype: data type of histogram entries
         :type dtype: type
+        :param store_raw_data: if ``True``, keep the filled entries so that the histogram can be rebinned
+        :type store_raw_data: bool
         """
         super(HistContainer, self).__init__(data=np.zeros(n_bins+2), dtype=dtype)  # underflow and overflow bins
         self._manual_heights = False
-        self._processed_entries = []
-        self._unprocessed_entries = []
-        # TODO: think of a way to implement weights
+        self._store_raw_data = store_raw_data
+        self._raw_data_chunks = []  # arrays of filled entries, concatenated on demand
+        self._raw_weight_chunks = []  # corresponding arrays of weights, None for unweighted entries
+        self._weighted = False
+        self._sum_of_squared_weights = np.zeros(n_bins+2)
 
         if len(bin_range) != 2:
             raise HistContainerException(
@@ -77,57 +85,39 @@ class HistContainer(IndexedContainer):
 
     # -- private methods
 
-    def _fill_unprocessed(self):
-        """fill any entries marked as unprocessed into the histogram"""
-        if self._manual_heights:
-            raise HistContainerException("The bin heights have been set manually. Filling entries is not available "
-                                         "anymore. Please construct a new HistContainer!")
-        if not self._unprocessed_entries:
+    def _fill_entries(self, entries, weights=None):
+        """sort an array of entries into the bins, the underflow and the overflow bin"""
+        # bin i covers [edge_i-1, edge_i), entries beyond the last edge (or NaN) are overflows
+        _bin_indices = np.searchsorted(self._bin_edges, entries, side='right')
+        _n_bins = len(self._data)
+        if weights is None:
+            _counts = np.bincount(_bin_indices, minlength=_n_bins)
+            self._data += _counts
+            self._sum_of_squared_weights += _counts
+        else:
+            if not np.issubdtype(self._data.dtype, np.floating):
+                self._data = self._data.astype(float)
+            self._data += np.bincount(_bin_indices, weights=weights, minlength=_n_bins)
+            self._sum_of_squared_weights += np.bincount(_bin_indices, weights=weights ** 2, minlength=_n_bins)
+
+    def _merge_raw_data_chunks(self):
+        """concatenate the stored entries and weights into a single chunk each"""
+        if len(self._raw_data_chunks) == 1:
             return
-        _entries_sorted = np.sort(self._unprocessed_entries)
-
-        _current_entry_index = 0
-        _current_entry_value = _entries_sorted[0]
-        _current_bin_index = 0  # start with underflow bin
-        _current_bin_upper_edge = self.low
-        _current_bin_lower_edge = -np.inf
-
-        # print "Bin %d (%5.3f, %5.3f)" % (_current_bin_index, _current_bin_lower_edge, _current_bin_upper_edge)
-        while _current_bin_upper_edge <= self.high:
-            if _current_entry_value >= _current_bin_upper_edge:
-                # if last bin, quit
-                if _current_bin_upper_edge == self.high:
-                    # print "\tthis is the last bin: quitting loop"
-                    break
-                # move to next bin
-                _current_bin_index += 1
-                _current_bin_upper_edge = self._bin_edges[_current_bin_index]
-                _current_bin_lower_edge = self._bin_edges[_current_bin_index - 1]
-                # print "\tmove to next bin"
-                # print "Bin %d (%5.3f, %5.3f)" % (_current_bin_index, _current_bin_lower_edge, _current_bin_upper_edge)
-                continue
-            # increment histogram bin and move to next entry
-            # print "\tputting entry #%d '%s' in bin %d (%5.3f, %5.3f)" % (
-            #     _current_entry_index, _current_entry_value, _current_bin_index, _current_bin_lower_edge, _current_bin_upper_edge)
-            # add to processed entries
-            self._processed_entries.append(_current_entry_value)
-            self._data[_current_bin_index] += 1
-            _current_entry_index += 1
-            if _current_entry_index >= len(_entries_sorted):    # important BUGFIX!!!!!!!!!!
-                break
-            _current_entry_value = _entries_sorted[_current_entry_index]
-
-        # any remaining entries are overflows
-        if _current_entry_index < len(_entries_sorted):    # important BUGFIX!!!!!!!!!!
-
-            _overflow_entries = _entries_sorted[_current_entry_index:]
-            self._data[-1] += len(_overflow_entries)
-            # print "Bin %d (of): add %d entries" % (_current_bin_index+1, len(_overflow_entries))
-            # for i in _overflow_entries:
-            #     print '\t', i
-            self._processed_entries += list(_overflow_entries)
-
-        self._unprocessed_entries = []
+        _weights = [np.ones_like(_entries) if _weights is None else _weights
+                    for _entries, _weights in zip(self._raw_data_chunks, self._raw_weight_chunks)]
+        self._raw_data_chunks = [np.concatenate([np.empty(0)] + self._raw_data_chunks)]
+        self._raw_weight_chunks = [np.concatenate([np.empty(0)] + _weights) if self._weighted else None]
+
+    def _update_weight_error(self):
+        """register or update the error source with the square root of the sum of squared weights per bin"""
+        _err_val = np.sqrt(self._sum_of_squared_weights[1:-1])
+        _err_dict = self._error_dicts.get(self.WEIGHT_ERROR_NAME, None)
+        if _err_dict is None:
+            self.add_error(_err_val, name=self.WEIGHT_ERROR_NAME)
+        else:
+            _err_dict['err'].error = _err_val
+            self._on_error_change()
 
     # -- public properties
 
@@ -139,13 +129,11 @@ class HistContainer(IndexedContainer):
     @property
     def n_entries(self):
         """the number of entries"""
-        return np.sum(self._data) + len(self._unprocessed_entries)
+        return np.sum(self._data)
 
     @property
     def data(self):
         """the number of entries in each bin"""
-        if self._unprocessed_entries:  # process outstanding entries
-            self._fill_unprocessed()
         # NOTE: returned array starts at 0
         return self._data[1:-1].copy()  # don't consider underflow and overflow bins
 
@@ -155,9 +143,36 @@ class HistContainer(IndexedContainer):
 
     @property
     def raw_data(self):
-        """the number of entries in each bin"""
-        # TODO: commit unprocessed entries (?)
-        return self._processed_entries + self._unprocessed_entries
+        """the entries filled into the histogram as a :py:obj:`numpy.ndarray`"""
+        if not self._store_raw_data:
+            raise HistContainerException("The raw data of this histogram is not stored!")
+        self._merge_raw_data_chunks()
+        return self._raw_data_chunks[0].copy()
+
+    @property
+    def raw_weights(self):
+        """the weights of the entries filled into the histogram, ``None`` if no weights were given"""
+        if not self._store_raw_data:
+            raise HistContainerException("The raw data of this histogram is not stored!")
+        if not self._weighted:
+            return None
+        self._merge_raw_data_chunks()
+        return self._raw_weight_chunks[0].copy()
+
+    @property
+    def weighted(self):
+        """whether weighted entries have been filled into the histogram"""
+        return self._weighted
+
+    @property
+    def sum_of_squared_weights(self):
+        """the sum of the squared entry weights in each bin (equal to the bin counts for unweighted entries)"""
+        return self._sum_of_squared_weights[1:-1].copy()
+
+    @property
+    def store_raw_data(self):
+        """whether the filled entries are kept"""
+        return self._store_raw_data
 
     @property
     def low(self):
@@ -208,20 +223,56 @@ class HistContainer(IndexedContainer):
 
     # -- public methods
 
-    def fill(self, entries):
+    def fill(self, entries, weights=None):
         """
         Fill new entries into the histogram.
 
+        If weights are given, the bin heights are the sums of the weights of the entries in each bin.
+        The square root of the sum of the squared weights is then registered as an uncertainty source
+        named :py:attr:`WEIGHT_ERROR_NAME` and kept up to date with subsequent fills.
+
         :param entries: list of entries
         :type entries: list of floats
+        :param weights: weights of the entries (if ``None``, each entry has weight 1)
+        :type weights: float or list of floats or ``None``
         """
         if self._manual_heights:
             raise HistContainerException("The bin heights have been set manually. Filling additional data is not "
                                          "possible anymore. Please construct a new HistContainer!")
-        try:
-            self._unprocessed_entries += list(entries)
-        except TypeError:
-            self._unprocessed_entries.append(entries)
+        _entries = np.array(entries, dtype=float).ravel()
+        _weights = None
+        if weights is not None:
+            _weights = np.array(weights, dtype=float).ravel()
+            if _weights.size == 1:
+                _weights = np.full_like(_entries, _weights[0])
+            if _weights.shape != _entries.shape:
+                raise HistContainerException("Number of weights (%d) does not match number of entries (%d)!"
+                                             % (len(_weights), len(_entries)))
+            self._weighted = True
+        self._fill_entries(_entries, _weights)
+        if self._store_raw_data:
+            self._raw_data_chunks.append(_entries)
+            self._raw_weight_chunks.append(_weights)
+        if self._weighted:
+            self._update_weight_error()
+
+    def fill_stream(self, chunks, weight_chunks=None):
+        """
+        Fill new entries into the histogram chunk by chunk. Only one chunk needs to be in memory
+        at a time, so histograms can be filled from data sets larger than the available memory
+        if the raw data is not stored.
+
+        :param chunks: iterable of arrays of entries, e.g. a generator reading a file in blocks
+        :type chunks: iterable of list of floats
+        :param weight_chunks: iterable of arrays with the weights of the entries in **chunks**
+        :type weight_chunks: iterable of list of floats or ``None``
+        """
+        if weight_chunks is None:
+            for _chunk in chunks:
+                self.fill(_chunk)
+        else:
+            for _chunk, _weight_chunk in six.moves.zip(chunks, weight_chunks):
+                self.fill(_chunk, weights=_weight_chunk)
 
     def rebin(self, new_bin_edges):
         """
@@ -238,24 +289,36 @@ class HistContainer(IndexedContainer):
         if not (np.diff(_new_bin_edges) >= 0).all():
             raise HistContainerException(
                 "Invalid bin edge specification! Edge sequence must be sorted in ascending order!")
+        if not self._store_raw_data and np.any(self._data):
+            raise HistContainerException("The raw data of this histogram is not stored. Rebinning is not "
+                                         "possible anymore. Please construct a new HistContainer!")
         self._bin_edges = _new_bin_edges
         self._data = np.zeros(len(self._bin_edges) - 1 + 2)
+        self._sum_of_squared_weights = np.zeros(len(self._bin_edges) - 1 + 2)
 
-        # mark all entries as unprocessed
-        self._unprocessed_entries += self._processed_entries
-        self._processed_entries = []
+        # sort all entries into the new bins
+        for _chunk, _weight_chunk in zip(self._raw_data_chunks, self._raw_weight_chunks):
+            self._fill_entries(_chunk, _weight_chunk)
+        if self._weighted:
+            self._update_weight_error()
 
-    def set_bins(self, bin_heights, underflow=0, overflow=0):
+    def set_bins(self, bin_heights, underflow=0, overflow=0, sum_of_squared_weights=None):
         """
-        Set the bin heights according to a pre-calculated histogram
+        Set the bin heights according to a pre-calculated histogram.
+
+        Without **sum_of_squared_weights** the bin heights are taken to be unweighted counts. Histograms
+        which have been filled with weighted entries therefore require **sum_of_squared_weights**.
+
         :param bin_heights: Heights of the bins
         :type bin_heights: list of int
         :param underflow: Number of entries in the underflow bin
         :type underflow: int
         :param overflow: Number of entries in the overflow bin
         :type overflow: int
+        :param sum_of_squared_weights: the sum of the squared entry weights in each bin (if ``None``, the
+                                       bin heights are unweighted counts)
+        :type sum_of_squared_weights: list of float or ``None``
         """
-        self._manual_heights = True
         _new_data = np.array(bin_heights)
         if len(_new_data.shape) != 1:
             raise HistContainerException('Invalid dimensions for bin heights. '
@@ -264,6 +327,26 @@ class HistContainer(IndexedContainer):
         if len(_new_data) != len(self._data):
             raise HistContainerException('Length of bin entries does not match binning. '
                                          'Got {}, expected {}'.format(len(_new_data)-2, len(self._data)-2))
+        if sum_of_squared_weights is None:
+            if self._weighted:
+                raise HistContainerException("The histogram contains weighted entries: the sum of the squared "
+                                             "weights must be given with `sum_of_squared_weights`!")
+            # the bin heights are unweighted counts
+            _new_sum_of_squared_weights = np.abs(_new_data).astype(float)
+        else:
+            _new_sum_of_squared_weights = np.array(sum_of_squared_weights, dtype=float)
+            if _new_sum_of_squared_weights.shape != (len(_new_data) - 2,):
+                raise HistContainerException('Shape of sum of squared weights does not match bin heights. '
+                                             'Got {}, expected {}'.format(_new_sum_of_squared_weights.shape,
+                                                                          (len(_new_data) - 2,)))
+            # the weights of the underflow and overflow entries are unknown and do not enter the uncertainties
+            _new_sum_of_squared_weights = np.append(
+                np.insert(_new_sum_of_squared_weights, 0, abs(underflow)), abs(overflow))
+            self._weighted = True
+        self._manual_heights = True
         self._data = _new_data
-        self._processed_entries = []
-        self._unprocessed_entries = []
+        self._raw_data_chunks = []
+        self._raw_weight_chunks = []
+        self._sum_of_squared_weights = _new_sum_of_squared_weights
+        if self._weighted:
+            self._update_weight_error()
@@ -0,0 +1,186 @@
+import numpy as np
+import scipy.stats
+import six
+
+from .._base import FitEnsembleBase, FitEnsembleException
+from .container import HistContainer
+from .cost import HistCostFunction_NegLogLikelihood
+from .fit import HistFit
+from .model import HistParametricModel
+
+
+__all__ = ["HistFitEnsemble", "HistFitEnsembleException"]
+
+
+class HistFitEnsembleException(FitEnsembleException):
+    pass
+
+
+class HistFitEnsemble(FitEnsembleBase):
+    """
+    Object for generating ensembles of fits to histogram pseudo-data.
+
+    The bin contents of the pseudo-histograms are drawn for a whole batch of pseudo-experiments at
+    once, either from independent Poisson distributions around the expected bin contents or, for a
+    fixed total number of entries, from a multinomial distribution. Entries which fall outside of
+    the histogram range are not counted.
+
+    The fit ensemble is generated with the :py:meth:`~kafe2.fit.HistFitEnsemble.run` method and
+    shares the parallel runner and the result storage with :py:obj:`~kafe2.fit.XYFitEnsemble`.
+    """
+    FIT_TYPE = HistFit
+    EXCEPTION_TYPE = HistFitEnsembleException
+
+    SAMPLING_METHODS = ('poisson', 'multinomial')
+
+    def __init__(self, n_experiments, n_bins, bin_range, model_density_function, model_parameters,
+                 n_entries, bin_edges=None,
+                 cost_function=HistCostFunction_NegLogLikelihood(data_point_distribution='poisson', ratio=True),
+                 bin_evaluation="simpson", sampling='poisson',
+                 requested_results=None, store_results=True, storage_path=None):
+        """
+        Construct an :py:obj:`~kafe2.fit.HistFitEnsemble` object.
+
+        :param n_experiments: number of pseudoexperiments to perform
+        :type n_experiments: int
+        :param n_bins: number of bins
+        :type n_bins: int
+        :param bin_range: the lower and upper edges of the entire histogram
+        :type bin_range: tuple of float
+        :param model_density_function: the model density function
+        :type model_density_function: :py:class:`~kafe2.fit.hist.HistModelFunction` or unwrapped native Python function
+        :param model_parameters: parameters of the "true" model
+        :type model_parameters: iterable of float
+        :param n_entries: the expected number of entries of the histograms including the entries outside
+                          of the histogram range
+        :type n_entries: int
+        :param bin_edges: the bin edges (if ``None``, each bin will have the same width)
+        :type bin_edges: iterable of float
+        :param cost_function: the cost function
+        :type cost_function: :py:class:`~kafe2.fit._base.CostFunctionBase`-derived or unwrapped native Python function
+        :param bin_evaluation: how the model evaluates bin heights, see :py:obj:`~kafe2.fit.HistFit`
+        :type bin_evaluation: str, callable, or numpy.vectorize
+        :param sampling: ``'poisson'`` for independently Poisson-distributed bin contents or ``'multinomial'``
+                         for a fixed total number of entries
+        :type sampling: str
+        :param requested_results: list of result variables to collect for each toy fit
+        :type requested_results: iterable of str
+        :param store_results: if ``False``, only accumulate statistics and histograms of the result variables
+        :type store_results: bool
+        :param storage_path: if not ``None``, write the result variables to ``.npy`` files in this directory
+        :type storage_path: str or None
+        """
+        if sampling not in self.SAMPLING_METHODS:
+            raise HistFitEnsembleException("Unknown sampling method '%s', must be one of %r!"
+                                           % (sampling, self.SAMPLING_METHODS))
+        self._n_bins = n_bins
+        self._bin_range = bin_range
+        self._bin_edges = bin_edges
+        self._model_density_function = model_density_function
+        self._n_entries = int(n_entries)
+        self._cost_function = cost_function
+        self._bin_evaluation = bin_evaluation
+        self._sampling = sampling
+        super(HistFitEnsemble, self).__init__(
+            n_experiments=n_experiments, model_parameters=model_parameters,
+            requested_results=requested_results, store_results=store_results, storage_path=storage_path)
+
+    def _create_toy_fit(self):
+        # initialize the toy fit with the (rounded) expected bin contents
+        _model = HistParametricModel(self._n_bins, self._bin_range, self._model_density_function,
+                                     self._model_parameters, self._bin_edges, bin_evaluation=self._bin_evaluation)
+        _data = HistContainer(self._n_bins, self._bin_range, bin_edges=self._bin_edges)
+        _data.set_bins(np.round(self._n_entries * _model.data).astype(int))
+        return HistFit(data=_data, model_density_function=self._model_density_function,
+                       cost_function=self._cost_function, bin_evaluation=self._bin_evaluation)
+
+    def _update_reference_quantities_from_toy_fit(self):
+        self._toy_fit._param_model.parameters = self._model_parameters
+        # probability of an entry to fall into each bin
+        self._ref_bin_probabilities = np.clip(self._toy_fit._param_model.data, 0.0, None)
+        self._ref_data = self._n_entries * self._ref_bin_probabilities
+
+    def _generate_pseudodata_batch(self, seed_sequences):
+        """Draw the bin contents for a batch of pseudo-experiments, one per seed sequence.
+        If the seed sequences are ``None``, the global random state is used.
+        Returns the bin contents as an array with one row per pseudo-experiment."""
+        if self._sampling == 'poisson':
+            def _draw(random_state, n_exp):
+                return random_state.poisson(lam=self._ref_data, size=(n_exp, self._n_bins))
+        else:
+            # entries outside of the histogram range go into an additional category
+            _p_inside = np.sum(self._ref_bin_probabilities)
+            _pvals = np.append(self._ref_bin_probabilities / max(_p_inside, 1.0), max(1.0 - _p_inside, 0.0))
+
+            def _draw(random_state, n_exp):
+                return random_state.multinomial(self._n_entries, _pvals, size=n_exp)[:, :-1]
+
+        return self._draw_random_batch(seed_sequences, _draw),
+
+    def _set_toy_fit_data(self, bin_contents):
+        """commit pseudo-data to the toy fit data container"""
+        self._toy_fit.data_container.set_bins(bin_contents)
+        self._toy_fit._nexus.get('data').mark_for_update()
+        # the model is scaled to the number of entries
+        self._toy_fit._nexus.get('model').mark_for_update()
+
+    def _initialize_ensemble_variables(self):
+        super(HistFitEnsemble, self)._initialize_ensemble_variables()
+        _ref_error = np.sqrt(self._ref_data)
+        if 'data' in self._requested_results:
+            self._add_ensemble_variable(
+                'data',
+                variable_shape=(self.n_dat,),
+                distribution=scipy.stats.norm,
+                distribution_parameters=dict(loc=self._ref_data, scale=_ref_error),
+                value_ranges=np.array([self._ref_data - 3 * _ref_error, self._ref_data + 3 * _ref_error]).T,
+                variable_labels=['$n_{%d}$' % (_i,) for _i in six.moves.range(1, self.n_dat+1)]
+            )
+
+        if 'model' in self._requested_results:
+            self._add_ensemble_variable(
+                'model',
+                variable_shape=(self.n_dat,),
+                distribution=scipy.stats.norm,
+                distribution_parameters=dict(loc=self._ref_data, scale=_ref_error),
+                value_ranges=np.array([self._ref_data - 3 * _ref_error, self._ref_data + 3 * _ref_error]).T,
+                variable_labels=['$m_{%d}$' % (_i,) for _i in six.moves.range(1, self.n_dat+1)]
+            )
+
+    def _get_config_arrays(self):
+        return [self._model_parameters, self._toy_fit.data_container.bin_edges, self._ref_data]
+
+    def _get_config_description(self):
+        return super(HistFitEnsemble, self)._get_config_description() + (self._sampling, self._n_entries)
+
+    # -- private properties
+
+    @property
+    def _data(self):
+        """property for ensemble variable 'data'"""
+        return self._toy_fit.data
+
+    @property
+    def _model(self):
+        """property for ensemble variable 'model'"""
+        return self._toy_fit.model
+
+    # -- public properties
+
+    @property
+    def n_df(self):
+        """the number of degrees of freedom for the fit"""
+        # the model is scaled to the number of entries in the histogram
+        return self.n_dat - self.n_par - 1
+
+    @property
+    def sampling(self):
+        """the method for drawing the bin contents, ``'poisson'`` or ``'multinomial'``"""
+        return self._sampling
+
+    AVAILABLE_RESULTS = dict(
+        FitEnsembleBase.AVAILABLE_RESULTS,
+        data=_data,
+        model=_model,
+    )
+    _DEFAULT_RESULTS = {'parameter_pulls', 'cost'}
@@ -41,7 +41,10 @@ class HistFit(FitBase):
         model_density_function. If bin_evaluation is equal to "rectangle", "midpoint", "trapezoid",
         or "simpson" the bin heights are evaluated according to the corresponding quadrature
         formula. If bin_evaluation is equal to "numerical" the bin heights are evaluated by
-        numerically integrating model_density_function.
+        numerically integrating model_density_function. If bin_evaluation is equal to "gauss<k>",
+        e.g. "gauss5", the bin heights are evaluated with a k-point Gauss-Legendre quadrature for all
+        bins at once. With "gauss<k>_adaptive" bins are additionally bisected until the estimated
+        integration error is small enough.
 
         :param data: a :py:class:`~kafe2.fit.hist.HistContainer` representing histogrammed data
         :type data: :py:class:`~kafe2.fit.hist.HistContainer`
@@ -1,3 +1,5 @@
+import re
+
 import numpy as np
 import six
 from scipy import integrate
@@ -42,6 +44,13 @@ class HistParametricModelException(HistContainerException):
 class HistParametricModel(ParametricModelBaseMixin, HistContainer):
     MODEL_FUNCTION_TYPE = HistModelFunction
 
+    # "gauss<k>" or "gauss<k>_adaptive" with k the number of Gauss-Legendre nodes per bin
+    _GAUSS_BIN_EVALUATION_PATTERN = re.compile(r"^gauss(\d+)(_adaptive)?$")
+    # parameters of the adaptive refinement of Gauss-Legendre bin evaluation, same tolerances as quad
+    _GAUSS_ADAPTIVE_RTOL = 1.49e-8
+    _GAUSS_ADAPTIVE_ATOL = 1.49e-8
+    _GAUSS_ADAPTIVE_MAX_DEPTH = 10
+
     #TODO n_bins, bin_range, bin_edges contain redundant information, should the arguments for HistParametricModel be refactored?
     def __init__(self, n_bins, bin_range,
                  model_density_func=function_library.normal_distribution_pdf,
@@ -61,8 +70,18 @@ class HistParametricModel(ParametricModelBaseMixin, HistContainer):
                 self._bin_evaluation_method = self._bin_evaluation_simpson
             elif self._bin_evaluation == "numerical":
                 self._bin_evaluation_method = self._bin_evaluation_numerical
+            elif self._GAUSS_BIN_EVALUATION_PATTERN.match(self._bin_evaluation):
+                _match = self._GAUSS_BIN_EVALUATION_PATTERN.match(self._bin_evaluation)
+                _order = int(_match.group(1))
+                if _order < 1:
+                    raise ValueError("Gauss-Legendre bin evaluation requires at least one node per bin: %s"
+                                     % self._bin_evaluation)
+                self._gauss_nodes, self._gauss_weights = np.polynomial.legendre.leggauss(_order)
+                self._gauss_adaptive = _match.group(2) is not None
+                self._bin_evaluation_method = self._bin_evaluation_gauss
             else:
                 raise ValueError("Unknown bin evaluation method: %s" % self._bin_evaluation)
+            self._update_bin_geometry()
         else:
             if isinstance(self._bin_evaluation, np.vectorize):
                 # special handling of numpy vectorized antiderivative functions
@@ -102,22 +121,55 @@ class HistParametricModel(ParametricModelBaseMixin, HistContainer):
 
     def _recalculate(self):
         # don't use parent class setter for 'data' -> set directly
-        self._data[1:-1] = self._bin_evaluation_method()
+        self._data[1:-1] = self._get_cached_model_values(self._bin_evaluation_method)
         self._pm_calculation_stale = False
 
+    def _update_bin_geometry(self):
+        """Precompute the points at which the model density is evaluated and the quadrature weights
+        for the current binning so that each bin evaluation needs only a single model function call."""
+        _edges = self._bin_edges
+        _widths = _edges[1:] - _edges[:-1]
+        _centers = 0.5 * (_edges[1:] + _edges[:-1])
+        _grid, _weights = None, None
+        if self._bin_evaluation_method == self._bin_evaluation_rectangle:
+            _grid, _weights = _centers, _widths
+        elif self._bin_evaluation_method == self._bin_evaluation_trapezoid:
+            _grid, _weights = _edges.copy(), 0.5 * _widths
+        elif self._bin_evaluation_method == self._bin_evaluation_simpson:
+            # edges and centers interleaved: e_0, c_0, e_1, c_1, ..., c_n-1, e_n
+            _grid = np.empty(2 * len(_widths) + 1)
+            _grid[0::2] = _edges
+            _grid[1::2] = _centers
+            _weights = _widths / 6.0
+        elif self._bin_evaluation_method == self._bin_evaluation_gauss:
+            _grid, _weights = self._get_gauss_geometry(_edges[:-1], _edges[1:])
+        self._bin_evaluation_grid = _grid
+        self._bin_evaluation_weights = _weights
+        self._bin_evaluation_buffer = np.empty(len(_widths))
+
+    def _eval_density_on_grid(self):
+        _heights = self._model_function_object(self._bin_evaluation_grid, *self._model_parameters)
+        if np.shape(_heights) != self._bin_evaluation_grid.shape:
+            _heights = np.ones_like(self._bin_evaluation_grid) * _heights
+        return _heights
+
     def _bin_evaluation_rectangle(self):
-        _height_centers = self._model_function_object(self.bin_centers, *self._model_parameters)
-        return self.bin_widths * _height_centers
+        return np.multiply(self._bin_evaluation_weights, self._eval_density_on_grid(),
+                           out=self._bin_evaluation_buffer)
 
     def _bin_evaluation_trapezoid(self):
-        _height_edges = self._model_function_object(self._bin_edges, *self._model_parameters)
-        return self.bin_widths / 2.0 * (_height_edges[:-1] + _height_edges[1:])
+        _heights = self._eval_density_on_grid()
+        _int_val = np.add(_heights[:-1], _heights[1:], out=self._bin_evaluation_buffer)
+        _int_val *= self._bin_evaluation_weights
+        return _int_val
 
     def _bin_evaluation_simpson(self):
-        _height_edges = self._model_function_object(self._bin_edges, *self._model_parameters)
-        _height_centers = self._model_function_object(self.bin_centers, *self._model_parameters)
-        return self.bin_widths / 6.0 * (
-                _height_edges[:-1] + 4.0 * _height_centers + _height_edges[1:])
+        _heights = self._eval_density_on_grid()
+        _int_val = np.multiply(_heights[1::2], 4.0, out=self._bin_evaluation_buffer)
+        _int_val += _heights[:-1:2]
+        _int_val += _heights[2::2]
+        _int_val *= self._bin_evaluation_weights
+        return _int_val
 
     def _bin_evaluation_numerical(self):
         _integrand_func = lambda x: self._model_function_object(x, *self._model_parameters)
@@ -126,6 +178,47 @@ class HistParametricModel(ParametricModelBaseMixin, HistContainer):
             _int_val[_i], _ = integrate.quad(_integrand_func, _a, _b)
         return _int_val
 
+    def _get_gauss_geometry(self, lower, upper):
+        """Map the Gauss-Legendre nodes and weights onto the intervals [**lower**, **upper**].
+        Returns the flattened nodes and the weights with one row per interval."""
+        _half_widths = 0.5 * (upper - lower)[:, np.newaxis]
+        _centers = 0.5 * (upper + lower)[:, np.newaxis]
+        _nodes = (_centers + _half_widths * self._gauss_nodes).ravel()
+        return _nodes, _half_widths * self._gauss_weights
+
+    def _integrate_gauss(self, nodes, weights):
+        # evaluate the density for all intervals at once
+        _heights = np.ones_like(nodes) * self._model_function_object(nodes, *self._model_parameters)
+        return np.sum(weights * _heights.reshape(weights.shape), axis=1)
+
+    def _bin_evaluation_gauss(self):
+        _heights = self._eval_density_on_grid().reshape(self._bin_evaluation_weights.shape)
+        _int_val = np.einsum("ij,ij->i", self._bin_evaluation_weights, _heights,
+                             out=self._bin_evaluation_buffer)
+        if not self._gauss_adaptive:
+            return _int_val
+        # refine intervals by bisection until the estimated error is small enough
+        _lower, _upper = self._bin_edges[:-1], self._bin_edges[1:]
+        _bin_indices = np.arange(self.size)
+        _whole = _int_val
+        for _ in range(self._GAUSS_ADAPTIVE_MAX_DEPTH):
+            _centers = 0.5 * (_lower + _upper)
+            _halves = self._integrate_gauss(*self._get_gauss_geometry(
+                np.concatenate([_lower, _centers]), np.concatenate([_centers, _upper])))
+            _left, _right = _halves[:len(_lower)], _halves[len(_lower):]
+            _refined = _left + _right
+            _error = np.abs(_refined - _whole)
+            np.add.at(_int_val, _bin_indices, _refined - _whole)
+            _flagged = _error > np.maximum(
+                self._GAUSS_ADAPTIVE_ATOL, self._GAUSS_ADAPTIVE_RTOL * np.abs(_refined))
+            if not np.any(_flagged):
+                break
+            _lower, _upper = (np.concatenate([_lower[_flagged], _centers[_flagged]]),
+                              np.concatenate([_centers[_flagged], _upper[_flagged]]))
+            _bin_indices = np.concatenate([_bin_indices[_flagged], _bin_indices[_flagged]])
+            _whole = np.concatenate([_left[_flagged], _right[_flagged]])
+        return _int_val
+
     def _bin_evaluation_antiderivative(self):
         _fval_antider_as = self._bin_evaluation(self._bin_edges[:-1], *self._model_parameters)
         _fval_antider_bs = self._bin_evaluation(self._bin_edges[1:], *self._model_parameters)
@@ -179,3 +272,10 @@ class HistParametricModel(ParametricModelBaseMixin, HistContainer):
 
     def fill(self, entries):
         raise HistParametricModelException("Parametric model of histogram cannot be filled!")
+
+    def rebin(self, new_bin_edges):
+        super(HistParametricModel, self).rebin(new_bin_edges)
+        # also called by the container constructor before the bin evaluation has been set up
+        if getattr(self, "_bin_evaluation_method", None) is not None:
+            self._update_bin_geometry()
+        self._on_support_change()
@@ -9,6 +9,7 @@ measurements. This can be useful for calculating weighted mean values or templat
 
 from .container import *
 from .cost import *
+from .ensemble import *
 from .fit import *
 from .format import *
 from .model import *
@@ -31,19 +31,9 @@ class IndexedContainer(DataContainerBase):
     # -- private methods
 
     def _calculate_total_error(self):
-        _sz = self.size
-        _tmp_cov_mat = np.zeros((_sz, _sz))
-        for _err_dict in self._error_dicts.values():
-            if not _err_dict['enabled']:
-                continue
-            _tmp_cov_mat += _err_dict['err'].cov_mat
-
-        _total_err = MatrixGaussianError(_tmp_cov_mat, 'cov', relative=False, reference=self.data)
+        _total_err = MatrixGaussianError(self._get_total_cov_mat(), 'cov', relative=False, reference=self.data)
         self._total_error = _total_err
 
-    def _clear_total_error_cache(self):
-        self._total_error = None
-
     # -- public properties
 
     @property
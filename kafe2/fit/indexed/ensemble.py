@@ -0,0 +1,167 @@
+import numpy as np
+import scipy.stats
+import six
+
+from .._base import FitEnsembleBase, FitEnsembleException
+from .._base.ensemble import _correlate, _factorize_cov_mat
+from .cost import IndexedCostFunction_Chi2
+from .fit import IndexedFit
+
+
+__all__ = ["IndexedFitEnsemble", "IndexedFitEnsembleException"]
+
+
+class IndexedFitEnsembleException(FitEnsembleException):
+    pass
+
+
+class IndexedFitEnsemble(FitEnsembleBase):
+    """
+    Object for generating ensembles of fits to indexed pseudo-data generated according to the
+    specified uncertainty model.
+
+    As for :py:obj:`~kafe2.fit.XYFitEnsemble` objects, an error model should be added by using the
+    :py:meth:`~kafe2.fit.IndexedFitEnsemble.add_error` or
+    :py:meth:`~kafe2.fit.IndexedFitEnsemble.add_matrix_error` methods. The pseudo-data is then
+    generated by smearing the "true" model with the Cholesky factor of the total covariance matrix,
+    which is calculated only once per run.
+    """
+    FIT_TYPE = IndexedFit
+    EXCEPTION_TYPE = IndexedFitEnsembleException
+
+    def __init__(self, n_experiments, model_function, model_parameters,
+                 cost_function=IndexedCostFunction_Chi2(errors_to_use='covariance'),
+                 requested_results=None, store_results=True, storage_path=None):
+        """
+        Construct an :py:obj:`~kafe2.fit.IndexedFitEnsemble` object.
+
+        :param n_experiments: number of pseudoexperiments to perform
+        :type n_experiments: int
+        :param model_function: the model function
+        :type model_function: :py:class:`~kafe2.fit._base.ModelFunctionBase` or unwrapped native Python function
+        :param model_parameters: parameters of the "true" model
+        :type model_parameters: iterable of float
+        :param cost_function: the cost function
+        :type cost_function: :py:class:`~kafe2.fit._base.CostFunctionBase`-derived or unwrapped native Python function
+        :param requested_results: list of result variables to collect for each toy fit
+        :type requested_results: iterable of str
+        :param store_results: if ``False``, only accumulate statistics and histograms of the result variables
+        :type store_results: bool
+        :param storage_path: if not ``None``, write the result variables to ``.npy`` files in this directory
+        :type storage_path: str or None
+        """
+        self._model_function = model_function
+        self._cost_function = cost_function
+        super(IndexedFitEnsemble, self).__init__(
+            n_experiments=n_experiments, model_parameters=model_parameters,
+            requested_results=requested_results, store_results=store_results, storage_path=storage_path)
+
+    def _create_toy_fit(self):
+        # need some dummy initial data values in order to initialize a Fit object
+        self._ref_data = np.asarray(self._model_function(*self._model_parameters), dtype=float)
+        return IndexedFit(data=self._ref_data, model_function=self._model_function,
+                          cost_function=self._cost_function)
+
+    def _update_reference_quantities_from_toy_fit(self):
+        self._ref_data = np.asarray(
+            self._toy_fit._param_model.eval_model_function(model_parameters=self._model_parameters), dtype=float)
+        self._ref_cov_mat = self._toy_fit.total_cov_mat
+        # the covariance matrix is fixed -> factorize it once for generating the pseudo-data
+        self._ref_cov_mat_factor = _factorize_cov_mat(self._ref_cov_mat)
+        self._ref_error = self._toy_fit.total_error
+
+    def _generate_pseudodata_batch(self, seed_sequences):
+        """Generate pseudo-data according to the fit error model for a batch of pseudo-experiments, one
+        per seed sequence. If the seed sequences are ``None``, the global random state is used.
+        Returns the data as an array with one row per pseudo-experiment."""
+        if not self._toy_fit.has_errors:
+            raise IndexedFitEnsembleException("Cannot generate fit ensemble: no error model specified!")
+        _n_dat = self._ref_data.size
+        _standard_normal = self._draw_random_batch(
+            seed_sequences, lambda random_state, n_exp: random_state.standard_normal((n_exp, _n_dat)))
+        return self._ref_data + _correlate(_standard_normal, self._ref_cov_mat_factor),
+
+    def _set_toy_fit_data(self, data):
+        """commit pseudo-data to the toy fit data container"""
+        self._toy_fit.data_container.data = data
+        self._toy_fit._nexus.get('data').mark_for_update()
+
+    def _initialize_ensemble_variables(self):
+        super(IndexedFitEnsemble, self)._initialize_ensemble_variables()
+        if 'data_pulls' in self._requested_results:
+            self._add_ensemble_variable(
+                'data_pulls',
+                variable_shape=(self.n_dat,),
+                distribution=scipy.stats.norm,
+                distribution_parameters=dict(loc=0, scale=1),
+                value_ranges=(-3, 3),
+                variable_labels=['Pull $d_{%d}$' % (_i,) for _i in six.moves.range(self.n_dat)]
+            )
+
+        if 'data' in self._requested_results:
+            self._add_ensemble_variable(
+                'data',
+                variable_shape=(self.n_dat,),
+                distribution=scipy.stats.norm,
+                distribution_parameters=dict(loc=self._ref_data, scale=self._ref_error),
+                value_ranges=np.array([self._ref_data - 3 * self._ref_error,
+                                       self._ref_data + 3 * self._ref_error]).T,
+                variable_labels=['$d_{%d}$' % (_i,) for _i in six.moves.range(self.n_dat)]
+            )
+
+        if 'model' in self._requested_results:
+            self._add_ensemble_variable(
+                'model',
+                variable_shape=(self.n_dat,),
+                distribution=scipy.stats.norm,
+                distribution_parameters=dict(loc=self._ref_data, scale=self._ref_error),
+                value_ranges=np.array([self._ref_data - 3 * self._ref_error,
+                                       self._ref_data + 3 * self._ref_error]).T,
+                variable_labels=['$m_{%d}$' % (_i,) for _i in six.moves.range(self.n_dat)]
+            )
+
+    def _get_config_arrays(self):
+        return [self._model_parameters, self._ref_data, self._ref_cov_mat_factor]
+
+    # -- private properties
+
+    @property
+    def _data(self):
+        """property for ensemble variable 'data'"""
+        return self._toy_fit.data
+
+    @property
+    def _model(self):
+        """property for ensemble variable 'model'"""
+        return self._toy_fit.model
+
+    @property
+    def _data_pulls(self):
+        """property for ensemble variable 'data_pulls'"""
+        return (self._toy_fit.data - self._toy_fit.model) / self._toy_fit.total_error
+
+    # -- public methods
+
+    def add_error(self, err_val, name=None, correlation=0, relative=False, reference='data'):
+        self._toy_fit.add_error(err_val=err_val, name=name, correlation=correlation, relative=relative,
+                                reference=reference)
+        self._update_reference_quantities_from_toy_fit()  # recompute reference errors
+
+    # "inherit" docstring
+    add_error.__doc__ = IndexedFit.add_error.__doc__
+
+    def add_matrix_error(self, err_matrix, matrix_type, name=None, err_val=None, relative=False, reference='data'):
+        self._toy_fit.add_matrix_error(err_matrix=err_matrix, matrix_type=matrix_type, name=name,
+                                       err_val=err_val, relative=relative, reference=reference)
+        self._update_reference_quantities_from_toy_fit()  # recompute reference errors
+
+    # "inherit" docstring
+    add_matrix_error.__doc__ = IndexedFit.add_matrix_error.__doc__
+
+    AVAILABLE_RESULTS = dict(
+        FitEnsembleBase.AVAILABLE_RESULTS,
+        data_pulls=_data_pulls,
+        data=_data,
+        model=_model,
+    )
+    _DEFAULT_RESULTS = {'data_pulls', 'parameter_pulls', 'cost'}
@@ -1,7 +1,5 @@
 import numpy as np
 
-from scipy.misc import derivative
-
 from .._base import ParametricModelBaseMixin, ModelFunctionBase, ModelFunctionException
 from .container import IndexedContainer, IndexedContainerException
 from .format import IndexedModelFunctionFormatter
@@ -60,7 +58,7 @@ class IndexedParametricModel(ParametricModelBaseMixin, IndexedContainer):
 
     def _recalculate(self):
         # use parent class setter for 'data'
-        IndexedContainer.data.fset(self, self.eval_model_function())
+        IndexedContainer.data.fset(self, self._get_cached_model_values(self.eval_model_function))
         self._pm_calculation_stale = False
 
 
@@ -97,28 +95,19 @@ class IndexedParametricModel(ParametricModelBaseMixin, IndexedContainer):
         _pars = model_parameters if model_parameters is not None else self._model_parameters
         return self._model_function_object(*_pars)
 
-    def eval_model_function_derivative_by_parameters(self, model_parameters=None, par_dx=None):
+    def eval_model_function_derivative_by_parameters(self, model_parameters=None, par_dx=None, method='central'):
         """
         Evaluate the derivative of the model function with respect to the model parameters.
 
         :param model_parameters: values of the model parameters (if ``None``, the current values are used)
         :type model_parameters: list or ``None``
         :param par_dx: step size for numeric differentiation
-        :type par_dx: float
-        :return: value(s) of the model function derivative for the given parameters
+        :type par_dx: float or iterable of float
+        :param method: ``'forward'``, ``'central'`` or ``'complex'`` (complex step) differentiation
+        :type method: str
+        :return: value(s) of the model function derivative for the given parameters, one row per parameter
         :rtype: :py:obj:`numpy.ndarray`
         """
         _pars = model_parameters if model_parameters is not None else self._model_parameters
-        _pars = np.asarray(_pars)
-        _par_dxs = par_dx if par_dx is not None else 1e-2 * (np.abs(_pars) + 1.0 / (1.0 + np.abs(_pars)))
-
-        _ret = []
-        for _par_idx, (_par_val, _par_dx) in enumerate(zip(_pars, _par_dxs)):
-            def _chipped_func(par):
-                _chipped_pars = _pars.copy()
-                _chipped_pars[_par_idx] = par
-                return self._model_function_object(*_chipped_pars)
-
-            _der_val = derivative(_chipped_func, _par_val, dx=_par_dx)
-            _ret.append(_der_val)
-        return np.array(_ret)
+        return self._eval_jacobian(
+            func=self._model_function_object, model_parameters=_pars, par_dx=par_dx, method=method)
@@ -8,7 +8,7 @@ import numpy as np
 from .cost import SharedCostFunction, MultiCostFunction
 from .._base import FitBase
 from ...core import NexusFitter
-from ...core.error import SimpleGaussianError, MatrixGaussianError
+from ...core.error import SimpleGaussianError, MatrixGaussianError, BlockCovMat, add_cov_mats
 from ...core.fitters.nexus import Alias, Function, Array, Parameter
 from ...tools import random_alphanumeric
 
@@ -233,30 +233,30 @@ class MultiFit(FitBase):
                 _combined_property[_lower:_upper] = _single_fit_property
             return _combined_property
 
-        # Combines cov mats of single fits.
-        # Shared errors are not added to the main diagonal blocks because they have already been
-        # added to the individual fits.
+        # Combines cov mats of single fits into a block covariance matrix.
+        # Shared errors have already been added to the individual fits. They are subtracted from the
+        # diagonal blocks again and added as a low-rank coupling between the blocks instead.
         def _combine_cov_mats(axis_name, *single_fit_properties):
-            _combined_property = np.zeros(shape=(_data_indices[-1], _data_indices[-1]))
-            for _j, _single_fit_property in enumerate(single_fit_properties):
-                _lower = _data_indices[_j]
-                _upper = _data_indices[_j + 1]
-                _combined_property[_lower:_upper, _lower:_upper] = _single_fit_property
-            for _error_dict in self._shared_error_dicts.values():
+            _blocks = list(single_fit_properties)
+            _couplings = []
+            for _error_name, _error_dict in self._shared_error_dicts.items():
                 if _error_dict['axis'] != axis_name:
                     continue
                 _error = _error_dict['err']
-                for _j, _fit_index_j in enumerate(_error.fit_indices):
-                    _data_index_j = _fit_index_to_data_index[_fit_index_j]
-                    _lower_j = _data_indices[_data_index_j]
-                    _upper_j = _data_indices[_data_index_j + 1]
-                    for _k in range(_j):
-                        _data_index_k = _fit_index_to_data_index[_error.fit_indices[_k]]
-                        _lower_k = _data_indices[_data_index_k]
-                        _upper_k = _data_indices[_data_index_k + 1]
-                        _combined_property[_lower_j:_upper_j, _lower_k:_upper_k] += _error.cov_mat
-                        _combined_property[_lower_k:_upper_k, _lower_j:_upper_j] += _error.cov_mat
-            return _combined_property
+                _cov_mat = _error.cov_mat
+                _factor = _error.get_cov_mat_object().low_rank_factor
+                _coupling = np.zeros(shape=(_data_indices[-1], _factor.shape[1]))
+                for _fit_index in _error.fit_indices:
+                    if not self._shared_error_enabled(_error_name, _fit_index):
+                        continue
+                    _data_index = _fit_index_to_data_index[_fit_index]
+                    _blocks[_data_index] = add_cov_mats(_blocks[_data_index], -_cov_mat)
+                    _coupling[_data_indices[_data_index]:_data_indices[_data_index + 1]] = _factor
+                _couplings.append(_coupling)
+            return BlockCovMat(
+                blocks=_blocks,
+                coupling=np.hstack(_couplings) if _couplings else None
+            )
 
         self._nexus.add_function(
             func=lambda *p: _combine_cov_mats('x', *p),
@@ -279,10 +279,10 @@ class MultiFit(FitBase):
 
         def total_cov_mat_inverse(x_cov_mat, derivatives, y_cov_mat):
             if self._min_x_error is not None:
-                _cov_mat = y_cov_mat + x_cov_mat * np.outer(derivatives, derivatives)
+                _cov_mat = y_cov_mat + x_cov_mat.scaled(derivatives)
             else:
                 _cov_mat = y_cov_mat
-            return np.linalg.inv(_cov_mat)
+            return _cov_mat.I
 
         self._nexus.add_function(total_cov_mat_inverse)
         _shared_cost_function = SharedCostFunction()
@@ -393,6 +393,15 @@ class MultiFit(FitBase):
         self._on_error_change()
         return name
 
+    def _shared_error_enabled(self, name, fit_index):
+        _error_dict = self._shared_error_dicts[name]
+        _fit = self._fits[fit_index]
+        if _error_dict['reference_name'] == 'data':
+            _target = _fit.data_container
+        else:
+            _target = _fit._param_model
+        return _target._error_dicts[name]['enabled']
+
     def _on_error_change(self):
         if not self._shared_error_nodes_initialized:
             self._init_shared_error_nodes()
@@ -400,7 +409,7 @@ class MultiFit(FitBase):
         for _fit in self._fits:
             _fit._on_error_change()
 
-        _x_errors = np.sqrt(np.diag(self._nexus.get("x_cov_mat").value))
+        _x_errors = np.sqrt(self._nexus.get("x_cov_mat").value.diagonal())
         _non_zero_x_errors = _x_errors[_x_errors > 0.0]
         self._min_x_error = None if len(_non_zero_x_errors) == 0 else np.min(_non_zero_x_errors)
 
@@ -97,6 +97,8 @@ class DataContainerYamlWriter(YamlWriterMixin, DataContainerDReprBase):
     def _write_errors_to_yaml(container, yaml_doc):
         # TODO: create public error retrieval interface
         for _err_name, _err_dict in container._error_dicts.items():
+            if _err_name == HistContainer.WEIGHT_ERROR_NAME and 'raw_weights' in yaml_doc:
+                continue  # registered again when filling the weighted entries
 
             _err_obj = _err_dict['err']
             _err_axis = _err_dict.get('axis', None)
@@ -168,12 +170,14 @@ class DataContainerYamlWriter(YamlWriterMixin, DataContainerDReprBase):
         # -- write representation for container types
         if _class is HistContainer:
             _yaml_doc['bin_edges'] = list(map(float, container.bin_edges))
-            if container._manual_heights:
+            if container._manual_heights or not container.store_raw_data:
                 _yaml_doc['bin_heights'] = list(map(float, container.data))  # float64 -> float
                 _yaml_doc['underflow'] = float(container.underflow)
                 _yaml_doc['overflow'] = float(container.underflow)
             else:
                 _yaml_doc['raw_data'] = list(map(float, container.raw_data))  # float64 -> float
+                if container.weighted:
+                    _yaml_doc['raw_weights'] = list(map(float, container.raw_weights))
         elif _class is IndexedContainer or _class is UnbinnedContainer:
             _yaml_doc['data'] = container.data.tolist()
         elif _class is XYContainer:
@@ -244,6 +248,7 @@ class DataContainerYamlReader(YamlReaderMixin, DataContainerDReprBase):
                 _n_bins = len(_bin_edges) - 1
                 _bin_range = (_bin_edges[0], _bin_edges[-1])
             _raw_data = yaml_doc.pop('raw_data', None)
+            _raw_weights = yaml_doc.pop('raw_weights', None)
             _bin_heights = yaml_doc.pop('bin_heights', None)
             if _raw_data and _bin_heights:
                 raise YamlReaderException("When reading in a histogram dataset only one out of "
@@ -251,7 +256,9 @@ class DataContainerYamlReader(YamlReaderMixin, DataContainerDReprBase):
             _container_obj = HistContainer(n_bins=_n_bins,
                                            bin_range=_bin_range,
                                            bin_edges=_bin_edges,
-                                           fill_data=_raw_data)
+                                           fill_data=_raw_data if _raw_weights is None else None)
+            if _raw_weights is not None:
+                _container_obj.fill(_raw_data, weights=_raw_weights)
             if _bin_heights:
                 _underflow = yaml_doc.pop('underflow', 0)
                 _overflow = yaml_doc.pop('overflow', 0)
@@ -87,6 +87,14 @@ class FitYamlWriter(YamlWriterMixin, FitDReprBase):
         _yaml_doc['minimizer'] = fit._minimizer
         _yaml_doc['minimizer_kwargs'] = fit._minimizer_kwargs
 
+        if isinstance(fit, UnbinnedFit):
+            # options for large samples, the normalization is part of the parametric model
+            _yaml_doc['chunk_size'] = fit._chunk_size
+            _yaml_doc['n_workers'] = fit._n_workers
+            _yaml_doc['approximate'] = fit._approximate
+            _yaml_doc['n_bins'] = int(fit._n_bins)
+            _yaml_doc['polish'] = bool(fit._polish)
+
         _yaml_doc['parameter_constraints'] = [ConstraintYamlWriter._make_representation(_parameter_constraint)
                                               for _parameter_constraint in fit.parameter_constraints]
         _yaml_doc['fixed_parameters'] = fit._fitter.fixed_parameters
@@ -149,6 +157,8 @@ class FitYamlReader(YamlReaderMixin, FitDReprBase):
             _override_dict['model_function'] = 'parametric_model'
             _override_dict['model_function_name'] = 'parametric_model'
             _override_dict['latex_model_function_name'] = 'parametric_model'
+            _override_dict['normalization'] = 'parametric_model'
+            _override_dict['normalization_range'] = 'parametric_model'
         elif fit_class is XYFit:
             _override_dict['x_data'] = ['dataset', 'parametric_model']
             _override_dict['y_data'] = 'dataset'
@@ -187,6 +197,14 @@ class FitYamlReader(YamlReaderMixin, FitDReprBase):
         _minimizer_kwargs = yaml_doc.pop('minimizer_kwargs', None)
         # change fit kwargs for different fit types if necessary
         _fit_kwargs = dict(minimizer=_minimizer, minimizer_kwargs=_minimizer_kwargs)
+        if _class is UnbinnedFit:
+            for _key in ('chunk_size', 'n_workers', 'approximate', 'n_bins', 'polish'):
+                if _key in yaml_doc:
+                    _fit_kwargs[_key] = yaml_doc.pop(_key)
+        if _class is UnbinnedFit and _read_parametric_model is not None:
+            # the fit creates new parametric models with the same normalization when the data changes
+            _fit_kwargs['normalization'] = _read_parametric_model.normalization
+            _fit_kwargs['normalization_range'] = _read_parametric_model.fixed_normalization_range
         _fit_object = _class(_data, _read_model_function, **_fit_kwargs)
 
         if _read_parametric_model is not None:
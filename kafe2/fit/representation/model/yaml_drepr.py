@@ -208,6 +208,13 @@ class ParametricModelYamlWriter(YamlWriterMixin, ParametricModelDReprBase):
             _yaml_doc['data'] = parametric_model.support.tolist()
             _yaml_doc['model_function'] = ModelFunctionYamlWriter._make_representation(
                 parametric_model._model_function_object)
+            if isinstance(parametric_model.normalization, str):
+                _yaml_doc['normalization'] = parametric_model.normalization_string
+            elif parametric_model.normalization is not None:
+                _yaml_doc['normalization'] = _process_function_code_for_dump(
+                    parametric_model.normalization_string)
+            if parametric_model.fixed_normalization_range is not None:
+                _yaml_doc['normalization_range'] = list(map(float, parametric_model.fixed_normalization_range))
         elif _class is XYParametricModel:
             _yaml_doc['x_data'] = parametric_model.x.tolist()
             _yaml_doc['y_data'] = parametric_model.y.tolist()
@@ -307,6 +314,7 @@ class ParametricModelYamlReader(YamlReaderMixin, ParametricModelDReprBase):
         _kwarg_list = []
         _constructor_kwargs = {}
         _hist_model_bin_evaluation_source = None  # Set if an antiderivative function is read in.
+        _unbinned_model_normalization_source = None  # Set if an antiderivative function is read in.
         if _class is HistParametricModel:
             if 'bin_edges' in yaml_doc:
                 _bin_edges = yaml_doc.pop('bin_edges')
@@ -334,6 +342,14 @@ class ParametricModelYamlReader(YamlReaderMixin, ParametricModelDReprBase):
             _kwarg_list.append('shape_like')
         elif _class is UnbinnedParametricModel:
             _kwarg_list.append('data')
+            _kwarg_list.append('normalization_range')
+            if 'normalization' in yaml_doc:
+                _normalization = yaml_doc.pop('normalization')
+                if _normalization is not None and 'def' in _normalization:
+                    _constructor_kwargs['normalization'] = _parse_function(_normalization)
+                    _unbinned_model_normalization_source = _normalization
+                else:
+                    _constructor_kwargs['normalization'] = _normalization
         elif _class is XYParametricModel:
             _kwarg_list.append('x_data')
             yaml_doc.pop('y_data', None)  # remove y_data from dict
@@ -376,6 +392,8 @@ class ParametricModelYamlReader(YamlReaderMixin, ParametricModelDReprBase):
         _parametric_model_object = _class(**_constructor_kwargs)
         if _hist_model_bin_evaluation_source is not None:
             _parametric_model_object._bin_evaluation_string = _hist_model_bin_evaluation_source
+        if _unbinned_model_normalization_source is not None:
+            _parametric_model_object._normalization_string = _unbinned_model_normalization_source
 
         # add the label for all types
         _parametric_model_object.label = yaml_doc.pop('model_label', None)
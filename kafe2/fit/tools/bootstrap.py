@@ -0,0 +1,381 @@
+import warnings
+
+import numpy as np
+import scipy.stats
+import six
+
+from ...core.error import SimpleGaussianError
+from .._base.ensemble import _get_fork_context
+from ..histogram import HistFit
+from ..unbinned import UnbinnedFit
+from ..xy import XYFit
+
+
+__all__ = ["Bootstrap", "BootstrapException"]
+
+
+# bootstrap used by the worker processes (fits cannot be pickled, so the workers inherit it when forking)
+_WORKER_BOOTSTRAP = None
+
+
+def _do_replicates_in_worker(task):
+    _start, _stop, _seed_sequence = task
+    return (_start,) + _WORKER_BOOTSTRAP._do_replicates(_stop - _start, _seed_sequence)
+
+
+class BootstrapException(Exception):
+    pass
+
+
+class _CaseResampler(object):
+    """Resample the data points (or events) of a fit with replacement. The replicates are index arrays."""
+
+    def __init__(self, fit, unit_values):
+        self._fit = fit
+        self.n_units = len(unit_values)
+        # units with similar values have similar influence on the parameters -> group them by their rank
+        self._unit_order = np.argsort(unit_values, kind='mergesort')
+
+    def draw(self, random_state, n_replicates):
+        return random_state.integers(0, self.n_units, size=(n_replicates, self.n_units))
+
+    def get_groups(self, n_groups):
+        """Assign the units to groups of neighboring values. Returns the group of each unit and the
+        expected number of units drawn from each group."""
+        _groups = np.empty(self.n_units, dtype=int)
+        _groups[self._unit_order] = np.arange(self.n_units) * n_groups // self.n_units
+        return _groups, np.bincount(_groups, minlength=n_groups).astype(float)
+
+    def count_groups(self, replicates, groups, n_groups):
+        """number of units drawn from each group, one row per replicate"""
+        _offsets = np.arange(len(replicates))[:, np.newaxis] * n_groups
+        return np.bincount((_offsets + groups[replicates]).ravel(),
+                           minlength=len(replicates) * n_groups).reshape(-1, n_groups)
+
+
+class _XYResampler(_CaseResampler):
+    """Resample the *xy* data points together with their uncorrelated pointwise uncertainties."""
+
+    def __init__(self, fit):
+        self._x = fit.data_container.x.copy()
+        self._y = fit.data_container.y.copy()
+        self._errors = []
+        for _container in (fit.data_container, fit._param_model):
+            for _err_dict in _container._error_dicts.values():
+                _err = _err_dict['err']
+                if not isinstance(_err, SimpleGaussianError) or _err.corr_coeff != 0:
+                    raise BootstrapException("Cannot resample data points with correlated uncertainties!")
+                _values = _err.error_rel if _err.relative else _err.error
+                self._errors.append((_err, np.ones(len(self._x)) * _values))
+        super(_XYResampler, self).__init__(fit, self._x)
+
+    def apply(self, replicate):
+        for _err, _values in self._errors:
+            if _err.relative:
+                _err.error_rel = _values[replicate]
+            else:
+                _err.error = _values[replicate]
+        self._fit.data_container.x = self._x[replicate]
+        self._fit.data_container.y = self._y[replicate]
+        self._fit._param_model._clear_total_error_cache()
+        self._fit._on_error_change()
+        self._fit._nexus.get('x_data').mark_for_update()
+        self._fit._nexus.get('y_data').mark_for_update()
+
+    def restore(self):
+        self.apply(np.arange(self.n_units))
+
+
+class _UnbinnedResampler(_CaseResampler):
+    """Resample the events of an unbinned fit."""
+
+    def __init__(self, fit):
+        self._events = fit.data
+        super(_UnbinnedResampler, self).__init__(fit, self._events)
+
+    def apply(self, replicate):
+        self._fit.data = self._events[replicate]
+        # the model values and the log-likelihood are only marked as stale if the parameters change
+        self._fit._nexus.get('model').mark_for_update()
+        self._fit._nexus.get('total_log_likelihood').mark_for_update()
+
+    def restore(self):
+        self.apply(slice(None))
+
+
+class _HistResampler(object):
+    """Reweight the entries of a histogram with independent Poisson-distributed weights with mean 1.
+    The replicates are the resulting bin contents including the underflow and overflow bins."""
+
+    def __init__(self, fit):
+        self._fit = fit
+        _container = fit.data_container
+        if _container.weighted:
+            raise BootstrapException("Cannot reweight the entries of a weighted histogram!")
+        self._counts = np.concatenate([[_container.underflow], _container.data, [_container.overflow]])
+        self.n_units = len(self._counts)
+        # set_bins() replaces these attributes, so restoring them restores the filled histogram
+        self._container_state = dict(_container.__dict__)
+
+    def draw(self, random_state, n_replicates):
+        # the sum of n Poisson(1)-distributed weights is Poisson(n)-distributed
+        return random_state.poisson(self._counts, size=(n_replicates, self.n_units))
+
+    def get_groups(self, n_groups):
+        """Assign the bins to groups of neighboring bins. Returns the group of each bin and the expected
+        number of entries in each group."""
+        _groups = np.arange(self.n_units) * n_groups // self.n_units
+        return _groups, np.bincount(_groups, weights=self._counts, minlength=n_groups)
+
+    def count_groups(self, replicates, groups, n_groups):
+        """number of entries in each group, one row per replicate"""
+        return np.dot(replicates, np.eye(n_groups)[groups])
+
+    def _mark_data_for_update(self):
+        self._fit._nexus.get('data').mark_for_update()
+        # the model is scaled to the number of entries
+        self._fit._nexus.get('model').mark_for_update()
+
+    def apply(self, replicate):
+        self._fit.data_container.set_bins(replicate[1:-1], underflow=replicate[0], overflow=replicate[-1])
+        self._mark_data_for_update()
+
+    def restore(self):
+        self._fit.data_container.__dict__.update(self._container_state)
+        self._mark_data_for_update()
+
+
+class Bootstrap(object):
+    """
+    Nonparametric bootstrap of the parameter estimates of a fit.
+
+    The fit is repeated for replicates of the data generated by resampling:
+
+    * for :py:obj:`~kafe2.fit.XYFit` objects, the data points are drawn with replacement together with
+      their pointwise uncertainties, which must not be correlated,
+    * for :py:obj:`~kafe2.fit.UnbinnedFit` objects, the events are drawn with replacement,
+    * for :py:obj:`~kafe2.fit.HistFit` objects, the entries are reweighted with Poisson-distributed weights,
+      i.e. each bin content is drawn from a Poisson distribution around the observed bin content.
+
+    The replicates are generated in chunks. Only the data arrays of the fit are swapped for each replicate,
+    and each fit starts at the parameter values of the nominal fit. The replicates can be split across
+    worker processes, each of which gets a copy of the fit by forking the current process.
+
+    Confidence intervals for the parameters are calculated from the distribution of the replicate parameter
+    values with the percentile or the bias-corrected and accelerated (BCa) method. The acceleration is
+    estimated by regressing the replicate parameter values on the resampling frequencies of groups of
+    neighboring data points, so no additional jackknife fits are needed.
+    """
+
+    # maximum number of random integers per chunk of replicates
+    _MAX_CHUNK_ELEMENTS = 2**22
+    _MAX_CHUNK_SIZE = 64
+    # maximum number of groups of data points for estimating the BCa acceleration
+    _MAX_INFLUENCE_GROUPS = 50
+
+    def __init__(self, fit, n_replicates=1000):
+        """
+        Construct a :py:obj:`Bootstrap` object for a fit. If the fit has not been performed yet,
+        it is performed to get the nominal parameter values.
+
+        :param fit: the fit
+        :type fit: :py:obj:`~kafe2.fit.XYFit`, :py:obj:`~kafe2.fit.UnbinnedFit` or :py:obj:`~kafe2.fit.HistFit`
+        :param n_replicates: number of bootstrap replicates
+        :type n_replicates: int
+        """
+        if isinstance(fit, XYFit):
+            self._resampler = _XYResampler(fit)
+        elif isinstance(fit, UnbinnedFit):
+            self._resampler = _UnbinnedResampler(fit)
+        elif isinstance(fit, HistFit):
+            self._resampler = _HistResampler(fit)
+        else:
+            raise BootstrapException("Bootstrap resampling is not supported for fits of type '%s'!"
+                                     % (type(fit).__name__,))
+        if n_replicates < 2:
+            raise BootstrapException("Number of replicates must be at least 2: %r" % (n_replicates,))
+        if not fit.did_fit:
+            fit.do_fit()
+        self._fit = fit
+        self._n_replicates = int(n_replicates)
+        self._nominal_parameter_values = np.array(fit.parameter_values)
+        self._n_groups = max(1, min(self._resampler.n_units, self._MAX_INFLUENCE_GROUPS, self._n_replicates // 20))
+        self._groups, self._group_sizes = self._resampler.get_groups(self._n_groups)
+        self._parameter_replicates = None
+        self._group_counts = None
+
+    # -- private methods
+
+    def _do_replicates(self, n_replicates, seed_sequence):
+        """Draw and fit a chunk of replicates. Returns the parameter values and the number of
+        units drawn from each group, one row per replicate."""
+        _random_state = np.random.Generator(np.random.PCG64(seed_sequence))
+        _replicates = self._resampler.draw(_random_state, n_replicates)
+        _parameter_values = np.full((n_replicates, len(self._nominal_parameter_values)), np.nan)
+        for _i, _replicate in enumerate(_replicates):
+            self._resampler.apply(_replicate)
+            # warm start at the nominal minimum
+            self._fit.set_all_parameter_values(self._nominal_parameter_values)
+            try:
+                self._fit.do_fit()
+            except Exception:
+                continue  # degenerate replicate, e.g. too few distinct data points
+            _parameter_values[_i] = self._fit.parameter_values
+        return _parameter_values, self._resampler.count_groups(_replicates, self._groups, self._n_groups)
+
+    def _get_acceleration(self, parameter_replicates, group_counts):
+        """Estimate the BCa acceleration from the empirical influence of groups of data points, obtained by
+        regressing the replicate parameter values on the resampling frequencies."""
+        _frequencies = group_counts - np.mean(group_counts, axis=0)
+        _deviations = parameter_replicates - np.mean(parameter_replicates, axis=0)
+        _coefficients = np.linalg.lstsq(_frequencies, _deviations, rcond=None)[0]
+        # the influence values of all data points add up to zero
+        _influence = _coefficients - np.dot(self._group_sizes, _coefficients) / np.sum(self._group_sizes)
+        _numerator = np.dot(self._group_sizes, _influence ** 3)
+        _denominator = 6.0 * np.dot(self._group_sizes, _influence ** 2) ** 1.5
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(_denominator > 0, _numerator / _denominator, 0.0)
+
+    # -- public properties
+
+    @property
+    def n_replicates(self):
+        """the number of bootstrap replicates"""
+        return self._n_replicates
+
+    @property
+    def nominal_parameter_values(self):
+        """the parameter values of the fit to the original data"""
+        return self._nominal_parameter_values.copy()
+
+    @property
+    def parameter_replicates(self):
+        """the parameter values for each replicate, one row per replicate (``nan`` if the fit failed)"""
+        if self._parameter_replicates is None:
+            raise BootstrapException("No replicates: call run() first!")
+        return self._parameter_replicates
+
+    @property
+    def n_failed(self):
+        """the number of replicates for which the fit failed"""
+        return int(np.sum(np.any(np.isnan(self.parameter_replicates), axis=1)))
+
+    @property
+    def parameter_errors(self):
+        """the standard deviations of the replicate parameter values"""
+        return np.nanstd(self.parameter_replicates, axis=0, ddof=1)
+
+    @property
+    def parameter_cov_mat(self):
+        """the covariance matrix of the replicate parameter values"""
+        _replicates = self.parameter_replicates
+        _replicates = _replicates[~np.any(np.isnan(_replicates), axis=1)]
+        return np.atleast_2d(np.cov(_replicates, rowvar=False))
+
+    # -- public methods
+
+    def run(self, n_jobs=None, seed=None):
+        """
+        Draw and fit the bootstrap replicates. The result does not depend on the number of worker processes.
+        After the run, the fit is restored to the state of the nominal fit.
+
+        :param n_jobs: number of worker processes (if ``None`` or ``1``, run in the current process,
+                       if ``-1``, use one worker process per CPU)
+        :type n_jobs: int or None
+        :param seed: seed for drawing the replicates
+        :type seed: int, sequence of int or None
+        :return: the parameter values for each replicate, one row per replicate
+        :rtype: numpy.ndarray
+        """
+        if n_jobs == -1:
+            n_jobs = _get_fork_context().cpu_count() if _get_fork_context() is not None else 1
+        if n_jobs is not None and n_jobs < 1:
+            raise BootstrapException("Number of jobs must be a positive integer or -1: %r" % (n_jobs,))
+        if not hasattr(np.random, 'SeedSequence'):
+            raise BootstrapException("Bootstrap resampling requires numpy>=1.17!")
+
+        # the chunks and their random streams do not depend on the number of worker processes
+        _chunk_size = max(1, min(self._MAX_CHUNK_SIZE, self._MAX_CHUNK_ELEMENTS // self._resampler.n_units))
+        _starts = list(six.moves.range(0, self._n_replicates, _chunk_size))
+        _seed_sequences = np.random.SeedSequence(seed).spawn(len(_starts))
+        _tasks = [(_start, min(_start + _chunk_size, self._n_replicates), _seed_sequence)
+                  for _start, _seed_sequence in zip(_starts, _seed_sequences)]
+
+        _parallel = n_jobs is not None and n_jobs > 1 and len(_tasks) > 1
+        _fork_context = _get_fork_context() if _parallel else None
+        if _parallel and _fork_context is None:
+            warnings.warn("Cannot fork worker processes on this platform: fitting replicates sequentially.")
+
+        _parameter_replicates = np.empty((self._n_replicates, len(self._nominal_parameter_values)))
+        _group_counts = np.empty((self._n_replicates, self._n_groups))
+        global _WORKER_BOOTSTRAP
+        _WORKER_BOOTSTRAP = self
+        _minimizer = self._fit._fitter._minimizer
+        if _fork_context is None:
+            _minimizer._save_state()  # the fit is modified in this process
+        _pool = _fork_context.Pool(n_jobs) if _fork_context is not None else None
+        try:
+            if _pool is None:
+                _results = six.moves.map(_do_replicates_in_worker, _tasks)
+            else:
+                _results = _pool.imap_unordered(_do_replicates_in_worker, _tasks)
+            for _start, _chunk_parameters, _chunk_group_counts in _results:
+                _parameter_replicates[_start:_start + len(_chunk_parameters)] = _chunk_parameters
+                _group_counts[_start:_start + len(_chunk_parameters)] = _chunk_group_counts
+        except BaseException:
+            if _pool is not None:
+                _pool.terminate()
+                _pool.join()
+                _pool = None
+            raise
+        finally:
+            if _pool is not None:
+                _pool.close()
+                _pool.join()
+            _WORKER_BOOTSTRAP = None
+            if _fork_context is None:
+                self._resampler.restore()
+                _minimizer._load_state()
+
+        self._parameter_replicates = _parameter_replicates
+        self._group_counts = _group_counts
+        if self.n_failed:
+            warnings.warn("The fit failed for %d of %d bootstrap replicates, they are ignored."
+                          % (self.n_failed, self._n_replicates))
+        return _parameter_replicates
+
+    def get_intervals(self, method='percentile', sigma=1.0, cl=None):
+        """
+        Calculate two-sided confidence intervals for the parameters.
+
+        :param method: ``'percentile'`` or ``'bca'`` (bias-corrected and accelerated)
+        :type method: str
+        :param sigma: confidence level in units of the standard deviation of a normal distribution
+        :type sigma: float
+        :param cl: confidence level, overrides **sigma** if not ``None``
+        :type cl: float or None
+        :return: the lower and upper interval bounds, one row per parameter
+        :rtype: numpy.ndarray
+        """
+        if cl is None:
+            cl = scipy.stats.norm.cdf(sigma) - scipy.stats.norm.cdf(-sigma)
+        if not 0.0 < cl < 1.0:
+            raise BootstrapException("Confidence level must be between 0 and 1: %r" % (cl,))
+        _valid = ~np.any(np.isnan(self.parameter_replicates), axis=1)
+        _replicates = self.parameter_replicates[_valid]
+        _alphas = np.array([0.5 * (1.0 - cl), 0.5 * (1.0 + cl)])
+        if method == 'percentile':
+            _quantiles = np.tile(_alphas, (_replicates.shape[1], 1))
+        elif method == 'bca':
+            # bias correction from the fraction of replicates below the nominal value
+            _fraction_below = (np.mean(_replicates < self._nominal_parameter_values, axis=0)
+                               + 0.5 * np.mean(_replicates == self._nominal_parameter_values, axis=0))
+            _z_0 = scipy.stats.norm.ppf(np.clip(_fraction_below, 0.5 / len(_replicates),
+                                                1.0 - 0.5 / len(_replicates)))
+            _acceleration = self._get_acceleration(_replicates, self._group_counts[_valid])
+            _z = _z_0[:, np.newaxis] + scipy.stats.norm.ppf(_alphas)
+            _quantiles = scipy.stats.norm.cdf(_z_0[:, np.newaxis] + _z / (1.0 - _acceleration[:, np.newaxis] * _z))
+        else:
+            raise BootstrapException("Unknown interval method '%s', must be 'percentile' or 'bca'!" % (method,))
+        return np.array([np.quantile(_replicates[:, _i], _quantiles[_i])
+                         for _i in six.moves.range(_replicates.shape[1])])
@@ -1,9 +1,17 @@
+import hashlib
+import multiprocessing
+import os
+import warnings
+
 import numpy as np
 import six
 import matplotlib as mpl
+from scipy import sparse
 
 from ...config import kafe2_rc
 from ...core.confidence import ConfidenceLevel
+from ...core.contour import ContourFactory
+from ...core.error import BlockCovMat, CovMat
 from .._base import FitBase
 from matplotlib import pyplot as plt, rcParams
 from matplotlib import gridspec as gs
@@ -15,6 +23,42 @@ from matplotlib import rc_context
 __all__ = ["ContoursProfiler"]
 
 
+# profiler used by the worker processes (fits cannot be pickled, so the workers inherit it when forking)
+_WORKER_PROFILER = None
+
+
+def _compute_in_worker(task):
+    """calculate a profile (task ``(parameter,)``) or the contours of a parameter pair
+    (task ``(parameter_1, parameter_2)``)"""
+    if len(task) == 1:
+        return task, _WORKER_PROFILER._compute_profile(task[0])
+    return task, _WORKER_PROFILER._compute_contours(task[0], task[1],
+                                                    _WORKER_PROFILER._contour_kwargs['smoothing_sigma'])
+
+
+def _update_hash(hash_object, value):
+    """add a (possibly nested) value to a :py:mod:`hashlib` hash object"""
+    if isinstance(value, (CovMat, BlockCovMat)):
+        value = value.mat
+    if sparse.issparse(value):
+        # the representation of sparse matrices does not contain the values
+        _csr = sparse.csr_matrix(value)
+        _csr.sort_indices()
+        value = ['sparse', _csr.shape, _csr.data, _csr.indices, _csr.indptr]
+    if isinstance(value, (list, tuple)):
+        hash_object.update(('%s:%d' % (type(value).__name__, len(value))).encode('utf-8'))
+        for _item in value:
+            _update_hash(hash_object, _item)
+    elif isinstance(value, np.ndarray):
+        _array = np.ascontiguousarray(value)
+        hash_object.update(repr((_array.dtype.str, _array.shape)).encode('utf-8'))
+        hash_object.update(_array.tobytes())
+    else:
+        if isinstance(value, np.generic):
+            value = value.item()
+        hash_object.update(repr(value).encode('utf-8'))
+
+
 def _linear_range_transform(range_, factor, asymmetry=0.0):
     """Return a range that is `factor` larger than `range_`.
 
@@ -128,7 +172,9 @@ class ContoursProfiler(object):
     functions of two variables and can be visualized in the plane by drawing the 3D *contours*
     along which this function remains constant.
 
-    This object offers a means of calculating both profiles and contours
+    This object offers a means of calculating both profiles and contours. The results are cached for
+    the state of the fit (parameter values at the minimum, data, uncertainties, constraints and minimizer
+    settings), so they are only calculated again if the fit has changed.
     """
 
     _DEFAULT_PLOT_PROFILE_KWARGS = dict(marker='', linewidth=2)
@@ -142,7 +188,7 @@ class ContoursProfiler(object):
     def __init__(self, fit_object,
                  profile_points=100, profile_subtract_min=True, profile_bound=2.45,
                  contour_points=100, contour_sigma_values=(1.0, 2.0), contour_smoothing_sigma=0.0,
-                 contour_method_kwargs=None):
+                 contour_method_kwargs=None, cache_path=None):
         """
         Construct a :py:obj:`~kafe2.fit._base.profile.ContoursProfiler` object:
 
@@ -162,6 +208,12 @@ class ContoursProfiler(object):
         :param contour_smoothing_sigma: apply a smoothing Gaussian filter with this sigma parameter to each contour
                                         (default is ``0.0``, meaning no smoothing)
         :type contour_smoothing_sigma: float
+        :param contour_method_kwargs: keyword arguments passed on to the contour method of the minimizer
+        :type contour_method_kwargs: dict or None
+        :param cache_path: if not ``None``, the calculated profiles and contours are also stored in this ``.npz``
+                           file and results stored there by earlier runs are reused. Only the results for the
+                           current state of the fit are kept.
+        :type cache_path: str or None
         """
         if not isinstance(fit_object, FitBase):
             raise ContoursProfilerException("Object %r is not a fit object!" % (fit_object,))
@@ -182,6 +234,170 @@ class ContoursProfiler(object):
                                             for pf in self._fit._get_model_function_parameter_formatters()]
 
         self._figures = []
+        # calculated profiles and contours by cache key for the fit state with the fingerprint below
+        self._cache = dict()
+        self._cache_fingerprint = None
+        self._cache_path = cache_path
+        if cache_path is not None and os.path.exists(cache_path):
+            self._load_cache()
+
+    def _get_parameter_names(self, parameters):
+        """the names of the given parameters or of all parameters if ``None``"""
+        if parameters is None:
+            return list(self._fit.parameter_name_value_dict.keys())
+        # check if there are any unknown parameters
+        _unknown_parameters = set(parameters) - set(self._fit.parameter_name_value_dict.keys())
+        if _unknown_parameters:
+            raise ContoursProfilerException("Unknown parameters: {}".format(_unknown_parameters))
+        return list(parameters)
+
+    @staticmethod
+    def _swap_contour_axes(contour):
+        """the contour with the *x* and *y* parameters exchanged"""
+        if contour is None:
+            return None
+        if contour.xy_points is not None:
+            return ContourFactory.create_xy_contour(contour.xy_points[::-1], sigma=contour.sigma)
+        return ContourFactory.create_grid_contour(contour.grid_y, contour.grid_x, contour.grid_z.T,
+                                                  sigma=contour.sigma)
+
+    def _get_fit_fingerprint(self):
+        """a hash of everything the profiles and contours depend on: the parameter minimum, the data,
+        the uncertainties, the parameter constraints and the minimizer settings"""
+        _fit = self._fit
+        _fitter = _fit._fitter
+        _errors = [(_name, type(_err).__name__, _err.relative,
+                    _err.cov_mat_rel if _err.relative else _err.cov_mat)
+                   for _name, _err in sorted(six.iteritems(_fit.get_matching_errors()))]
+        _constraints = [(type(_constraint).__name__,
+                         getattr(_constraint, 'indices', getattr(_constraint, 'index', None)),
+                         getattr(_constraint, 'values', getattr(_constraint, 'value', None)),
+                         getattr(_constraint, 'cov_mat', getattr(_constraint, 'uncertainty', None)),
+                         _constraint.relative)
+                        for _constraint in _fit.parameter_constraints]
+        _minimizer = [type(_fitter._minimizer).__name__, _fitter._minimizer.tolerance,
+                      _fitter._minimizer.errordef, sorted(six.iteritems(_fitter._fixed_pars)),
+                      sorted(six.iteritems(_fitter._limited_pars))]
+        _hash = hashlib.sha256()
+        _update_hash(_hash, [type(_fit).__name__, list(_fit.parameter_names), np.asarray(_fit.parameter_values),
+                             np.asarray(_fit.parameter_errors), _fit.cost_function_value,
+                             type(_fit._cost_function).__name__, _fit.data, _errors, _constraints, _minimizer])
+        return _hash.hexdigest()
+
+    def _get_cache_key(self, fingerprint, *args):
+        """the cache key of a profile (**args** ``('profile', parameter)``) or a list of contours
+        (**args** ``('contours', parameter_1, parameter_2, smoothing_sigma)``)"""
+        if args[0] == 'profile':
+            _settings = [self._profile_kwargs['points'], self._profile_kwargs['bound'],
+                         self._profile_kwargs['subtract_min']]
+        else:
+            _settings = [self._contour_kwargs['points'],
+                         [_cl_obj.sigma for _cl_obj in self._contour_kwargs['confidence_levels']],
+                         sorted(six.iteritems(self._contour_kwargs['method_kwargs'] or dict()))]
+        _hash = hashlib.sha256()
+        _update_hash(_hash, [fingerprint, list(args), _settings])
+        return _hash.hexdigest()
+
+    def _load_cache(self):
+        """read the profiles and contours stored in the cache file"""
+        _contour_fields = dict()
+        with np.load(self._cache_path) as _file:
+            if 'fingerprint' not in _file.files:
+                return  # not written by this version, the fit state of the entries is unknown
+            self._cache_fingerprint = str(_file['fingerprint']) or None
+            for _name in _file.files:
+                _fields = _name.split('/')
+                if _fields[0] == 'fingerprint':
+                    continue
+                if _fields[0] == 'profile':
+                    self._cache[_fields[1]] = _file[_name]
+                else:
+                    # contours are stored as 'contours/<key>/<index>/<attribute>'
+                    _contour_fields.setdefault(_fields[1], dict()).setdefault(
+                        int(_fields[2]), dict())[_fields[3]] = _file[_name]
+        for _key, _contours in six.iteritems(_contour_fields):
+            self._cache[_key] = []
+            for _index in sorted(_contours):
+                _fields = _contours[_index]
+                _sigma = float(_fields['sigma'])
+                if 'xy_points' in _fields:
+                    _cont = ContourFactory.create_xy_contour(_fields['xy_points'], sigma=_sigma)
+                elif 'grid_z' in _fields:
+                    _cont = ContourFactory.create_grid_contour(_fields['grid_x'], _fields['grid_y'], _fields['grid_z'],
+                                                               sigma=_sigma)
+                else:
+                    _cont = None  # the contour could not be calculated
+                self._cache[_key].append((ConfidenceLevel(n_dimensions=2, sigma=_sigma), _cont))
+
+    def _save_cache(self):
+        """write all profiles and contours in the cache to the cache file"""
+        if self._cache_path is None:
+            return
+        _arrays = dict(fingerprint=np.array(self._cache_fingerprint or ''))
+        for _key, _result in six.iteritems(self._cache):
+            if isinstance(_result, np.ndarray):
+                _arrays['profile/%s' % (_key,)] = _result
+                continue
+            for _index, (_cl_obj, _cont) in enumerate(_result):
+                _prefix = 'contours/%s/%d/' % (_key, _index)
+                _arrays[_prefix + 'sigma'] = np.asarray(_cl_obj.sigma)
+                if _cont is None:
+                    continue
+                if _cont.xy_points is not None:
+                    _arrays[_prefix + 'xy_points'] = np.asarray(_cont.xy_points)
+                else:
+                    _arrays[_prefix + 'grid_x'] = np.asarray(_cont.grid_x)
+                    _arrays[_prefix + 'grid_y'] = np.asarray(_cont.grid_y)
+                    _arrays[_prefix + 'grid_z'] = np.asarray(_cont.grid_z)
+        # use a file object so numpy does not append '.npz' to the path
+        with open(self._cache_path, 'wb') as _file:
+            np.savez(_file, **_arrays)
+
+    def _store_in_cache(self, fingerprint, key, result):
+        """store a result in the cache, the results for other fit states are removed"""
+        if fingerprint != self._cache_fingerprint:
+            self._cache = dict()
+            self._cache_fingerprint = fingerprint
+        self._cache[key] = result
+
+    def _get_cached_contours(self, fingerprint, parameter_1, parameter_2, smoothing_sigma):
+        """the cached contours of a parameter pair or ``None``, the contours with the parameters exchanged
+        are reused if available"""
+        _key = self._get_cache_key(fingerprint, 'contours', parameter_1, parameter_2, smoothing_sigma)
+        if _key in self._cache:
+            return self._cache[_key]
+        _key = self._get_cache_key(fingerprint, 'contours', parameter_2, parameter_1, smoothing_sigma)
+        if _key in self._cache:
+            return [(_cl_obj, self._swap_contour_axes(_cont)) for _cl_obj, _cont in self._cache[_key]]
+        return None
+
+    def _compute_profile(self, parameter):
+        """calculate a profile without looking it up in the cache"""
+        _kwargs = dict(bins=self._profile_kwargs['points'], bound=self._profile_kwargs['bound'],
+                       args=None, subtract_min=self._profile_kwargs['subtract_min'])
+        self._fit._check_dynamic_error_compatibility()
+        return self._fit._fitter.profile(parameter, **_kwargs)  # TODO fix for single fit inside multifit
+
+    def _compute_contours(self, parameter_1, parameter_2, smoothing_sigma):
+        """calculate the contours of a parameter pair without looking them up in the cache"""
+        _contours = []
+        for _cl_obj in self._contour_kwargs['confidence_levels']:
+            _contour_method_kwargs = self._contour_kwargs.get('method_kwargs', dict())
+            if _contour_method_kwargs is None:
+                _contour_method_kwargs = dict()
+            # TODO fix for single fit inside multifit
+            _cont = self._fit._fitter.contour(parameter_1, parameter_2, sigma=_cl_obj.sigma,
+                                              **_contour_method_kwargs)
+
+            # smooth contours if requested
+            if smoothing_sigma > 0 and _cont is not None:
+                from scipy.ndimage.filters import gaussian_filter
+                _cont[0] = gaussian_filter(_cont[0], smoothing_sigma, mode='wrap')
+                _cont[1] = gaussian_filter(_cont[1], smoothing_sigma, mode='wrap')
+
+            _contours.append((_cl_obj, _cont))
+        self._fit._check_dynamic_error_compatibility()
+        return _contours
 
     def _make_figure_gs(self, nrows=1, ncols=1):
         _fig = plt.figure(figsize=(8, 8))  # defaults from matplotlibrc
@@ -254,6 +470,15 @@ class ContoursProfiler(object):
 
     # - get numeric profiles/contours
 
+    def clear_cache(self):
+        """
+        Remove all calculated profiles and contours from the cache. The results are cached by the state of the
+        fit, so clearing the cache is only necessary to force a recalculation. A cache file is not modified.
+        Results for a previous state of the fit are removed automatically when the fit has changed.
+        """
+        self._cache = dict()
+        self._cache_fingerprint = None
+
     def get_profile(self, parameter):
         """
         Calculate and return a profile of the cost function in a parameter.
@@ -263,10 +488,12 @@ class ContoursProfiler(object):
         :return: two-dimensional array of *x* (parameter) values and *y* (cost function) values
         :rtype: two-dimensional array of float
         """
-        _kwargs = dict(bins=self._profile_kwargs['points'], bound=self._profile_kwargs['bound'],
-                       args=None, subtract_min=self._profile_kwargs['subtract_min'])
-        self._fit._check_dynamic_error_compatibility()
-        return self._fit._fitter.profile(parameter, **_kwargs)  # TODO fix for single fit inside multifit
+        _fingerprint = self._get_fit_fingerprint()
+        _key = self._get_cache_key(_fingerprint, 'profile', parameter)
+        if _key not in self._cache:
+            self._store_in_cache(_fingerprint, _key, self._compute_profile(parameter))
+            self._save_cache()
+        return self._cache[_key]
 
     def get_contours(self, parameter_1, parameter_2, smoothing_sigma=None):
         """
@@ -283,24 +510,103 @@ class ContoursProfiler(object):
         """
         if smoothing_sigma is None:
             smoothing_sigma = self._contour_kwargs['smoothing_sigma']
-        _contours = []
-        for _cl_obj in self._contour_kwargs['confidence_levels']:
-            _contour_method_kwargs = self._contour_kwargs.get('method_kwargs', dict())
-            if _contour_method_kwargs is None:
-                _contour_method_kwargs = dict()
-            # TODO fix for single fit inside multifit
-            _cont = self._fit._fitter.contour(parameter_1, parameter_2, sigma=_cl_obj.sigma,
-                                              **_contour_method_kwargs)
+        _fingerprint = self._get_fit_fingerprint()
+        _contours = self._get_cached_contours(_fingerprint, parameter_1, parameter_2, smoothing_sigma)
+        if _contours is None:
+            _contours = self._compute_contours(parameter_1, parameter_2, smoothing_sigma)
+            self._store_in_cache(_fingerprint, self._get_cache_key(
+                _fingerprint, 'contours', parameter_1, parameter_2, smoothing_sigma), _contours)
+            self._save_cache()
+        return _contours
 
-            # smooth contours if requested
-            if smoothing_sigma > 0 and _cont is not None:
-                from scipy.ndimage.filters import gaussian_filter
-                _cont[0] = gaussian_filter(_cont[0], smoothing_sigma, mode='wrap')
-                _cont[1] = gaussian_filter(_cont[1], smoothing_sigma, mode='wrap')
+    def compute_profiles_contours(self, parameters=None, compute_contours=True, n_jobs=None):
+        """
+        Calculate the profiles of the parameters and the contours of all parameter pairs, e.g. before
+        plotting them with :py:meth:`plot_profiles_contours_matrix`. Each contour is calculated only once
+        for a pair of parameters, the contour with the parameters exchanged is obtained by swapping its axes.
+        Profiles and contours already calculated for the current state of the fit are taken from the cache
+        (see :py:meth:`clear_cache`). A cache file is written once after all missing results are calculated.
 
-            _contours.append((_cl_obj, _cont))
-        self._fit._check_dynamic_error_compatibility()
-        return _contours
+        The profiles and contours can be distributed across **n_jobs** worker processes. Each worker process
+        gets its own copy of the fit at the minimum by forking the current process. If forking is not available
+        on the platform, they are calculated sequentially.
+
+        :param parameters: parameters for which to calculate profiles and contours. If ``None``, all parameters.
+        :type parameters: list of parameter names or ``None``
+        :param compute_contours: if ``False``, only calculate the profiles
+        :type compute_contours: bool
+        :param n_jobs: number of worker processes (if ``None`` or ``1``, calculate in the current process,
+                       if ``-1``, use one worker process per CPU)
+        :type n_jobs: int or None
+        :return: the profiles by parameter name and the lists of contours (see :py:meth:`get_contours`)
+                 by pair of parameter names
+        :rtype: tuple of two dicts
+        """
+        _par_names = self._get_parameter_names(parameters)
+        if n_jobs == -1:
+            n_jobs = multiprocessing.cpu_count()
+        if n_jobs is not None and n_jobs < 1:
+            raise ContoursProfilerException("Number of jobs must be a positive integer or -1: %r" % (n_jobs,))
+
+        _fingerprint = self._get_fit_fingerprint()
+        _smoothing_sigma = self._contour_kwargs['smoothing_sigma']
+        _tasks = []
+        if compute_contours:
+            # the contours take longer than the profiles -> schedule them first
+            _tasks += [(_par_names[_col], _par_names[_row])
+                       for _row in six.moves.range(len(_par_names)) for _col in six.moves.range(_row)
+                       if self._get_cached_contours(_fingerprint, _par_names[_col], _par_names[_row],
+                                                    _smoothing_sigma) is None]
+        _tasks += [(_par_name,) for _par_name in _par_names
+                   if self._get_cache_key(_fingerprint, 'profile', _par_name) not in self._cache]
+
+        _parallel = n_jobs is not None and n_jobs > 1 and len(_tasks) > 1
+        _fork_context = None
+        if _parallel:
+            from .._base.ensemble import _get_fork_context  # import here to avoid circular imports
+            _fork_context = _get_fork_context()
+            if _fork_context is None:
+                warnings.warn("Cannot fork worker processes on this platform: calculating profiles and "
+                              "contours sequentially.")
+
+        global _WORKER_PROFILER
+        _WORKER_PROFILER = self
+        _pool = _fork_context.Pool(min(n_jobs, len(_tasks))) if _fork_context is not None else None
+        try:
+            if _pool is None:
+                _results = six.moves.map(_compute_in_worker, _tasks)
+            else:
+                _results = _pool.imap_unordered(_compute_in_worker, _tasks)
+            for _task, _result in _results:
+                if len(_task) == 1:
+                    _key = self._get_cache_key(_fingerprint, 'profile', _task[0])
+                else:
+                    _key = self._get_cache_key(_fingerprint, 'contours', _task[0], _task[1], _smoothing_sigma)
+                self._store_in_cache(_fingerprint, _key, _result)
+        except BaseException:
+            if _pool is not None:
+                _pool.terminate()
+                _pool.join()
+                _pool = None
+            raise
+        finally:
+            if _pool is not None:
+                _pool.close()
+                _pool.join()
+            _WORKER_PROFILER = None
+            if _tasks:
+                # also keep the results calculated before an interruption
+                self._save_cache()
+
+        _profiles = {_par_name: self._cache[self._get_cache_key(_fingerprint, 'profile', _par_name)]
+                     for _par_name in _par_names}
+        _contours = dict()
+        if compute_contours:
+            for _row in six.moves.range(len(_par_names)):
+                for _col in six.moves.range(_row):
+                    _contours[(_par_names[_col], _par_names[_row])] = self._get_cached_contours(
+                        _fingerprint, _par_names[_col], _par_names[_row], _smoothing_sigma)
+        return _profiles, _contours
 
     # - plot profiles/contours
 
@@ -556,10 +862,13 @@ class ContoursProfiler(object):
                                       show_error_span_profiles=False,
                                       full_matrix=False,
                                       label_ticks_in_sigma=True,
-                                      contour_naming_convention='sigma'):
+                                      contour_naming_convention='sigma',
+                                      n_jobs=None):
         """
         Plot all profiles and contours to subplots arranges in a matrix-like fashion.
 
+        All profiles and contours are calculated with :py:meth:`compute_profiles_contours` before plotting.
+
         :param parameters: parameters for which to display profiles and contours. If ``None``, all parameters.
         :type parameters: list of parameter names or ``None``
         :param show_grid_for: subplots for which to show a grid
@@ -583,19 +892,29 @@ class ContoursProfiler(object):
         :param contour_naming_convention: if ``'sigma'`` the contour is labelled in sigma, if ``'cl'`` the contour is
                                           labelled in confidence level
         :type contour_naming_convention: str
+        :param n_jobs: number of worker processes for calculating the profiles and contours
+                       (see :py:meth:`compute_profiles_contours`)
+        :type n_jobs: int or None
 
         :return: figure containing the plot result
         :rtype: `matplotlib.figure.Figure`
         """
+        _par_names = self._get_parameter_names(parameters)
+        # the plotting methods take the results from the cache
+        self.compute_profiles_contours(_par_names, n_jobs=n_jobs)
+        return self._plot_profiles_contours_matrix(
+            _par_names, show_grid_for=show_grid_for, show_ticks_for=show_ticks_for,
+            show_fit_minimum_for=show_fit_minimum_for, show_legend=show_legend,
+            show_parabolic_profiles=show_parabolic_profiles, show_error_span_profiles=show_error_span_profiles,
+            full_matrix=full_matrix, label_ticks_in_sigma=label_ticks_in_sigma,
+            contour_naming_convention=contour_naming_convention)
+
+    def _plot_profiles_contours_matrix(self, parameter_names, show_grid_for, show_ticks_for, show_fit_minimum_for,
+                                       show_legend, show_parabolic_profiles, show_error_span_profiles,
+                                       full_matrix, label_ticks_in_sigma, contour_naming_convention):
+        """plot the matrix of profiles and contours, see :py:meth:`plot_profiles_contours_matrix`"""
+        _par_names = parameter_names
         with rc_context(kafe2_rc):
-            _par_names = parameters
-            if _par_names is None:
-                _par_names = list(self._fit.parameter_name_value_dict.keys())
-            else:
-                # check if there are any unknown parameters
-                _unknown_parameters = set(_par_names) - set(self._fit.parameter_name_value_dict.keys())
-                if _unknown_parameters:
-                    raise ContoursProfilerException("Unknown parameters: {}".format(_unknown_parameters))
 
             # # check if any parameters are fixed and exclude them from the matrix:
             # # TODO: public interface for querying parameter status
@@ -1,6 +1,5 @@
 from __future__ import print_function
 
-import collections
 import matplotlib as mpl
 import numpy as np
 import scipy.stats
@@ -8,6 +7,11 @@ import six
 
 from ...core.error import CovMat
 
+try:
+    from collections.abc import Sequence
+except ImportError:  # Python 2
+    from collections import Sequence
+
 
 __all__ = ['EnsembleVariable', 'EnsembleVariableProbabilityDistribution', 'EnsembleVariablePlotter']
 
@@ -138,6 +142,38 @@ def broadcast_to_shape(array, shape, scheme='default'):
                                                         'expand_right_successive', 'expand_left_successive')))
 
 
+def _get_histogram_counts(values, ranges, bins):
+    """
+    Histogram all components of a batch of realizations of a (multidimensional) random variable in one pass.
+
+    :param values: the realizations, one per row
+    :type values: ``numpy.ndarray`` with shape ``(n,) + variable_shape``
+    :param ranges: the lower and upper histogram limits of each component
+    :type ranges: ``numpy.ndarray`` with shape ``variable_shape + (2,)``
+    :param bins: the number of bins
+    :type bins: int
+    :return: the bin counts, the shape is ``variable_shape + (bins,)``
+    :rtype: ``numpy.ndarray``
+    """
+    _values = values.reshape(len(values), -1)
+    _ranges = ranges.reshape(-1, 2)
+    with np.errstate(divide='ignore', invalid='ignore'):  # values in empty ranges are dropped
+        _bin_index = np.floor((_values - _ranges[:, 0]) / (_ranges[:, 1] - _ranges[:, 0]) * bins)
+    # like `numpy.histogram`, the upper range limit belongs to the last bin
+    _bin_index[_values == _ranges[:, 1]] = bins - 1
+    _in_range = (_bin_index >= 0) & (_bin_index < bins)
+    _flat_index = (np.arange(_values.shape[1]) * bins + _bin_index)[_in_range].astype(np.int64)
+    _counts = np.bincount(_flat_index, minlength=_values.shape[1] * bins)
+    return _counts.reshape(ranges.shape[:-1] + (bins,))
+
+
+def _get_histogram_edges(ranges, bins):
+    """the bin edges for the histogram ranges, the shape is ``variable_shape + (bins + 1,)``"""
+    _fractions = np.linspace(0.0, 1.0, bins + 1)
+    _lower, _upper = ranges[..., :1], ranges[..., 1:]
+    return _lower + (_upper - _lower) * _fractions
+
+
 class EnsembleError(Exception):
     pass
 
@@ -146,22 +182,27 @@ class EnsembleVariable(object):
     """
     Object for storing a finite sample of realizations of a single (possibly multidimensional) random variable,
     forming a statistical ensemble.
+
+    Alternatively, the realizations can be accumulated without storing them. Only the number of realizations,
+    the mean, the sums of powers of the deviations from the mean (up to the fourth) and, for one-dimensional
+    variables, the sums of products of deviations (for the covariance matrix) are kept, along with optional
+    fixed-bin histograms for plotting. Batches of realizations and accumulators filled in parallel are merged
+    with the pairwise update formulas by Chan et al. and Pébay.
     """
 
-    def __init__(self, ensemble_array, dtype=float,
-                 distribution=None, distribution_parameters=None):
+    def __init__(self, ensemble_array=None, dtype=float,
+                 distribution=None, distribution_parameters=None,
+                 variable_shape=None, accumulate_cov_mat=True,
+                 histogram_bins=None, histogram_ranges=None):
         """
         Create an ensemble of realizations of random variables.
 
         :param ensemble_array: a statistical ensemble containing all realizations of the random variable.
                                **Note**: the size of the first axis is taken to be the sample size. Any
                                remaining array axes are understood to be part of the (multidimensional)
-                               random variable itself.
-        :type ensemble_array: `numpy.ndarray`
-        :param sample_size: the size of the ensemble (number of realizations of the variable)
-        :type sample_size: int
-        :param variable_shape: the ndarray shape for *one* realization of the random variable
-        :typle variable_shape: tuple of int (pass an empty `tuple()` or list `[]` for a scalar variable)
+                               random variable itself. If ``None``, the realizations are accumulated
+                               without storing them (see :py:meth:`add_values`).
+        :type ensemble_array: `numpy.ndarray` or ``None``
         :param dtype: underlying dtype of ensemble variable
         :type dtype: type
         :param distribution: probability distribution of the variable (e.g. `scipy.stats.norm`)
@@ -169,13 +210,51 @@ class EnsembleVariable(object):
         :param distribution_parameters:  mapping of distribution parameter names to values. If values are
                                          sequences/arrays, the shape must match the `variable_shape`
         :type distribution_parameters: dict or ``None``
+        :param variable_shape: the ndarray shape for *one* realization of the random variable. Only used if
+                               no `ensemble_array` is given.
+        :type variable_shape: tuple of int (pass an empty `tuple()` or list `[]` for a scalar variable)
+        :param accumulate_cov_mat: if ``False``, do not accumulate the covariance matrix of one-dimensional
+                                   variables, which needs memory proportional to the square of the variable size.
+        :type accumulate_cov_mat: bool
+        :param histogram_bins: number of bins of the histograms accumulated for each variable component
+        :type histogram_bins: int or ``None``
+        :param histogram_ranges: the histogram ranges, the shape must be `variable_shape` + ``(2,)``
+                                 or broadcastable to it
+        :type histogram_ranges: `numpy.ndarray` or ``None``
         """
-        self._array = np.asarray(ensemble_array)
-        self._total_shape = self._array.shape
-        self._size = self._total_shape[0]
-        self._shape = tuple()
-        if self._array.ndim > 1:
-            self._shape = self._total_shape[1:]
+        self._stores_values = ensemble_array is not None
+        if self._stores_values:
+            self._array = np.asarray(ensemble_array)
+            self._total_shape = self._array.shape
+            self._size = self._total_shape[0]
+            self._shape = tuple()
+            if self._array.ndim > 1:
+                self._shape = self._total_shape[1:]
+        else:
+            if variable_shape is None:
+                raise EnsembleError("Cannot accumulate ensemble variable: no `variable_shape` given!")
+            self._array = None
+            self._shape = tuple(variable_shape)
+            self._size = 0
+            self._accumulated_mean = np.zeros(self._shape, dtype=dtype)
+            # sums of the 2nd, 3rd and 4th powers of the deviations from the mean
+            self._accumulated_central_sums = np.zeros((3,) + self._shape, dtype=dtype)
+            # sums of the products of the deviations from the mean
+            self._accumulated_comoment = None
+            if accumulate_cov_mat and len(self._shape) == 1:
+                self._accumulated_comoment = np.zeros(self._shape * 2, dtype=dtype)
+
+        self._histogram_bins = histogram_bins
+        self._histogram_ranges = None
+        self._histogram_counts = None
+        if histogram_bins is not None:
+            if histogram_ranges is None:
+                raise EnsembleError("Cannot accumulate histograms: no `histogram_ranges` given!")
+            self._histogram_ranges = np.array(
+                np.broadcast_to(np.asarray(histogram_ranges, dtype=float), self._shape + (2,)))
+            self._histogram_counts = np.zeros(self._shape + (histogram_bins,), dtype=np.int64)
+            if self._stores_values:
+                self._fill_histograms(self._array)
 
         self._dist = None
         if distribution is not None:
@@ -185,6 +264,34 @@ class EnsembleVariable(object):
                 variable_shape=self._shape
             )
 
+    def _fill_histograms(self, values):
+        """add a batch of realizations to the histograms of all variable components"""
+        self._histogram_counts += _get_histogram_counts(values, self._histogram_ranges, self._histogram_bins)
+
+    def _merge_accumulated(self, size, mean, central_sums, comoment):
+        """merge the accumulated statistics of another set of realizations into this object"""
+        _n_a, _n_b = self._size, size
+        if _n_b == 0:
+            return
+        _n = _n_a + _n_b
+        _delta = mean - self._accumulated_mean
+        _m2_a, _m3_a, _m4_a = self._accumulated_central_sums
+        _m2_b, _m3_b, _m4_b = central_sums
+        _m2 = _m2_a + _m2_b + _delta ** 2 * _n_a * _n_b / _n
+        _m3 = (_m3_a + _m3_b + _delta ** 3 * _n_a * _n_b * (_n_a - _n_b) / _n ** 2
+               + 3.0 * _delta * (_n_a * _m2_b - _n_b * _m2_a) / _n)
+        _m4 = (_m4_a + _m4_b + _delta ** 4 * _n_a * _n_b * (_n_a ** 2 - _n_a * _n_b + _n_b ** 2) / _n ** 3
+               + 6.0 * _delta ** 2 * (_n_a ** 2 * _m2_b + _n_b ** 2 * _m2_a) / _n ** 2
+               + 4.0 * _delta * (_n_a * _m3_b - _n_b * _m3_a) / _n)
+        if self._accumulated_comoment is not None:
+            self._accumulated_comoment += comoment + np.outer(_delta, _delta) * _n_a * _n_b / _n
+        self._accumulated_mean = self._accumulated_mean + _delta * _n_b / _n
+        self._accumulated_central_sums = np.array([_m2, _m3, _m4])
+        self._size = _n
+
+    def _central_moment(self, n):
+        return self._accumulated_central_sums[n - 2] / self._size
+
     @property
     def size(self):
         """The size of the sample."""
@@ -198,16 +305,26 @@ class EnsembleVariable(object):
     @property
     def ndim(self):
         """The dimensionality of the random variable."""
-        return self._array.ndim - 1  # do not include the sample size dimension
+        return len(self._shape)  # do not include the sample size dimension
+
+    @property
+    def stores_values(self):
+        """``True`` if all realizations are stored, ``False`` if they are only accumulated."""
+        return self._stores_values
 
     @property
     def values(self):
         """A (possibly) multidimensional array containing all realization of the ensemble variable."""
+        if not self._stores_values:
+            raise EnsembleError("Cannot retrieve values: the realizations of the ensemble variable "
+                                "are accumulated without storing them!")
         return self._array
 
     @property
     def mean(self):
         """The mean of the ensemble variable across all realizations."""
+        if not self._stores_values:
+            return self._accumulated_mean
         return np.mean(self._array, axis=0)
 
     @property
@@ -218,16 +335,22 @@ class EnsembleVariable(object):
     @property
     def std(self):
         """The standard deviation of the ensemble variable across all realizations."""
+        if not self._stores_values:
+            return np.sqrt(self._central_moment(2))
         return np.std(self._array, axis=0)
 
     @property
     def skew(self):
         """The skew of the ensemble variable across all realizations."""
+        if not self._stores_values:
+            return self._central_moment(3) / self._central_moment(2) ** 1.5
         return scipy.stats.skew(self._array, axis=0)
 
     @property
     def kurtosis(self):
         """The kurtosis of the ensemble variable across all realizations."""
+        if not self._stores_values:
+            return self._central_moment(4) / self._central_moment(2) ** 2 - 3.0
         return scipy.stats.kurtosis(self._array, axis=0)
 
     @property
@@ -237,6 +360,10 @@ class EnsembleVariable(object):
             # trivial covariance matrix
             return np.array([[self.std**2]])
         if self.ndim == 1:
+            if not self._stores_values:
+                if self._accumulated_comoment is None:
+                    raise EnsembleError("Cannot calculate covariance matrix: not accumulated!")
+                return self._accumulated_comoment / (self._size - 1)
             return np.cov(self._array.T)
 
         raise EnsembleError("Cannot calculate covariance matrix: ensemble variable must "
@@ -259,8 +386,26 @@ class EnsembleVariable(object):
         """An object representing the (expected) probability distribution of the variable."""
         return self._dist  # can be ``None``
 
+    @property
+    def histogram_counts(self):
+        """The accumulated histogram counts, the shape is the variable shape + ``(histogram_bins,)``.
+        ``None`` if no histograms are accumulated."""
+        return self._histogram_counts
+
+    @property
+    def histogram_edges(self):
+        """The histogram bin edges, the shape is the variable shape + ``(histogram_bins + 1,)``.
+        ``None`` if no histograms are accumulated."""
+        if self._histogram_bins is None:
+            return None
+        return _get_histogram_edges(self._histogram_ranges, self._histogram_bins)
+
     def set_value(self, index, variable_value):
-        """Set the value of the `index`-th realization of the ensemble variable."""
+        """Set the value of the `index`-th realization of the ensemble variable. If the realizations are
+        accumulated, the value is added and the index is ignored."""
+        if not self._stores_values:
+            self.add_values(np.expand_dims(variable_value, 0))
+            return
         # TODO (?) validate index and/or value shape?
         try:
             self._array[index, :] = variable_value
@@ -268,6 +413,69 @@ class EnsembleVariable(object):
             # for scalar ensemble variables
             self._array[index] = variable_value
 
+    def add_values(self, values):
+        """
+        Add a batch of realizations to an ensemble variable which accumulates its realizations.
+
+        :param values: the realizations, the size of the first axis is the number of realizations
+        :type values: `numpy.ndarray`
+        """
+        if self._stores_values:
+            raise EnsembleError("Cannot add values: the ensemble variable stores a fixed number of realizations!")
+        _values = np.asarray(values, dtype=self._accumulated_mean.dtype)
+        if _values.shape[1:] != self._shape:
+            raise EnsembleError("Cannot add values: expected shape (n,) + {}, got {}!".format(
+                self._shape, _values.shape))
+        if len(_values) == 0:
+            return
+        _mean = np.mean(_values, axis=0)
+        _deviations = _values - _mean
+        _deviations_squared = _deviations ** 2
+        _central_sums = np.array([np.sum(_deviations_squared, axis=0),
+                                  np.sum(_deviations_squared * _deviations, axis=0),
+                                  np.sum(_deviations_squared ** 2, axis=0)])
+        _comoment = None
+        if self._accumulated_comoment is not None:
+            _comoment = np.dot(_deviations.T, _deviations)
+        self._merge_accumulated(len(_values), _mean, _central_sums, _comoment)
+        if self._histogram_counts is not None:
+            self._fill_histograms(_values)
+
+    def merge(self, other):
+        """
+        Merge the realizations accumulated by another ensemble variable into this one.
+
+        :param other: an ensemble variable with the same shape which accumulates its realizations
+        :type other: :py:obj:`EnsembleVariable`
+        """
+        if self._stores_values or other.stores_values:
+            raise EnsembleError("Cannot merge ensemble variables which store their realizations!")
+        if other.shape != self._shape:
+            raise EnsembleError("Cannot merge ensemble variables with different shapes: "
+                                "{} and {}!".format(self._shape, other.shape))
+        _other_comoment = other._accumulated_comoment
+        if self._accumulated_comoment is not None and _other_comoment is None:
+            raise EnsembleError("Cannot merge ensemble variables: covariance matrix not accumulated!")
+        if self._histogram_counts is not None and (other._histogram_bins != self._histogram_bins
+                                                   or not np.array_equal(other._histogram_ranges,
+                                                                         self._histogram_ranges)):
+            raise EnsembleError("Cannot merge ensemble variables with different histogram binnings!")
+        self._merge_accumulated(other.size, other._accumulated_mean, other._accumulated_central_sums,
+                                _other_comoment)
+        if self._histogram_counts is not None:
+            self._histogram_counts += other.histogram_counts
+
+    def empty_copy(self):
+        """Create an ensemble variable without realizations and without a distribution which accumulates
+        its realizations in the same way as this one, e.g. for filling in parallel and merging afterwards."""
+        return EnsembleVariable(
+            variable_shape=self._shape,
+            dtype=self._accumulated_mean.dtype if not self._stores_values else self._array.dtype,
+            accumulate_cov_mat=self._stores_values or self._accumulated_comoment is not None,
+            histogram_bins=self._histogram_bins,
+            histogram_ranges=self._histogram_ranges
+        )
+
 
 class EnsembleVariableProbabilityDistribution(object):
     """
@@ -291,8 +499,7 @@ class EnsembleVariableProbabilityDistribution(object):
         self._dist_param_values_dict = {}
         for _dist_par_name, _dist_par_value in six.iteritems(parameters):
             # wrap lists and/or tuples in numpy.ndarray
-            if isinstance(_dist_par_value, collections.Sequence) and not isinstance(_dist_par_value,
-                                                                                    six.string_types[0]):
+            if isinstance(_dist_par_value, Sequence) and not isinstance(_dist_par_value, six.string_types[0]):
                 _dist_par_value = np.array(_dist_par_value)
 
             if isinstance(_dist_par_value, np.ndarray):
@@ -307,6 +514,16 @@ class EnsembleVariableProbabilityDistribution(object):
 
         self._dist_func = distribution(**self._dist_param_values_dict)
 
+        # resolve once whether the distribution has a density (continuous) or a mass function (discrete)
+        for _eval_func_name in ('pdf', 'pmf'):
+            if hasattr(distribution, _eval_func_name):
+                self._eval_func = getattr(distribution, _eval_func_name)
+                break
+        else:
+            raise EnsembleError("Distribution {} has neither a `pdf` nor a `pmf` method!".format(distribution))
+        # parameter arrays with trailing axes for broadcasting against `x`, by number of trailing axes
+        self._expanded_param_values_dicts = {}
+
     @property
     def ndim(self):
         """The dimensionality of the random variable."""
@@ -349,6 +566,17 @@ class EnsembleVariableProbabilityDistribution(object):
             raise NotImplementedError("Moment calculation not available for non-scalar variables.")
         return self._dist_func.moment(n)
 
+    def _get_expanded_param_values_dict(self, n_trailing_axes):
+        """the parameter arrays with `n_trailing_axes` axes of length one appended"""
+        _param_values_dict = self._expanded_param_values_dicts.get(n_trailing_axes)
+        if _param_values_dict is None:
+            _param_values_dict = {
+                _dist_par_name: _dist_par_value.reshape(self._shape + (1,) * n_trailing_axes)
+                for _dist_par_name, _dist_par_value in six.iteritems(self._dist_param_values_dict)
+            }
+            self._expanded_param_values_dicts[n_trailing_axes] = _param_values_dict
+        return _param_values_dict
+
     def eval(self, x, x_contains_var_shape=False):
         """
         Evaluate the probability distribution/mass at a given point/an array of given points.
@@ -393,41 +621,19 @@ class EnsembleVariableProbabilityDistribution(object):
         :type x_contains_var_shape: bool
         :return:
         """
-        # copy x so it is not modified
-        x = np.asarray(x).copy()
-
-        # if not already done, the `x` array shape must be expanded
-        # so that the first dimensions match `self._shape`
-        # -> transform x.shape from (m, n) to (a, b, c, m, n) -> 'expand_left'
-        if not x_contains_var_shape:
-            # reminder example:
-            # par_shape =    (a, b, c)        # ndim = 3 (= p)
-            # x.shape =      (m, n)           # ndim = 2 (= n)
-            # new x.shape =  (a, b, c, m, n)  # ndim = p+n = 5
-            x = broadcast_to_shape(x, shape=self._shape, scheme='expand_left')
-
-        # before evaluating, `x` must have a shape that can be broadcast
-        # together with the parameter array with shape = (a, b, c)
-        # -> transform x.shape from (a, b, c, m, n) to (m, n, a, b, c)
-        x = cycle_axes(x, -self.ndim)
-
-        # evaluate pdf or pmf for x
-        _y = None
-        if _y is None:
-            try:
-                _y = self._dist_func.pdf(x)
-            except AttributeError:
-                pass
-        if _y is None:
-            try:
-                _y = self._dist_func.pmf(x)
-            except AttributeError:
-                pass
-
-        # after the evaluation, the result must be broadcast back to
-        # the desired output shape
-        # -> transform x.shape from (m, n, a, b, c) back to (a, b, c, m, n)
-        return cycle_axes(_y, self.ndim)
+        x = np.asarray(x)
+
+        # instead of broadcasting `x` to the parameter arrays, axes are appended to the parameter arrays
+        # so that the pdf/pmf is evaluated for all components in a single call:
+        #   par_shape =           (a, b, c)
+        #   x.shape =                      (m, n)  -> params reshaped to (a, b, c, 1, 1)
+        #   x.shape =             (a, b, c, m, n)  -> params reshaped to (a, b, c, 1, 1)
+        #   result.shape =        (a, b, c, m, n)
+        if x_contains_var_shape:
+            _n_trailing_axes = x.ndim - self.ndim
+        else:
+            _n_trailing_axes = x.ndim
+        return self._eval_func(x, **self._get_expanded_param_values_dict(_n_trailing_axes))
 
 
 class EnsembleVariablePlotter(object):
@@ -531,8 +737,18 @@ class EnsembleVariablePlotter(object):
         # get the observed mean (pad to at least 2 dimensions: one scalar per plot in 2D matrix)
         _observed_means = np.atleast_2d(self._var.mean)
 
-        # get value array (pad to at least 3 dimensions: one 1D-array per plot in 2D matrix)
-        _var_values = expand_to_ndim(self._var.values, 3, direction='right')
+        # histogram all variable components in one pass (shape: variable shape + (number of bins,))
+        if self._var.stores_values:
+            # the value ranges were only expanded on the left -> restore the variable shape
+            _histogram_ranges = self._value_ranges.reshape(self._var.shape + (2,))
+            _histogram_counts = _get_histogram_counts(self._var.values, _histogram_ranges, _nbins)
+            _histogram_edges = _get_histogram_edges(_histogram_ranges, _nbins)
+        elif self._var.histogram_counts is not None:
+            _histogram_counts = self._var.histogram_counts
+            _histogram_edges = self._var.histogram_edges
+        else:
+            raise EnsembleError("Cannot plot histograms: the ensemble variable neither stores its "
+                                "realizations nor accumulates histograms!")
 
         _all_legend_handles = []
         _all_legend_labels = []
@@ -540,13 +756,14 @@ class EnsembleVariablePlotter(object):
         _plot_result_dict = dict()
         for _index1, _axes in enumerate(np.atleast_2d(axes_array)):
             for _index2, _ax in enumerate(_axes):
-                _data = _var_values[:, _index2, _index1]
-                assert len(_data) == self._var.size
-
+                # plot the precomputed histogram of the variable component
+                # TODO: what about underflow/overflow?
+                _component = (_index2, _index1)[:self._var.ndim]
+                _edges = _histogram_edges[_component]
                 _bin_contents, _bin_edges, _ = _ax.hist(
-                    _data,
-                    bins=_nbins,
-                    range=self._value_ranges[_index1, _index2], # TODO: what about underflow/overflow?
+                    _edges[:-1],
+                    bins=_edges,
+                    weights=_histogram_counts[_component],
                     label=self._ensemble_label
                 )
 
@@ -631,7 +848,7 @@ class EnsembleVariablePlotter(object):
 
         return _plot_result_dict
 
-    def plot_scatter(self, axes_array):
+    def plot_scatter(self, axes_array, values=None):
         """
         Plot a one-dimensional ensemble variable as a matrix of scatter plots.
 
@@ -640,6 +857,9 @@ class EnsembleVariablePlotter(object):
                            size of the ensemble variable.
 
         :type axes_array: ``numpy.ndarray`` of ``matplotlib`` ``Axes`` objects.
+        :param values: the realizations to plot if they are not stored in the ensemble variable (e.g. because
+                       they are kept on disk). If ``None``, the values of the ensemble variable are used.
+        :type values: `numpy.ndarray` or ``None``
 
         :return: mapping containing plot metadata and other information
         :rtype: `dict`
@@ -664,6 +884,9 @@ class EnsembleVariablePlotter(object):
             # TODO: presumably only valid/relevant for Gaussian -> solution for non-Gaussian?
             _expected_mean_errors = np.atleast_2d(self._var.dist.std) / np.sqrt(self._var.size)
 
+        if values is None:
+            values = self._var.values
+
         _all_legend_handles = []
         _all_legend_labels = []
 
@@ -673,10 +896,8 @@ class EnsembleVariablePlotter(object):
                 if _ax is None:
                     continue
 
-                _data_x = self._var.values[:, _index1]
-                _data_y = self._var.values[:, _index2]
-                assert len(_data_x) == self._var.size
-                assert len(_data_y) == self._var.size
+                _data_x = values[:, _index1]
+                _data_y = values[:, _index2]
 
                 _ = _ax.scatter(
                     _data_x,
@@ -52,6 +52,10 @@ def kafe2go():
     _parser.add_argument('-c', '--contours',
                          action='store_true',
                          help="Plot contours and profiles.")
+    _parser.add_argument('--cachecontours',
+                         action='store_true',
+                         help="Store the calculated contours and profiles in a file next to the input "
+                              "file and reuse them when plotting contours for an unchanged fit.")
     _parser.add_argument('--grid', type=str, nargs=1, default=[None],
                          help="Add a grid to the contour profiles. Available options are either "
                               "all, contours or profiles.")
@@ -77,6 +81,7 @@ def kafe2go():
     _filenames = _args.filename
     _band = not _args.noband
     _contours = _args.contours
+    _cache_contours = _args.cachecontours
     _report = not _args.noreport
     _infobox = not _args.noinfobox
     _ratio = _args.ratio
@@ -115,7 +120,8 @@ def kafe2go():
 
     if _contours:
         for _fit, name in zip(_fits, _basenames):
-            _profiler = ContoursProfiler(_fit)
+            _cache_path = '{}_contours.npz'.format(name) if _cache_contours else None
+            _profiler = ContoursProfiler(_fit, cache_path=_cache_path)
             _profiler.plot_profiles_contours_matrix(show_grid_for=_grid)
             if _save_plot:
                 for i, fig in enumerate(_profiler.figures):
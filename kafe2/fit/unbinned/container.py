@@ -1,3 +1,8 @@
+from copy import deepcopy
+
+import numpy as np
+import six
+
 from ..indexed import IndexedContainer
 from ..indexed.container import IndexedContainerException
 
@@ -17,12 +22,40 @@ class UnbinnedContainer(IndexedContainer):
         """
         Construct a container for indexed data:
 
+        A one-dimensional :py:obj:`numpy.memmap` with matching *dtype* is used as is instead of being
+        read into memory. This allows fitting samples larger than the available memory.
+
         :param data: a one-dimensional array of measurements
         :type data: iterable of type <dtype>
         :param dtype: data type of the measurements
         :type dtype: type
         """
-        super(UnbinnedContainer, self).__init__(data, dtype)
+        if isinstance(data, np.memmap) and data.ndim == 1 and data.dtype == np.dtype(dtype):
+            super(UnbinnedContainer, self).__init__(np.empty(0), dtype)
+            self._data = data
+        else:
+            super(UnbinnedContainer, self).__init__(data, dtype)
+
+    def __deepcopy__(self, memo):
+        # memory-mapped arrays are shared between copies instead of being read into memory
+        _copy = self.__class__.__new__(self.__class__)
+        memo[id(self)] = _copy
+        for _value in six.itervalues(self.__dict__):
+            if isinstance(_value, np.memmap):
+                memo[id(_value)] = _value
+        _copy.__dict__.update(deepcopy(self.__dict__, memo))
+        return _copy
+
+    @property
+    def data(self):
+        """container data (one-dimensional :py:obj:`numpy.ndarray`)"""
+        if isinstance(self._data, np.memmap):
+            return self._data  # don't read memory-mapped data into memory
+        return self._data.copy()  # copy to ensure no modification by user
+
+    @data.setter
+    def data(self, data):
+        IndexedContainer.data.fset(self, data)
 
     def add_error(self):
         raise NotImplementedError("Unbinned fits don't support errors")
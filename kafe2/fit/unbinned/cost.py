@@ -6,6 +6,7 @@ from ..util import function_library
 
 __all__ = [
     "UnbinnedCostFunction_NegLogLikelihood",
+    "UnbinnedCostFunction_ChunkedNegLogLikelihood",
 ]
 
 
@@ -37,6 +38,29 @@ class UnbinnedCostFunction_NegLogLikelihood(CostFunction):
         return -2.0 * _total_log_likelihood
 
 
+class UnbinnedCostFunction_ChunkedNegLogLikelihood(CostFunction):
+    def __init__(self):
+        r"""
+        Negative log-likelihood cost function for large *Unbinned* datasets.
+
+        Instead of the model density at all data points this cost function receives the total
+        log-likelihood, which the fit evaluates in chunks of data points. This keeps the memory
+        needed per cost function evaluation independent of the number of data points.
+        """
+        super(UnbinnedCostFunction_ChunkedNegLogLikelihood, self).__init__(cost_function=self.nll_chunked)
+        self._needs_errors = False
+        self._formatter.latex_name = "-2\\ln\\mathcal{L}"
+        self._formatter.name = "nll"
+        self._formatter.description = "negative log-likelihood"
+
+    @staticmethod
+    def nll_chunked(total_log_likelihood):
+        # guard against returning NaN
+        if np.isnan(total_log_likelihood):
+            return np.inf
+        return -2.0 * total_log_likelihood
+
+
 STRING_TO_COST_FUNCTION = {
     'nll': UnbinnedCostFunction_NegLogLikelihood,
     'negloglikelihood': UnbinnedCostFunction_NegLogLikelihood,
@@ -0,0 +1,159 @@
+import numpy as np
+
+from .._base import FitEnsembleBase, FitEnsembleException
+from .cost import UnbinnedCostFunction_NegLogLikelihood
+from .fit import UnbinnedFit
+
+
+__all__ = ["UnbinnedFitEnsemble", "UnbinnedFitEnsembleException"]
+
+
+class UnbinnedFitEnsembleException(FitEnsembleException):
+    pass
+
+
+class UnbinnedFitEnsemble(FitEnsembleBase):
+    """
+    Object for generating ensembles of fits to unbinned pseudo-data.
+
+    The events of a batch of pseudo-experiments are generated at once from the model density
+    restricted to **data_range**, either by inverting its cumulative distribution function, which
+    is tabulated once per run, or by accept-reject sampling below the maximum of the tabulated
+    density.
+
+    The fit ensemble is generated with the :py:meth:`~kafe2.fit.UnbinnedFitEnsemble.run` method and
+    shares the parallel runner and the result storage with :py:obj:`~kafe2.fit.XYFitEnsemble`.
+    """
+    FIT_TYPE = UnbinnedFit
+    EXCEPTION_TYPE = UnbinnedFitEnsembleException
+
+    GENERATION_METHODS = ('inverse_cdf', 'accept_reject')
+    # number of points at which the model density is tabulated for generating events
+    _DENSITY_GRID_POINTS = 4097
+    # safety margin for the maximum of the tabulated density used for accept-reject sampling
+    _ACCEPT_REJECT_MARGIN = 1.1
+
+    def __init__(self, n_experiments, n_events, data_range, model_density_function, model_parameters,
+                 cost_function=UnbinnedCostFunction_NegLogLikelihood(), generation='inverse_cdf',
+                 normalization=None, requested_results=None, store_results=True, storage_path=None):
+        """
+        Construct an :py:obj:`~kafe2.fit.UnbinnedFitEnsemble` object.
+
+        :param n_experiments: number of pseudoexperiments to perform
+        :type n_experiments: int
+        :param n_events: number of events per pseudo-experiment
+        :type n_events: int
+        :param data_range: the range in which the events are generated
+        :type data_range: tuple of float
+        :param model_density_function: the model density
+        :type model_density_function: :py:class:`~kafe2.fit._base.ModelFunctionBase` or unwrapped native Python function
+        :param model_parameters: parameters of the "true" model
+        :type model_parameters: iterable of float
+        :param cost_function: the cost function
+        :type cost_function: :py:class:`~kafe2.fit._base.CostFunctionBase`-derived or unwrapped native Python function
+        :param generation: ``'inverse_cdf'`` or ``'accept_reject'``
+        :type generation: str
+        :param normalization: ``None`` if the model density is normalized over **data_range**, ``'numerical'`` or
+                              the antiderivative of the model density (see :py:obj:`~kafe2.fit.UnbinnedFit`)
+        :type normalization: None, str or callable
+        :param requested_results: list of result variables to collect for each toy fit
+        :type requested_results: iterable of str
+        :param store_results: if ``False``, only accumulate statistics and histograms of the result variables
+        :type store_results: bool
+        :param storage_path: if not ``None``, write the result variables to ``.npy`` files in this directory
+        :type storage_path: str or None
+        """
+        if generation not in self.GENERATION_METHODS:
+            raise UnbinnedFitEnsembleException("Unknown generation method '%s', must be one of %r!"
+                                               % (generation, self.GENERATION_METHODS))
+        self._n_events = int(n_events)
+        self._data_range = (float(data_range[0]), float(data_range[1]))
+        self._model_density_function = model_density_function
+        self._cost_function = cost_function
+        self._generation = generation
+        self._normalization = normalization
+        super(UnbinnedFitEnsemble, self).__init__(
+            n_experiments=n_experiments, model_parameters=model_parameters,
+            requested_results=requested_results, store_results=store_results, storage_path=storage_path)
+
+    def _create_toy_fit(self):
+        # need some dummy initial data values in order to initialize a Fit object
+        _data = np.linspace(self._data_range[0], self._data_range[1], self._n_events)
+        # the normalization must not depend on the range of the generated events
+        _normalization_range = self._data_range if self._normalization is not None else None
+        return UnbinnedFit(data=_data, model_density_function=self._model_density_function,
+                           cost_function=self._cost_function, normalization=self._normalization,
+                           normalization_range=_normalization_range)
+
+    def _update_reference_quantities_from_toy_fit(self):
+        _low, _high = self._data_range
+        self._density_grid = np.linspace(_low, _high, self._DENSITY_GRID_POINTS)
+        self._ref_density = np.clip(self._toy_fit._param_model.eval_model_function(
+            support=self._density_grid, model_parameters=self._model_parameters), 0.0, None)
+        if not np.all(np.isfinite(self._ref_density)):
+            raise UnbinnedFitEnsembleException("Cannot generate events: the model density is not finite "
+                                               "in the range %r!" % (self._data_range,))
+        # cumulative distribution function by the trapezoidal rule
+        _integrals = 0.5 * (self._ref_density[1:] + self._ref_density[:-1]) * np.diff(self._density_grid)
+        self._ref_cdf = np.concatenate([[0.0], np.cumsum(_integrals)])
+        self._ref_integral = self._ref_cdf[-1]
+        if not self._ref_integral > 0:
+            raise UnbinnedFitEnsembleException("Cannot generate events: the model density vanishes "
+                                               "in the range %r!" % (self._data_range,))
+        self._ref_cdf /= self._ref_integral
+        self._ref_density_maximum = self._ACCEPT_REJECT_MARGIN * np.amax(self._ref_density)
+
+    def _generate_events_inverse_cdf(self, random_state, n_exp):
+        _uniform = random_state.uniform(0.0, 1.0, size=(n_exp, self._n_events))
+        return np.interp(_uniform, self._ref_cdf, self._density_grid)
+
+    def _generate_events_accept_reject(self, random_state, n_exp):
+        _low, _high = self._data_range
+        _efficiency = self._ref_integral / (self._ref_density_maximum * (_high - _low))
+        _n_needed = n_exp * self._n_events
+        _accepted = []
+        _n_accepted = 0
+        while _n_accepted < _n_needed:
+            # draw enough candidates to be done after one iteration most of the time
+            _n_candidates = int(1.1 * (_n_needed - _n_accepted) / _efficiency) + 16
+            _x = random_state.uniform(_low, _high, size=_n_candidates)
+            _y = random_state.uniform(0.0, self._ref_density_maximum, size=_n_candidates)
+            _density = self._toy_fit._param_model.eval_model_function(
+                support=_x, model_parameters=self._model_parameters)
+            _accepted.append(_x[_y < _density])
+            _n_accepted += _accepted[-1].size
+        return np.concatenate(_accepted)[:_n_needed].reshape(n_exp, self._n_events)
+
+    def _generate_pseudodata_batch(self, seed_sequences):
+        """Generate the events for a batch of pseudo-experiments, one per seed sequence.
+        If the seed sequences are ``None``, the global random state is used.
+        Returns the events as an array with one row per pseudo-experiment."""
+        if self._generation == 'inverse_cdf':
+            return self._draw_random_batch(seed_sequences, self._generate_events_inverse_cdf),
+        return self._draw_random_batch(seed_sequences, self._generate_events_accept_reject),
+
+    def _set_toy_fit_data(self, events):
+        """commit pseudo-data to the toy fit"""
+        self._toy_fit.data = events
+        # the model values and the log-likelihood are only marked as stale if the parameters change
+        self._toy_fit._nexus.get('model').mark_for_update()
+        self._toy_fit._nexus.get('total_log_likelihood').mark_for_update()
+
+    def _get_config_arrays(self):
+        return [self._model_parameters, self._data_range, self._ref_density]
+
+    def _get_config_description(self):
+        return super(UnbinnedFitEnsemble, self)._get_config_description() + (self._generation, self._n_events)
+
+    # -- public properties
+
+    @property
+    def generation(self):
+        """the method for generating events, ``'inverse_cdf'`` or ``'accept_reject'``"""
+        return self._generation
+
+    # the negative log-likelihood of unbinned data is not a goodness-of-fit measure -> no 'cost'
+    AVAILABLE_RESULTS = dict(
+        parameter_pulls=FitEnsembleBase.AVAILABLE_RESULTS['parameter_pulls'],
+    )
+    _DEFAULT_RESULTS = {'parameter_pulls'}
@@ -2,9 +2,12 @@ from copy import deepcopy
 
 import sys
 
+import numpy as np
+
 from .._base import FitException, FitBase, DataContainerBase, ModelFunctionBase
+from ..histogram import HistContainer, HistParametricModel
 from .container import UnbinnedContainer
-from .cost import UnbinnedCostFunction_NegLogLikelihood
+from .cost import UnbinnedCostFunction_NegLogLikelihood, UnbinnedCostFunction_ChunkedNegLogLikelihood
 from .model import UnbinnedParametricModel
 from .plot import UnbinnedPlotAdapter
 from ..util import collect
@@ -22,17 +25,42 @@ class UnbinnedFit(FitBase):
     MODEL_FUNCTION_TYPE = ModelFunctionBase
     PLOT_ADAPTER_TYPE = UnbinnedPlotAdapter
     EXCEPTION_TYPE = UnbinnedFitException
-    RESERVED_NODE_NAMES = {'data', 'model', 'cost', 'parameter_values', 'parameter_constraints'}
+    _MODEL_ERROR_NODE_NAMES = []  # unbinned fits don't support errors
+    RESERVED_NODE_NAMES = {'data', 'model', 'cost', 'parameter_values', 'parameter_constraints',
+                           'total_log_likelihood'}
 
     def __init__(self,
                  data,
                  model_density_function='normal_distribution_pdf',
                  cost_function=UnbinnedCostFunction_NegLogLikelihood(),
                  minimizer=None,
-                 minimizer_kwargs=None):
+                 minimizer_kwargs=None,
+                 chunk_size=None,
+                 n_workers=None,
+                 approximate=None,
+                 n_bins=1000,
+                 polish=False,
+                 normalization=None,
+                 normalization_range=None):
         """
         Construct a fit to a model of *unbinned* data.
 
+        For large samples, the negative log-likelihood can be evaluated in chunks of **chunk_size** data
+        points, optionally spread across **n_workers** threads. The memory needed per cost function
+        evaluation then does not depend on the number of data points. The data can also be passed as a
+        :py:obj:`numpy.memmap`, in which case it is not read into memory.
+
+        With ``approximate='binned'`` the data is filled into a histogram with **n_bins** bins once and
+        the log-likelihood is approximated by assigning each data point the mean model density of its bin.
+        For smooth densities and many data points this is much faster and almost equivalent to the exact
+        log-likelihood. If **polish** is ``True``, the fit is repeated with the exact log-likelihood,
+        starting from the result of the binned fit. Use :py:meth:`estimate_approximation_bias` to check
+        the approximation.
+
+        If the model density is not normalized, set **normalization** to ``'numerical'`` or to the
+        antiderivative of the model density. The density is then divided by its integral over
+        **normalization_range**, which defaults to the range of the data.
+
         :param data: the data points
         :param model_density_function: the model density
         :type model_density_function: :py:class:`~kafe2.fit._base.ModelFunctionBase` or unwrapped native Python function
@@ -41,7 +69,37 @@ class UnbinnedFit(FitBase):
         :type minimizer: None, "iminuit", "tminuit", or "scipy".
         :param minimizer_kwargs: dictionary with kwargs for the minimizer.
         :type minimizer_kwargs: dict
+        :param chunk_size: if not ``None``, evaluate the negative log-likelihood in chunks of this many data points
+        :type chunk_size: int or None
+        :param n_workers: number of threads for evaluating the chunks
+        :type n_workers: int or None
+        :param approximate: ``None`` for the exact log-likelihood or ``'binned'`` for a binned approximation
+        :type approximate: str or None
+        :param n_bins: number of bins for the binned approximation
+        :type n_bins: int
+        :param polish: if ``True``, refine the result of the binned approximation with the exact log-likelihood
+        :type polish: bool
+        :param normalization: ``None`` if the model density is normalized, ``'numerical'`` or the
+                              antiderivative of the model density with the same arguments
+        :type normalization: None, str or callable
+        :param normalization_range: the range over which the model density is normalized
+        :type normalization_range: tuple of float or None
         """
+        if approximate not in (None, 'binned'):
+            raise UnbinnedFitException("Unknown approximation '%s', must be None or 'binned'!" % (approximate,))
+        self._chunk_size = chunk_size
+        self._n_workers = n_workers
+        self._approximate = approximate
+        self._n_bins = n_bins
+        self._polish = polish
+        self._normalization = normalization
+        self._normalization_range = normalization_range
+        self._use_binned_approximation = approximate == 'binned'
+        self._binned_approximation = None  # built from the data on first use
+        if (chunk_size is not None or approximate is not None) \
+                and isinstance(cost_function, UnbinnedCostFunction_NegLogLikelihood):
+            # large-sample mode: don't evaluate the model density at all data points at once
+            cost_function = UnbinnedCostFunction_ChunkedNegLogLikelihood()
         super(UnbinnedFit, self).__init__(
             data=data, model_function=model_density_function, cost_function=cost_function,
             minimizer=minimizer, minimizer_kwargs=minimizer_kwargs)
@@ -61,6 +119,10 @@ class UnbinnedFit(FitBase):
             )
         )
 
+        self._nexus.add_function(self._eval_total_log_likelihood, func_name='total_log_likelihood',
+                                 existing_behavior='replace_if_empty')
+        self._nexus.add_dependency('total_log_likelihood', depends_on='parameter_values')
+
     # -- private methods
 
     def _set_new_data(self, new_data):
@@ -73,15 +135,54 @@ class UnbinnedFit(FitBase):
             self._data_container = UnbinnedContainer(new_data, dtype=float)
         self._data_container._on_error_change_callback = self._on_error_change
 
+        self._binned_approximation = None
+
         self._nexus.get('x').mark_for_update()
         # TODO: make 'Alias' nodes pass on 'mark_for_update'
         self._nexus.get('data').mark_for_update()
 
+    def _get_binned_approximation(self):
+        """Histogram the data and create the binned model. Returns the binned model, the bin counts,
+        the bin widths and a mask selecting the non-empty bins."""
+        if self._binned_approximation is None:
+            _data = self._data_container.data
+            _chunk_size = self._chunk_size or UnbinnedParametricModel.DEFAULT_CHUNK_SIZE
+            _low, _high = _data.min(), _data.max()
+            _high = np.nextafter(_high, np.inf)  # the maximum must not end up in the overflow bin
+            _hist = HistContainer(self._n_bins, (_low, _high), dtype=float, store_raw_data=False)
+            _hist.fill_stream(_data[_start:_start + _chunk_size] for _start in range(0, len(_data), _chunk_size))
+            _model = HistParametricModel(
+                self._n_bins, (_low, _high), self._model_function.func, self.parameter_values)
+            _counts = _hist.data
+            _mask = _counts > 0
+            self._binned_approximation = (_model, _counts[_mask], _hist.bin_widths[_mask], _mask)
+        return self._binned_approximation
+
+    def _eval_total_log_likelihood(self):
+        if not self._use_binned_approximation:
+            return self._param_model.eval_total_log_likelihood(
+                model_parameters=self.parameter_values, chunk_size=self._chunk_size, n_workers=self._n_workers)
+        _model, _counts, _bin_widths, _mask = self._get_binned_approximation()
+        _model.parameters = self.parameter_values
+        # each data point contributes the logarithm of the mean model density in its bin
+        _normalization = self._param_model.eval_normalization(self.parameter_values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.sum(_counts * np.log(_model.data[_mask] / _bin_widths)) - np.sum(_counts) * np.log(_normalization)
+
+    def _set_binned_approximation_enabled(self, enabled):
+        if enabled == self._use_binned_approximation:
+            return
+        self._use_binned_approximation = enabled
+        self._nexus.get('total_log_likelihood').mark_for_update()
+        self._fitter.reset_minimizer()  # flush cached cost function values
+
     def _set_new_parametric_model(self):
         self._param_model = UnbinnedParametricModel(
             data=self.data,
             model_density_function=self._model_function,
-            model_parameters=self.parameter_values
+            model_parameters=self.parameter_values,
+            normalization=self._normalization,
+            normalization_range=self._normalization_range
         )
 
     @property
@@ -114,6 +215,66 @@ class UnbinnedFit(FitBase):
         self._param_model.support = self.data
         return self._param_model.eval_model_function(support=x, model_parameters=model_parameters)
 
+    def do_fit(self, asymmetric_parameter_errors=False):
+        """Perform the minimization of the cost function. If the binned approximation is used and
+        polishing is enabled, the result of the binned fit is refined with the exact log-likelihood.
+
+        :param bool asymmetric_parameter_errors: If :py:obj:`True`, calculate asymmetric parameter errors.
+        :return: A dictionary containing the fit results.
+        :rtype: dict
+        """
+        if self._approximate is None:
+            return super(UnbinnedFit, self).do_fit(asymmetric_parameter_errors=asymmetric_parameter_errors)
+        self._set_binned_approximation_enabled(True)
+        _result = super(UnbinnedFit, self).do_fit(asymmetric_parameter_errors=asymmetric_parameter_errors)
+        if self._polish:
+            self._set_binned_approximation_enabled(False)
+            _result = super(UnbinnedFit, self).do_fit(asymmetric_parameter_errors=asymmetric_parameter_errors)
+        return _result
+
+    def estimate_approximation_bias(self, subsample_size=10000, seed=None):
+        """Estimate the bias of the parameter values caused by the binned approximation. A random subsample
+        of the data is fitted both with the exact and with the binned log-likelihood, using the same number
+        of bins and starting from the current parameter values.
+
+        :param int subsample_size: Number of data points in the subsample.
+        :param seed: Seed for drawing the subsample.
+        :type seed: int or None
+        :return: Parameter values of the binned fit minus those of the exact fit of the subsample.
+        :rtype: numpy.ndarray
+        """
+        _data = self._data_container.data
+        _random_state = np.random.RandomState(seed)
+        if subsample_size < len(_data):
+            _indices = np.sort(_random_state.choice(len(_data), size=subsample_size, replace=False))
+            _subsample = np.asarray(_data[_indices], dtype=float)
+        else:
+            _subsample = np.array(_data, dtype=float)
+        _parameter_values = {}
+        for _approximate in (None, 'binned'):
+            _fit = self._get_subsample_fit(_subsample, _approximate)
+            _fit.do_fit()
+            _parameter_values[_approximate] = _fit.parameter_values
+        return _parameter_values['binned'] - _parameter_values[None]
+
+    def _get_subsample_fit(self, data, approximate):
+        """Create a fit of **data** with the same model, parameter settings and large-sample options as
+        this fit, but with the given **approximate** option."""
+        _fit = UnbinnedFit(
+            data=data, model_density_function=self._model_function.func,
+            minimizer=self._minimizer, minimizer_kwargs=self._minimizer_kwargs,
+            chunk_size=self._chunk_size, n_workers=self._n_workers,
+            approximate=approximate, n_bins=self._n_bins, normalization=self._normalization,
+            normalization_range=self._param_model.normalization_range)
+        _fit.set_all_parameter_values(self.parameter_values)
+        for _name, _value in self._fitter.fixed_parameters.items():
+            _fit.fix_parameter(_name, _value)
+        for _name, _limits in self._fitter.limited_parameters.items():
+            _fit.limit_parameter(_name, *_limits)
+        # the parameters are the same, so the constraints refer to the same parameter indices
+        _fit._fit_param_constraints = list(self._fit_param_constraints)
+        return _fit
+
     def report(self, output_stream=sys.stdout, asymmetric_parameter_errors=False):
         super(UnbinnedFit, self).report(output_stream=output_stream,
                                         asymmetric_parameter_errors=asymmetric_parameter_errors)
@@ -1,9 +1,23 @@
+import math
+import os
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
 import numpy as np
+import six
 
 from .._base import ParametricModelBaseMixin
 from .container import UnbinnedContainer, UnbinnedContainerException
 from ..util import function_library
 
+from inspect import getsource
+
+if six.PY2:
+    from funcsigs import signature
+else:
+    from inspect import signature
+
+
 __all__ = ['UnbinnedParametricModel', 'UnbinnedParametricModelException']
 
 
@@ -12,27 +26,142 @@ class UnbinnedParametricModelException(UnbinnedContainerException):
 
 
 class UnbinnedParametricModel(ParametricModelBaseMixin, UnbinnedContainer):
+    # default number of support points for which the model density is evaluated at once
+    DEFAULT_CHUNK_SIZE = 2**20
+    # composite Gauss-Legendre quadrature used for numerical normalization
+    _NORMALIZATION_INTERVALS = 64
+    _NORMALIZATION_NODES = 8
+    _NORMALIZATION_CACHE_MAX_ENTRIES = 128
+
     def __init__(self, data, model_density_function=function_library.normal_distribution_pdf,
-                 model_parameters=[1.0, 1.0]):
+                 model_parameters=[1.0, 1.0], normalization=None, normalization_range=None):
+        """
+        Construct an :py:obj:`UnbinnedParametricModel` object.
 
-        self.support = np.array(data)
+        By default the model density is assumed to be normalized. Otherwise it is divided by its
+        integral over **normalization_range**. The integral is either calculated from an
+        antiderivative of the density or with a fixed-order quadrature for all nodes at once.
+        It is cached for the most recently used parameter values.
+
+        :param data: the support values
+        :param model_density_function: the model density
+        :param model_parameters: the initial parameter values
+        :param normalization: ``None`` if the density is normalized, ``'numerical'`` or the antiderivative
+                              of the model density with the same arguments
+        :type normalization: None, str or callable
+        :param normalization_range: the range for the normalization (if ``None``, the range of the support)
+        :type normalization_range: tuple of float or None
+        """
+        # memory-mapped support values are not read into memory
+        self._support = data if isinstance(data, np.memmap) else np.array(data)
 
         super(UnbinnedParametricModel, self).__init__(
             # this gets passed to ParametricModelBaseMixin.__init__
             model_func=model_density_function,
             model_parameters=model_parameters,
             # this gets passed to UnbinnedContainer.__init__
-            data=model_density_function(
-                self.support, *model_parameters)
+            # the model values are only calculated when they are requested
+            data=np.empty(0)
         )
 
+        if normalization is not None and normalization != 'numerical':
+            if not callable(normalization):
+                raise ValueError("Cannot use %r for normalization: not 'numerical' and not callable!"
+                                 % (normalization,))
+            _antider_parameters = list(signature(normalization).parameters)
+            _model_func_parameters = list(self._model_function_object.signature.parameters)
+            # require antiderivative and density to have the same arguments
+            if _model_func_parameters != _antider_parameters:
+                raise ValueError(
+                    "Model density function and its antiderivative have different argument "
+                    "signatures: (%r vs %r)" % (_model_func_parameters, _antider_parameters))
+            # Retrieving source code will fail if the function was generated through exec.
+            # For kafe2go self._normalization_string will be replaced.
+            try:
+                self._normalization_string = getsource(normalization)
+            except OSError:
+                self._normalization_string = "OSError"
+            except IOError:
+                self._normalization_string = "IOError"
+        else:
+            self._normalization_string = normalization
+        self._normalization = normalization
+        self._fixed_normalization_range = normalization_range
+        self._normalization_cache = OrderedDict()  # least recently used entries first
+        self._update_normalization_geometry()
+        # thread pool for evaluating the log-likelihood in chunks, created on first use
+        self._thread_pool = None
+        self._thread_pool_size = 0
+        self._thread_pool_pid = None
+
+    def __del__(self):
+        self._close_thread_pool()
+
+    def __deepcopy__(self, memo):
+        # copies create their own thread pool
+        memo[id(self._thread_pool)] = None
+        return super(UnbinnedParametricModel, self).__deepcopy__(memo)
+
     # -- private methods
 
+    def _get_thread_pool(self, n_workers):
+        """the thread pool with **n_workers** threads, it is kept for all further evaluations"""
+        if self._thread_pool is not None and self._thread_pool_pid != os.getpid():
+            # the worker threads do not exist in a forked process -> do not wait for them
+            self._thread_pool = None
+        if self._thread_pool is None or self._thread_pool_size != n_workers:
+            self._close_thread_pool()
+            self._thread_pool = ThreadPool(n_workers)
+            self._thread_pool_size = n_workers
+            self._thread_pool_pid = os.getpid()
+        return self._thread_pool
+
+    def _close_thread_pool(self):
+        """stop the threads of the thread pool (if any)"""
+        _pool = getattr(self, '_thread_pool', None)
+        if _pool is not None and self._thread_pool_pid == os.getpid():
+            _pool.terminate()
+            _pool.join()
+        self._thread_pool = None
+
+    def _update_normalization_geometry(self):
+        """Determine the normalization range and the quadrature nodes and weights for it."""
+        if self._normalization is None:
+            return
+        if self._fixed_normalization_range is not None:
+            _low, _high = self._fixed_normalization_range
+        else:
+            _low, _high = np.amin(self._support), np.amax(self._support)
+        _range = (float(_low), float(_high))
+        if _range == getattr(self, '_normalization_range', None):
+            return  # nothing to do, keep cached normalizations
+        self._normalization_range = _range
+        self._normalization_cache.clear()
+        if self._normalization == 'numerical':
+            _nodes, _weights = np.polynomial.legendre.leggauss(self._NORMALIZATION_NODES)
+            _edges = np.linspace(_low, _high, self._NORMALIZATION_INTERVALS + 1)
+            _half_widths = 0.5 * (_edges[1:] - _edges[:-1])[:, np.newaxis]
+            _centers = 0.5 * (_edges[1:] + _edges[:-1])[:, np.newaxis]
+            self._normalization_nodes = (_centers + _half_widths * _nodes).ravel()
+            self._normalization_weights = (_half_widths * _weights).ravel()
+
+    def _calculate_normalization(self, model_parameters):
+        if self._normalization == 'numerical':
+            _density = self._model_function_object(self._normalization_nodes, *model_parameters)
+            return np.sum(self._normalization_weights * _density)
+        _low, _high = self._normalization_range
+        return self._normalization(_high, *model_parameters) - self._normalization(_low, *model_parameters)
+
     def _recalculate(self):
-        # use parent class setter for 'data'
-        UnbinnedContainer.data.fset(self, self.eval_model_function())
+        # set directly, the number of support points may have changed
+        self._data = np.array(self._get_cached_model_values(self.eval_model_function), dtype=float)
         self._pm_calculation_stale = False
 
+    @property
+    def size(self):
+        """number of support points"""
+        return len(self._support)
+
     @property
     def support(self):
         return self._support
@@ -40,7 +169,31 @@ class UnbinnedParametricModel(ParametricModelBaseMixin, UnbinnedContainer):
     @support.setter
     def support(self, model_support):
         self._support = model_support
-        self._pm_calculation_stale = True
+        self._on_support_change()
+        if self._fixed_normalization_range is None:
+            self._update_normalization_geometry()
+
+    @property
+    def normalization(self):
+        """how the model density is normalized: ``None``, ``'numerical'`` or an antiderivative"""
+        return self._normalization
+
+    @property
+    def normalization_string(self):
+        """string representation of how the model density is normalized (the source code of an antiderivative)"""
+        return self._normalization_string
+
+    @property
+    def fixed_normalization_range(self):
+        """the normalization range given explicitly, ``None`` if the range of the support is used"""
+        return self._fixed_normalization_range
+
+    @property
+    def normalization_range(self):
+        """the range over which the model density is normalized, ``None`` if it is not normalized"""
+        if self._normalization is None:
+            return None
+        return self._normalization_range
 
     @property
     def data(self):
@@ -65,4 +218,69 @@ class UnbinnedParametricModel(ParametricModelBaseMixin, UnbinnedContainer):
         """
         _x = support if support is not None else self.support
         _pars = model_parameters if model_parameters is not None else self.parameters
-        return self._model_function_object(_x, *_pars)
+        if self._normalization is None:
+            return self._model_function_object(_x, *_pars)
+        return self._model_function_object(_x, *_pars) / self.eval_normalization(_pars)
+
+    def eval_normalization(self, model_parameters=None):
+        """
+        Evaluate the integral of the model density over the normalization range.
+
+        :param model_parameters: values of the model parameters (if ``None``, the current values are used)
+        :type model_parameters: list or ``None``
+        :return: the normalization integral, ``1.0`` if the model density is assumed to be normalized
+        :rtype: float
+        """
+        if self._normalization is None:
+            return 1.0
+        _pars = model_parameters if model_parameters is not None else self.parameters
+        _key = tuple(np.asarray(_pars, dtype=float).ravel())
+        _normalization = self._normalization_cache.pop(_key, None)
+        if _normalization is None:
+            _normalization = float(self._calculate_normalization(_pars))
+            if len(self._normalization_cache) >= self._NORMALIZATION_CACHE_MAX_ENTRIES:
+                self._normalization_cache.popitem(last=False)
+        self._normalization_cache[_key] = _normalization  # (re-)insert as most recently used
+        return _normalization
+
+    def eval_total_log_likelihood(self, model_parameters=None, chunk_size=None, n_workers=None):
+        """
+        Evaluate the sum of the logarithms of the model density at the support points.
+
+        The support points are processed in chunks so that the memory needed for temporary arrays
+        does not depend on the number of support points. The chunks can be evaluated in parallel by a
+        pool of threads, which is effective if the model density releases the GIL (e.g. numpy functions).
+        The pool is created on the first call and reused for all further calls with the same **n_workers**.
+        The partial sums are added up with :py:func:`math.fsum` so that the result does not depend on
+        the chunk size or the number of threads beyond floating point precision of the partial sums.
+
+        :param model_parameters: values of the model parameters (if ``None``, the current values are used)
+        :type model_parameters: list or ``None``
+        :param chunk_size: number of support points per chunk
+                           (if ``None``, :py:attr:`DEFAULT_CHUNK_SIZE` is used)
+        :type chunk_size: int or ``None``
+        :param n_workers: number of threads to use (if ``None``, the chunks are processed sequentially)
+        :type n_workers: int or ``None``
+        :return: total log-likelihood
+        :rtype: float
+        """
+        _pars = model_parameters if model_parameters is not None else self.parameters
+        _chunk_size = int(chunk_size) if chunk_size is not None else self.DEFAULT_CHUNK_SIZE
+        if _chunk_size < 1:
+            raise UnbinnedParametricModelException("Chunk size must be a positive integer: %r" % (chunk_size,))
+        _support = self._support
+
+        def _chunk_log_likelihood(start):
+            _density = self._model_function_object(_support[start:start + _chunk_size], *_pars)
+            return float(np.sum(np.log(_density)))  # numpy uses pairwise summation
+
+        _chunk_starts = range(0, len(_support), _chunk_size)
+        if n_workers is None or n_workers <= 1 or len(_chunk_starts) <= 1:
+            _partial_sums = [_chunk_log_likelihood(_start) for _start in _chunk_starts]
+        else:
+            _partial_sums = self._get_thread_pool(n_workers).map(_chunk_log_likelihood, _chunk_starts)
+        if self._normalization is not None:
+            _partial_sums.append(-len(_support) * np.log(self.eval_normalization(_pars)))
+        if not np.all(np.isfinite(_partial_sums)):
+            return np.sum(_partial_sums)  # nan or infinite
+        return np.float64(math.fsum(_partial_sums))
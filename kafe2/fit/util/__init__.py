@@ -7,8 +7,10 @@ r"""This submodule provides utility functions for other modules.
 
 import warnings
 import numpy as np
+from scipy import sparse
 
 from . import function_library
+from ...core.error import CovMat
 
 # no __all__: import everything
 
@@ -29,13 +31,18 @@ def add_in_quadrature(*args):
 
 
 def invert_matrix(mat):
-    '''perform matrix inversion'''
-    try:
-        return np.linalg.inv(mat)
-    except np.linalg.LinAlgError:
+    '''perform matrix inversion (sparse matrices are factorized instead, see CovMat.I)'''
+    if sparse.issparse(mat):
+        _inverse = CovMat(mat).I
+    else:
+        try:
+            _inverse = np.linalg.inv(mat)
+        except np.linalg.LinAlgError:
+            _inverse = None
+    if _inverse is None:
         warnings.warn(
             "Singular covariance matrix. Are the errors for some data points equal to zero?")
-        return None
+    return _inverse
 
 
 def collect(*args):
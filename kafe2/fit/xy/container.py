@@ -58,26 +58,10 @@ class XYContainer(IndexedContainer):
         return np.array(self._data[axis_id])
 
     def _calculate_total_error(self):
-        _sz = self.size
-        _tmp_cov_mat_x = np.zeros((_sz, _sz))
-        _tmp_cov_mat_y = np.zeros((_sz, _sz))
-        for _err_dict in self._error_dicts.values():
-            if not _err_dict['enabled']:
-                continue
-            assert _err_dict['axis'] in (0, 1)
-            if _err_dict['axis'] == 0:
-                _tmp_cov_mat_x += _err_dict['err'].cov_mat
-            elif _err_dict['axis'] == 1:
-                _tmp_cov_mat_y += _err_dict['err'].cov_mat
-
-        _total_err_x = MatrixGaussianError(_tmp_cov_mat_x, 'cov', relative=False, reference=self.x)
-        _total_err_y = MatrixGaussianError(_tmp_cov_mat_y, 'cov', relative=False, reference=self.y)
+        _total_err_x = MatrixGaussianError(self._get_total_cov_mat(axis=0), 'cov', relative=False, reference=self.x)
+        _total_err_y = MatrixGaussianError(self._get_total_cov_mat(axis=1), 'cov', relative=False, reference=self.y)
         self._total_error = [_total_err_x, _total_err_y]
 
-    def _clear_total_error_cache(self):
-        """recalculate total errors next time they are needed"""
-        self._total_error = None
-
     # -- public properties
 
     @property
@@ -3,36 +3,12 @@ import scipy.stats
 import six
 
 from .._base import FitEnsembleBase, FitEnsembleException
-from ..tools.ensemble import EnsembleVariable, EnsembleVariablePlotter
+from .._base.ensemble import _correlate, _factorize_cov_mat
 from .cost import XYCostFunction_Chi2
 from .fit import XYFit
 
-import matplotlib as mpl
-from matplotlib import pyplot as plt
-from matplotlib import gridspec as gs
 
-
-__all__ = ["XYFitEnsemble"]
-
-
-def _heuristic_optimal_subplot_grid_size(n_subplots, aspect_ratio_priority=0.5):
-    def f2(s, k):
-        if n_subplots > s * (s + k):
-            return 100000
-        return ((s * (s + k) - n_subplots) ** 2 * (1.0 - aspect_ratio_priority)
-                + (float(k) / float(s)) ** 2 * (aspect_ratio_priority))
-
-    _optimal_f = np.inf
-    _optimal_sk = n_subplots, 0
-    for s in six.moves.range(1, n_subplots):
-        for k in six.moves.range(0, n_subplots):
-            _f = f2(s, k)
-            if _f < _optimal_f:
-                _optimal_f = _f
-                _optimal_sk = s, k
-
-    s, k = _optimal_sk
-    return s, s+k
+__all__ = ["XYFitEnsemble", "XYFitEnsembleException"]
 
 
 class XYFitEnsembleException(FitEnsembleException):
@@ -58,24 +34,24 @@ class XYFitEnsemble(FitEnsembleBase):
 
     The ensemble result can be visualized by using the :py:meth:`~kafe2.fit.XYFitEnsemble.plot_results` method.
 
+    For well-behaved fits with a :math:`\\chi^2` cost function, the toy fits can be replaced by a single
+    Gauss-Newton step from the "true" parameters (``mode='linearized'``). The parameter Jacobian :math:`J`
+    and the weighted projection matrix :math:`(J^T V^{-1} J)^{-1} J^T V^{-1}` are calculated once per run,
+    and the parameter estimates, pulls and cost function values of a whole batch of pseudo-experiments are
+    obtained from one matrix product. Pseudo-experiments for which the estimated step is large compared to
+    the parameter errors can be refitted with the full non-linear minimization.
+
     .. TODO Expand section
     """
     FIT_TYPE = XYFit
+    EXCEPTION_TYPE = XYFitEnsembleException
 
-    AVAILABLE_STATISTICS = {
-        'mean': EnsembleVariable.mean,
-        'mean_error': EnsembleVariable.mean_error,
-        'std': EnsembleVariable.std,
-        'skew': EnsembleVariable.skew,
-        'kurtosis': EnsembleVariable.kurtosis,
-        'cor_mat': EnsembleVariable.cor_mat,
-        'cov_mat': EnsembleVariable.cov_mat,
-    }
-    _DEFAULT_STATISTICS = {'mean', 'std'}
+    MODES = ('full', 'linearized')
 
     def __init__(self, n_experiments, x_support, model_function, model_parameters,
                  cost_function=XYCostFunction_Chi2(axes_to_use='y', errors_to_use='covariance'),
-                 requested_results=None):
+                 requested_results=None, store_results=True, storage_path=None,
+                 mode='full', refit_tolerance=None):
         """
         Construct an :py:obj:`~kafe2.fit.XYFitEnsemble` object.
 
@@ -91,207 +67,226 @@ class XYFitEnsemble(FitEnsembleBase):
         :type cost_function: :py:class:`~kafe2.fit._base.CostFunctionBase`-derived or unwrapped native Python function
         :param requested_results: list of result variables to collect for each toy fit
         :type requested_results: iterable of str
+        :param store_results: if ``False``, do not store the result variables of each toy fit. Only their
+                              statistics and histograms for plotting are accumulated, so that the memory
+                              needed does not depend on the number of pseudo-experiments.
+        :type store_results: bool
+        :param storage_path: if not ``None``, write the result variables to ``.npy`` files in this directory
+                             as the pseudo-experiments are completed, so that interrupted runs can be resumed
+                             (see :py:meth:`run`) and ensembles larger than the memory can be generated.
+        :type storage_path: str or None
+        :param mode: ``'full'`` to minimize the cost function for each pseudo-experiment or ``'linearized'``
+                     to take a single Gauss-Newton step from the "true" parameters (requires a
+                     :math:`\\chi^2` cost function)
+        :type mode: str
+        :param refit_tolerance: in ``'linearized'`` mode, perform the full fit for pseudo-experiments for which
+                                the estimated step of any parameter exceeds this many parameter errors
+                                (if ``None``, never refit)
+        :type refit_tolerance: float or None
         """
-        self._n_exp = n_experiments
+        if mode not in self.MODES:
+            raise XYFitEnsembleException("Unknown mode '%s', must be one of %r!" % (mode, self.MODES))
+        self._mode = mode
+        self._refit_tolerance = refit_tolerance
         self._ref_x_data = np.asarray(x_support, dtype=float)
         self._model_function = model_function
-        self._model_parameters = np.asarray(model_parameters)
         self._cost_function = cost_function
-        self._n_par = len(self._model_parameters)
+        super(XYFitEnsemble, self).__init__(
+            n_experiments=n_experiments, model_parameters=model_parameters,
+            requested_results=requested_results, store_results=store_results, storage_path=storage_path)
+        if mode == 'linearized' and not self._toy_fit._cost_function.is_chi2:
+            raise XYFitEnsembleException("The linearized mode requires a chi2 cost function!")
 
-        # initialize an `XYFit` object for performing the toy fits
+    def _create_toy_fit(self):
         # need some dummy initial data values in order to initialize a Fit object
         self._ref_y_data = self._model_function(self._ref_x_data, *self._model_parameters)
+        return XYFit(xy_data=[self._ref_x_data, self._ref_y_data],
+                     model_function=self._model_function,
+                     cost_function=self._cost_function)
 
-        # initialize Fit object used for fitting the pseudo-data
-        self._toy_fit = XYFit(xy_data=[self._ref_x_data, self._ref_y_data],
-                              model_function=self._model_function,
-                              cost_function=self._cost_function)
-
-        # set the model parameters of the toy fit to the reference values
-        self._set_toy_fit_parameters_to_reference()
-
-        # get reference quantities (y data, covariance matrices...) from toy fit
-        self._update_reference_quantities_from_toy_fit()
-
-        # store and validate names of requested ensemble variables
-        self._requested_results = requested_results
-        if self._requested_results is None:
-            self._requested_results = self._DEFAULT_RESULTS
-        else:
-            # validate list of results requested by user
-            _unavailable_results = set(self._requested_results) - set(self.AVAILABLE_RESULTS.keys())
-            if _unavailable_results:
-                raise ValueError("Requested unavailable result variable(s): %r"
-                                 % (_unavailable_results,))
-
-        # initialize `EnsembleVariable` objects to store ensembles
-        self._initialize_ensemble_variables()
-
-    def _set_toy_fit_parameters_to_reference(self):
-        """set the model parameters of the toy fit to the reference values"""
-        self._toy_fit._param_model._model_parameters = self._model_parameters
-        self._toy_fit._param_model._pm_calculation_stale = True
-
-    def _generate_pseudodata(self):
-        """generate new pseudo-data according to fit error model and commit to data container"""
+    def _generate_pseudodata_batch(self, seed_sequences):
+        """Generate pseudo-data according to the fit error model for a batch of pseudo-experiments, one
+        per seed sequence. If the seed sequences are ``None``, the global random state is used.
+        Returns the *x* and *y* data as arrays with one row per pseudo-experiment."""
 
         if not self._toy_fit.has_errors:
             raise FitEnsembleException("Cannot generate fit ensemble: no error model specified!")
 
-        # -- generate 'x' data
-        _x_data = self._ref_x_data.copy()
-
-        if self._toy_fit.data_container.has_x_errors:
-            # smear x data according to the total 'x' covariance matrix
-            # TODO: only gaussian smearing is implemented -> more?
-            _x_jitter = np.random.multivariate_normal(
-                np.zeros_like(_x_data),
-                self._ref_x_cov_mat)
-            _x_data += _x_jitter
-
-        _y_data = self._toy_fit.eval_model_function(x=_x_data,
-                                                    model_parameters=self._model_parameters)
-
-        # smear y data according to the total 'y' covariance matrix
         # TODO: only gaussian smearing is implemented -> more?
-        _y_jitter = np.random.multivariate_normal(
-            np.zeros_like(_y_data),
-            self._ref_y_cov_mat)
-        _y_data += _y_jitter
-
-        # update toy fit data container
-        self._toy_fit.data_container.x = _x_data
-        self._toy_fit.data_container.y = _y_data
-
-    def _gather_results_from_toy_fit(self, i_exp):
-        for _var_name in self._requested_results:
-            self._ensemble_variables[_var_name].set_value(index=i_exp, variable_value=self._get_var(_var_name))
+        _n_exp = len(seed_sequences)
+        _n_dat = self._ref_x_data.size
+        _has_x_errors = self._toy_fit.data_container.has_x_errors
+        _n_draws = 2 * _n_dat if _has_x_errors else _n_dat
+        _standard_normal = self._draw_random_batch(
+            seed_sequences, lambda random_state, n_exp: random_state.standard_normal((n_exp, _n_draws)))
+
+        # -- generate 'x' data: smear according to the total 'x' covariance matrix
+        if _has_x_errors:
+            _x_data = self._ref_x_data + _correlate(_standard_normal[:, _n_dat:], self._ref_x_cov_mat_factor)
+            _y_data = np.array([
+                self._toy_fit.eval_model_function(x=_x, model_parameters=self._model_parameters)
+                for _x in _x_data
+            ]).reshape(_n_exp, _n_dat)
+        else:
+            _x_data = np.tile(self._ref_x_data, (_n_exp, 1))
+            _y_data = np.tile(self._ref_y_data, (_n_exp, 1))
 
-    def _do_toy_fit(self):
-        """run fit with current pseudo-data"""
-        self._toy_fit.do_fit()
+        # -- generate 'y' data: smear according to the total 'y' covariance matrix
+        _y_data += _correlate(_standard_normal[:, :_n_dat], self._ref_y_cov_mat_factor)
+        return _x_data, _y_data
 
-    def _get_var(self, var_name):
-        """get the value of the result variables for the current fit"""
-        return self.AVAILABLE_RESULTS[var_name].fget(self)
+    def _set_toy_fit_data(self, x_data, y_data):
+        """commit pseudo-data to the toy fit data container"""
+        self._toy_fit.data_container.x = x_data
+        self._toy_fit.data_container.y = y_data
+        self._toy_fit._nexus.get('x_data').mark_for_update()
+        self._toy_fit._nexus.get('y_data').mark_for_update()
 
     def _initialize_ensemble_variables(self):
-        self._ensemble_variables = {}
-        self._ensemble_variable_plotters = {}
+        super(XYFitEnsemble, self)._initialize_ensemble_variables()
         if 'y_pulls' in self._requested_results:
-            self._ensemble_variables['y_pulls'] = EnsembleVariable(
-                ensemble_array=np.zeros((self._n_exp, self.n_dat)),
+            self._add_ensemble_variable(
+                'y_pulls',
+                variable_shape=(self.n_dat,),
                 distribution=scipy.stats.norm,
-                distribution_parameters=dict(loc=0, scale=1)
-            )
-            self._ensemble_variable_plotters['y_pulls'] = EnsembleVariablePlotter(
-                ensemble_variable=self._ensemble_variables['y_pulls'],
+                distribution_parameters=dict(loc=0, scale=1),
                 value_ranges=(-3, 3),
                 variable_labels=['Pull $y_{%d}$' % (_i,) for _i in six.moves.range(1, self.n_dat+1)]
             )
 
         if 'x_data' in self._requested_results:
-            self._ensemble_variables['x_data'] = EnsembleVariable(
-                ensemble_array=np.zeros((self._n_exp, self.n_dat)),
+            self._add_ensemble_variable(
+                'x_data',
+                variable_shape=(self.n_dat,),
                 distribution=scipy.stats.norm,
-                distribution_parameters=dict(loc=self._ref_x_data, scale=self._toy_fit.x_total_error)
-            )
-            self._ensemble_variable_plotters['x_data'] = EnsembleVariablePlotter(
-                ensemble_variable=self._ensemble_variables['x_data'],
+                distribution_parameters=dict(loc=self._ref_x_data, scale=self._toy_fit.x_total_error),
                 value_ranges=np.array([self._ref_x_data - 3 * self._toy_fit.x_total_error,
                                        self._ref_x_data + 3 * self._toy_fit.x_total_error]).T,
                 variable_labels=['$x_{%d}$' % (_i,) for _i in six.moves.range(1, self.n_dat+1)]
             )
 
         if 'y_data' in self._requested_results:
-            self._ensemble_variables['y_data'] = EnsembleVariable(
-                ensemble_array=np.zeros((self._n_exp, self.n_dat)),
+            self._add_ensemble_variable(
+                'y_data',
+                variable_shape=(self.n_dat,),
                 distribution=scipy.stats.norm,
-                distribution_parameters=dict(loc=self._ref_y_data, scale=self._ref_projected_xy_err)
-            )
-            self._ensemble_variable_plotters['y_data'] = EnsembleVariablePlotter(
-                ensemble_variable=self._ensemble_variables['y_data'],
+                distribution_parameters=dict(loc=self._ref_y_data, scale=self._ref_projected_xy_err),
                 value_ranges=np.array([self._ref_y_data-3*self._ref_projected_xy_err,
                                        self._ref_y_data+3*self._ref_projected_xy_err]).T,
                 variable_labels=['$y_{%d}$' % (_i,) for _i in six.moves.range(1, self.n_dat+1)]
             )
 
         if 'y_model' in self._requested_results:
-            self._ensemble_variables['y_model'] = EnsembleVariable(
-                ensemble_array=np.zeros((self._n_exp, self.n_dat)),
+            self._add_ensemble_variable(
+                'y_model',
+                variable_shape=(self.n_dat,),
                 distribution=scipy.stats.norm,
-                distribution_parameters=dict(loc=self._ref_y_data, scale=self._ref_projected_xy_err)
-            )
-            self._ensemble_variable_plotters['y_model'] = EnsembleVariablePlotter(
-                ensemble_variable=self._ensemble_variables['y_model'],
+                distribution_parameters=dict(loc=self._ref_y_data, scale=self._ref_projected_xy_err),
                 value_ranges=np.array([self._ref_y_data-3*self._ref_projected_xy_err,
                                        self._ref_y_data+3*self._ref_projected_xy_err]).T,
                 variable_labels=['$f(x_{%d})$' % (_i,) for _i in six.moves.range(1, self.n_dat+1)]
             )
 
-        if 'parameter_pulls' in self._requested_results:
-            self._ensemble_variables['parameter_pulls'] = EnsembleVariable(
-                ensemble_array=np.zeros((self._n_exp, self._n_par)),
-                distribution=scipy.stats.norm,
-                distribution_parameters=dict(loc=0, scale=1)
-            )
-            self._ensemble_variable_plotters['parameter_pulls'] = EnsembleVariablePlotter(
-                ensemble_variable=self._ensemble_variables['parameter_pulls'],
-                value_ranges=(-3, 3),
-                variable_labels=["Pull ${}$".format(_arg_formatter.latex_name)
-                                 for _arg_formatter in self._toy_fit._model_function.formatter.arg_formatters]
-            )
-
-        if 'cost' in self._requested_results:
-            self._ensemble_variables['cost'] = EnsembleVariable(
-                ensemble_array=np.zeros((self._n_exp,)),
-                distribution=scipy.stats.chi2,  # FIXME: assume chi2 for all cost functions -> change
-                distribution_parameters=dict(loc=0, df=self.n_df)
-            )
-            self._ensemble_variable_plotters['cost'] = EnsembleVariablePlotter(
-                ensemble_variable=self._ensemble_variables['cost'],
-                value_ranges=(0, 3*self.n_df),
-                variable_labels="${}$".format(self._toy_fit._cost_function.formatter.latex_name)
-            )
-
-    def _make_figure_gs(self, figsize=(8, 8), nrows=1, ncols=1,
-                        left=0.1, bottom=0.1,
-                        right=0.9, top=0.9):
-        """create a new matplotlib figure with a GridSpec controlling the subplot layout"""
-        _fig = plt.figure(figsize=figsize)  # defaults from matplotlibrc
-        _gs = gs.GridSpec(nrows=nrows,
-                          ncols=ncols,
-                          left=left,
-                          bottom=bottom,
-                          right=right,
-                          top=top,
-                          wspace=None,
-                          hspace=None,
-                          height_ratios=None)
-        return _fig, _gs
-
     def _update_reference_quantities_from_toy_fit(self):
         self._ref_y_data = self._toy_fit.eval_model_function(x=self._ref_x_data,
                                                              model_parameters=self._model_parameters)
         self._ref_x_cov_mat = self._toy_fit.x_total_cov_mat
         self._ref_y_cov_mat = self._toy_fit.y_total_cov_mat
+        # the covariance matrices are fixed -> factorize them once for generating the pseudo-data
+        self._ref_x_cov_mat_factor = _factorize_cov_mat(self._ref_x_cov_mat)
+        self._ref_y_cov_mat_factor = _factorize_cov_mat(self._ref_y_cov_mat)
         self._ref_projected_xy_cov_mat = self._toy_fit.total_cov_mat
         self._ref_x_err = self._toy_fit.x_total_error
         self._ref_y_err = self._toy_fit.y_total_error
         self._ref_projected_xy_err = self._toy_fit.total_error
+        if self._mode == 'linearized' and (self._toy_fit.has_errors or not self._toy_fit._cost_function.needs_errors):
+            self._update_linearization()
+
+    def _get_cost_weights(self):
+        """the weights of the residuals in the cost function, evaluated for the reference data: the inverse
+        covariance matrix used by the fit (possibly a :py:class:`~kafe2.core.error.CovMatInverseOperator`) or
+        the diagonal weights as a one-dimensional array"""
+        _cost_function = self._toy_fit._cost_function
+        if _cost_function._COV_MAT_INVERSE_NAME in _cost_function.arg_names:
+            # reuse the inverse (or factorization) that the fit provides to the cost function
+            _inverse = getattr(self._toy_fit, _cost_function._COV_MAT_INVERSE_NAME)
+            if _inverse is None:
+                raise XYFitEnsembleException("Cannot linearize the fit: the covariance matrix is singular!")
+            return _inverse
+        if _cost_function._ERROR_NAME in _cost_function.arg_names:
+            return 1.0 / np.asarray(getattr(self._toy_fit, _cost_function._ERROR_NAME)) ** 2
+        return np.ones(self._ref_x_data.size)
+
+    def _apply_cost_weights(self, vectors):
+        """multiply each row of **vectors** with the (symmetric) weight matrix of the cost function"""
+        _weights = self._lin_weights
+        if isinstance(_weights, np.ndarray) and _weights.ndim == 1:
+            return vectors * _weights
+        return np.asarray(_weights.dot(np.asarray(vectors).T)).T
+
+    def _update_linearization(self):
+        """calculate the parameter Jacobian and the weighted projection of the residuals onto the
+        parameters at the "true" model parameters"""
+        # one column per parameter
+        self._lin_jacobian = self._toy_fit.eval_model_function_derivative_by_parameters(
+            x=self._ref_x_data, model_parameters=self._model_parameters).T
+        self._lin_weights = self._get_cost_weights()
+        _jacobian_t_weights = self._apply_cost_weights(self._lin_jacobian.T)
+        try:
+            self._lin_parameter_cov_mat = np.linalg.inv(_jacobian_t_weights.dot(self._lin_jacobian))
+        except np.linalg.LinAlgError:
+            raise XYFitEnsembleException("Cannot linearize the fit: the parameters are not determined "
+                                         "by the linearized model!")
+        self._lin_parameter_errors = np.sqrt(np.diag(self._lin_parameter_cov_mat))
+        self._lin_projection = self._lin_parameter_cov_mat.dot(_jacobian_t_weights)
+
+    def _get_batch_results(self, data_batch):
+        """Calculate the result variables for a batch of pseudo-experiments. In ``'linearized'`` mode, the
+        parameter estimates are obtained from a single Gauss-Newton step for the whole batch."""
+        if self._mode != 'linearized':
+            return super(XYFitEnsemble, self)._get_batch_results(data_batch)
+        _x_data, _y_data = data_batch
+        if self._toy_fit.data_container.has_x_errors:
+            _ref_y_model = np.array([
+                self._toy_fit.eval_model_function(x=_x, model_parameters=self._model_parameters)
+                for _x in _x_data
+            ]).reshape(_y_data.shape)
+        else:
+            _ref_y_model = self._ref_y_data
+        _steps = (_y_data - _ref_y_model).dot(self._lin_projection.T)
+        _y_model = _ref_y_model + _steps.dot(self._lin_jacobian.T)
+        _residuals = _y_data - _y_model
+        _batch_results = dict(
+            parameter_pulls=_steps / self._lin_parameter_errors,
+            cost=np.sum(self._apply_cost_weights(_residuals) * _residuals, axis=1),
+            x_data=_x_data,
+            y_data=_y_data,
+            y_model=_y_model,
+            y_pulls=_residuals / self._ref_y_err,
+        )
+        _batch_results = {_var_name: _batch_results[_var_name] for _var_name in self._requested_results}
+
+        if self._refit_tolerance is not None:
+            # the linear approximation is not trusted far away from the "true" parameters
+            _refit = np.any(np.abs(_steps) > self._refit_tolerance * self._lin_parameter_errors, axis=1)
+            if np.any(_refit):
+                _refit_results = super(XYFitEnsemble, self)._get_batch_results((_x_data[_refit], _y_data[_refit]))
+                for _var_name, _values in six.iteritems(_refit_results):
+                    _batch_results[_var_name][_refit] = _values
+        return _batch_results
+
+    def _get_config_arrays(self):
+        return [self._ref_x_data, self._model_parameters, self._ref_x_cov_mat_factor, self._ref_y_cov_mat_factor]
+
+    def _get_config_description(self):
+        return super(XYFitEnsemble, self)._get_config_description() + (self._mode, self._refit_tolerance)
 
     # -- private properties
 
     @property
     def _x_data(self):
         """property for ensemble variable 'x_data'"""
-        return self._toy_fit.x
-
-    @property
-    def _parameter_pulls(self):
-        """property for ensemble variable 'parameter_pulls'"""
-        return (self._toy_fit.parameter_values - self._model_parameters)/self._toy_fit.parameter_errors
+        return self._toy_fit.x_data
 
     @property
     def _y_data(self):
@@ -308,35 +303,13 @@ class XYFitEnsemble(FitEnsembleBase):
         """property for ensemble variable 'y_pulls'"""
         return (self._toy_fit.y_data - self._toy_fit.y_model) / self._toy_fit.y_total_error
 
-    @property
-    def _cost(self):
-        """property for ensemble variable 'cost'"""
-        return self._toy_fit.cost_function_value
-
 
     # -- public properties
 
     @property
-    def n_exp(self):
-        """the number of pseudo-experiments to perform"""
-        return self._n_exp
-
-    @property
-    def n_par(self):
-        """the number of parameters"""
-        return self._n_par
-
-    @property
-    def n_dat(self):
-        """the number of degrees of freedom for the fit"""
-        return self._toy_fit.data_container.size
-
-    @property
-    def n_df(self):
-        """the number of degrees of freedom for the fit"""
-        # FIXME: not generally true -> update to handle constrained parameters
-        # TODO: not applicable for all cost functions -> find a flexible solution
-        return self.n_dat - self.n_par
+    def mode(self):
+        """the method for obtaining the toy fit results, ``'full'`` or ``'linearized'``"""
+        return self._mode
 
     # -- public methods
 
@@ -358,261 +331,11 @@ class XYFitEnsemble(FitEnsembleBase):
     # "inherit" docstring
     add_matrix_error.__doc__ = XYFit.add_matrix_error.__doc__
 
-    def run(self):
-        """Perform the pseudo-experiments. Retrieve and store the requested fit result variables."""
-        self._set_toy_fit_parameters_to_reference()
-        self._update_reference_quantities_from_toy_fit()
-        self._initialize_ensemble_variables()
-        for _i_exp in six.moves.range(self.n_exp):
-            self._generate_pseudodata()
-            self._do_toy_fit()
-            self._gather_results_from_toy_fit(_i_exp)
-
-    def get_results(self, *results):
-        """
-        Return a dictionary containing the ensembles of result variables.
-
-        :param results: names of result variables to retrieve
-        :type results: iterable of str. Calling without arguments retrieves *all* collected results.
-        :return: dict
-        """
-        if not results:
-            results = self._requested_results
-        else:
-            # validate list of results requested by user
-            _unavailable_results = set(self._requested_results) - set(self.AVAILABLE_RESULTS.keys())
-            if _unavailable_results:
-                raise ValueError("Requested unavailable result variable(s): %r"
-                                 % (_unavailable_results,))
-
-        _dict_to_return = dict()
-        for _result_name in results:
-            _var = self._ensemble_variables.get(_result_name, None)
-            if _var is None:
-                raise FitEnsembleException("Cannot retrieve result '{}': "
-                                           "variable not collected!".format(_result_name))
-            _dict_to_return[_result_name] = _var.values
-
-        return _dict_to_return
-
-    def get_results_statistics(self, results='all', statistics='all'):
-        """
-        Return a dictionary containing statistics (e.g. mean) of the result variables.
-
-        :param results: names of retrieved fit variable for which to return statistics
-        :type results: iterable of str or ``'all'`` (get statistics for all retrieved variables)
-        :param statistics: names of statistics to retrieve for each result variable
-        :type statistics: iterable of str or ``'all'`` (get all statistics for each retrieved variable)
-        :return: dict
-        """
-        if results == 'all':
-            results = self._requested_results
-
-        if statistics == 'all':
-            statistics = self.__class__._DEFAULT_STATISTICS
-
-        _dict_to_return = dict()
-        for _result_name in results:
-            #_result_array = self._result_array_dicts.get(_result_name, None)
-            _result_variable = self._ensemble_variables.get(_result_name, None)
-            if _result_variable is None:
-                raise FitEnsembleException("Cannot retrieve statistics for result "
-                                           "variable '{}': variable not collected!".format(_result_name))
-
-            _current_result_dict = _dict_to_return[_result_name] = dict()
-
-            # calculate and store statistics
-            for _stat_name in statistics:
-                _stat_unbound_method = self.__class__.AVAILABLE_STATISTICS.get(_stat_name, None)
-                if _stat_unbound_method is None:
-                    raise FitEnsembleException(
-                        "Unknown statistic '%s' requested!" % (_stat_name,))
-                _stat = _stat_unbound_method.__get__(_result_variable, EnsembleVariable)
-                _current_result_dict[_stat_name] = _stat
-
-        return _dict_to_return
-
-    def plot_result_distributions(self, results='all',
-                                  show_legend=True):
-        """
-        Make plots with histograms of the requested fit variable values across all pseudo-experiments.
-
-        :param results: names of retrieved fit variable for which to generate plots
-        :type results: iterable of str or ``'all'`` (make plots for all retrieved variables)
-        :param show_legend: if ``True``, show a plot legend on each figure
-        :type show_legend: bool
-        """
-        if results == 'all':
-            results = self._requested_results
-        else:
-            # validate list of results requested by user
-            _unavailable_results = set(self._requested_results) - set(self.AVAILABLE_RESULTS.keys())
-            if _unavailable_results:
-                raise ValueError("Requested unavailable result variable(s): %r"
-                                 % (_unavailable_results,))
-
-        for _result_name in results:
-            _result_variable = self._ensemble_variables.get(_result_name, None)
-
-            if _result_variable is None:
-                raise FitEnsembleException("Cannot plot result for variable '%s': "
-                                           "variable not collected!" % (_result_name,))
-
-            _result_variable_plotter = self._ensemble_variable_plotters.get(_result_name, None)
-
-            if _result_variable_plotter is None:
-                raise FitEnsembleException("Cannot plot result for variable '%s': "
-                                           "no plotter defined!" % (_result_name,))
-
-            # -- decide how to lay out plots depending on the result variable dimensionality
-            if _result_variable.ndim == 0:
-                # if the ensemble variable is a scalar,
-                # plot it into a single `Axes` object
-                _fig, _gs = self._make_figure_gs(figsize=(8, 8), nrows=1, ncols=1)
-                _ax = plt.subplot(_gs[0, 0])
-                # call the plotting routine on the axes grid
-                _plot_result_dict = _result_variable_plotter.plot_hist(_ax)
-
-            elif _result_variable.ndim == 1:
-                # if the ensemble variable is a one-dimensional vector,
-                # plot each entry into a separate `Axes` object and display
-                # them in a grid-like layout
-                _nplots = int(_result_variable.shape[0])
-                _nrows, _ncols = _heuristic_optimal_subplot_grid_size(_nplots, aspect_ratio_priority=0.8)
-                _fig, _gs = self._make_figure_gs(figsize=(8, 8), nrows=_nrows, ncols=_ncols)
-
-                # create an array 'a' with a[i, j] = [i, j]
-                _axes_grid = np.dstack((np.meshgrid(np.arange(_nrows), np.arange(_ncols))))
-                # replace [i, j] by the `Axes` object for _gs[i, j] -> array of `Axes`
-                _axes_grid = np.apply_along_axis(
-                    lambda irow_icol: plt.subplot(_gs[irow_icol[0], irow_icol[1]]) if irow_icol[0]*_ncols+irow_icol[1] < _nplots else None,
-                    -1, _axes_grid)
-                # reshape the `Axes` array to match the variable shape
-                _axes_grid = _axes_grid.T.flatten()[:_result_variable.shape[0]]
-                # call the plotting routine on the axes grid
-                _plot_result_dict = _result_variable_plotter.plot_hist(_axes_grid)
-
-            elif _result_variable.ndim == 2:
-                # if the ensemble variable is a two-dimensional vector,
-                # plot the (i,j)-th entry into a an `Axes` object at the
-                # (i,j)-th position in a grid
-
-                _nrows = _result_variable.shape[0]
-                _ncols = _result_variable.shape[1]
-
-                _fig, _gs = self._make_figure_gs(figsize=(8, 8), nrows=_nrows, ncols=_ncols)
-
-                # create an array 'a' with a[i, j] = [i, j]
-                _axes_grid = np.dstack(reversed(np.meshgrid(np.arange(_nrows), np.arange(_ncols))))
-                # replace [i, j] by the `Axes` object for _gs[i, j] -> array of `Axes`
-                _axes_grid = np.apply_along_axis(
-                    lambda irow_icol: plt.subplot(_gs[irow_icol[0], irow_icol[1]]),
-                    -1, _axes_grid)
-                # do not reshape _axes_grid -> its shape already matches variable shape
-
-                # call the plotting routine on the axes grid
-                _plot_result_dict = _result_variable_plotter.plot_hist(_axes_grid)
-            else:
-                # cannot plot variables with 3 or more dimensions...
-                raise FitEnsembleException("Cannot plot result for variable '%s': variable entry dimensionality "
-                                           "too high (%d)!" % (_result_name, _result_variable.ndim))
-
-            if show_legend:
-                _fig.legend(_plot_result_dict['legend_handles'],
-                            _plot_result_dict['legend_labels'], loc='lower center')
-                # add extra space at figure bottom for legend
-                _figure_extra_bottom = 0.05 * len(_plot_result_dict['legend_labels'])
-            else:
-                # no extra space at figure bottom
-                _figure_extra_bottom = 0.0
-
-            _fig.canvas.set_window_title(_result_name)
-
-            _gs.tight_layout(_fig,
-                             pad=0.0, w_pad=0, h_pad=-0.2,
-                             rect=(0.01, 0.02+_figure_extra_bottom, 0.98, 0.98))
-
-        return _plot_result_dict
-
-    def plot_result_scatter(self, results='all',
-                                  show_legend=True):
-        """
-        Make plots with histograms of the requested fit variable values across all pseudo-experiments.
-
-        :param results: names of retrieved fit variable for which to generate plots
-        :type results: iterable of str or ``'all'`` (make plots for all retrieved variables)
-        :param show_legend: if ``True``, show a plot legend on each figure
-        :type show_legend: bool
-        """
-        if results == 'all':
-            results = self._requested_results
-        else:
-            # validate list of results requested by user
-            _unavailable_results = set(self._requested_results) - set(self.AVAILABLE_RESULTS.keys())
-            if _unavailable_results:
-                raise ValueError("Requested unavailable result variable(s): %r"
-                                 % (_unavailable_results,))
-
-        for _result_name in results:
-            _result_variable = self._ensemble_variables.get(_result_name, None)
-
-            if _result_variable is None:
-                raise FitEnsembleException("Cannot plot result for variable '%s': "
-                                           "variable not collected!" % (_result_name,))
-
-            _result_variable_plotter = self._ensemble_variable_plotters.get(_result_name, None)
-
-            if _result_variable_plotter is None:
-                raise FitEnsembleException("Cannot plot result for variable '%s': "
-                                           "no plotter defined!" % (_result_name,))
-
-            # -- decide how to lay out plots depending on the result variable dimensionality
-            if _result_variable.ndim != 1:
-                raise ValueError()
-
-            # if the ensemble variable is a one-dimensional vector,
-            # plot each entry into a separate `Axes` object and display
-            # them in a grid-like layout
-            _nrows = _ncols = int(_result_variable.shape[0])
-            if _nrows <= 1:
-                raise FitEnsembleException("Cannot create scatter plot for result variable '%s': "
-                                           "vector has less than two entries!" % (_result_name,))
-            _fig, _gs = self._make_figure_gs(figsize=(8, 8), nrows=_nrows-1, ncols=_ncols-1)
-
-            # create an array 'a' with a[i, j] = [i, j]
-            _axes_grid = np.dstack((np.meshgrid(np.arange(_nrows), np.arange(_ncols))))
-            # replace [i, j] by the `Axes` object for _gs[i, j] -> array of `Axes`
-            _axes_grid = np.apply_along_axis(
-                lambda irow_icol: plt.subplot(_gs[irow_icol[0] - 1, irow_icol[1]]) if irow_icol[0] > irow_icol[1] else None,
-                -1, _axes_grid)
-
-            # call the plotting routine on the axes grid
-            _plot_result_dict = _result_variable_plotter.plot_scatter(_axes_grid)
-
-            if show_legend:
-                _fig.legend(_plot_result_dict['legend_handles'],
-                            _plot_result_dict['legend_labels'], loc='lower center')
-                # add extra space at figure bottom for legend
-                _figure_extra_bottom = 0.05 * len(_plot_result_dict['legend_labels'])
-            else:
-                # no extra space at figure bottom
-                _figure_extra_bottom = 0.0
-
-            _fig.canvas.set_window_title(_result_name)
-
-            _gs.tight_layout(_fig,
-                             pad=0.0, w_pad=0, h_pad=-0.2,
-                             rect=(0.01, 0.02+_figure_extra_bottom, 0.98, 0.98))
-
-        return _plot_result_dict
-
-
-    AVAILABLE_RESULTS = {
-        'parameter_pulls': _parameter_pulls,
-        'x_data': _x_data,
-        'y_pulls': _y_pulls,
-        'cost': _cost,
-        'y_data': _y_data,
-        'y_model': _y_model,
-    }
+    AVAILABLE_RESULTS = dict(
+        FitEnsembleBase.AVAILABLE_RESULTS,
+        x_data=_x_data,
+        y_pulls=_y_pulls,
+        y_data=_y_data,
+        y_model=_y_model,
+    )
     _DEFAULT_RESULTS = {'y_pulls', 'parameter_pulls', 'cost'}
@@ -2,8 +2,9 @@ from collections import OrderedDict
 from copy import deepcopy
 
 import numpy as np
+from scipy import sparse
 
-from ...core.error import CovMat
+from ...core.error import CovMat, add_cov_mats
 from ...tools import print_dict_as_table
 from ...config import kc
 from .._base import FitException, FitBase, DataContainerBase, ModelFunctionBase
@@ -187,20 +188,29 @@ class XYFit(FitBase):
         self._param_model.parameters = self.parameter_values  # this is lazy, so just do it
         self._param_model.x = self.x_model
 
-        if np.all(x == 0):
-            return y
+        if sparse.issparse(x):
+            if x.count_nonzero() == 0:
+                return y
+            _diag = x.diagonal()
+        else:
+            if np.all(x == 0):
+                return y
+            _diag = x if x.ndim == 1 else np.diag(x)
 
-        _diag = x if x.ndim == 1 else np.diag(x)
         _precision = 0.01 * np.min(_diag) if sqrt else 0.01 * np.min(np.sqrt(_diag))
         _derivatives = self._param_model.eval_model_function_derivative_by_x(
             dx=_precision,
             model_parameters=self.parameter_values
         )
+        if sparse.issparse(x):
+            # D * x * D with D = diag(derivatives) keeps the sparsity pattern of x
+            _d = sparse.diags(_derivatives)
+            return add_cov_mats(y, _d.dot(x).dot(_d))
         _x_scale = _derivatives ** 2 if x.ndim == 1 else np.outer(_derivatives, _derivatives)
         if sqrt:
             return np.sqrt(y ** 2 + x ** 2 * _x_scale)
         else:
-            return y + x * _x_scale
+            return add_cov_mats(y, x * _x_scale)
 
     def _set_data_as_model_ref(self):
         _errs_and_old_refs = []
@@ -318,7 +328,7 @@ class XYFit(FitBase):
     @property
     def data_cor_mat(self):
         """the data *xy* correlation matrix (projected onto the *y* axis)"""
-        return CovMat(self.data_cov_mat).cor_mat
+        return CovMat(self.data_cov_mat, check_symmetry=False).cor_mat
 
     @property
     def y_model(self):
@@ -404,7 +414,7 @@ class XYFit(FitBase):
     @property
     def model_cor_mat(self):
         """the model *xy* correlation matrix (projected onto the *y* axis)"""
-        return CovMat(self.model_cov_mat).cor_mat
+        return CovMat(self.model_cov_mat, check_symmetry=False).cor_mat
 
     @property
     def x_total_error(self):
@@ -424,12 +434,12 @@ class XYFit(FitBase):
     @property
     def x_total_cov_mat(self):
         """the total *x* covariance matrix"""
-        return self.x_data_cov_mat + self.x_model_cov_mat
+        return add_cov_mats(self.x_data_cov_mat, self.x_model_cov_mat)
 
     @property
     def y_total_cov_mat(self):
         """the total *y* covariance matrix"""
-        return self.y_data_cov_mat + self.y_model_cov_mat
+        return add_cov_mats(self.y_data_cov_mat, self.y_model_cov_mat)
 
     @property
     def total_cov_mat(self):
@@ -444,7 +454,15 @@ class XYFit(FitBase):
     @property
     def y_total_cov_mat_inverse(self):
         """inverse of the total *y* covariance matrix (or ``None`` if singular)"""
-        return invert_matrix(self.y_total_cov_mat)
+        # reuse the cached inverse of the data or model errors if only one of them contributes
+        _inverse = None
+        if not self._param_model.has_y_errors:
+            _inverse = self.y_data_cov_mat_inverse
+        elif not self._data_container.has_y_errors:
+            _inverse = self.y_model_cov_mat_inverse
+        if _inverse is None:
+            _inverse = invert_matrix(self.y_total_cov_mat)
+        return _inverse
 
     @property
     def total_cov_mat_inverse(self):
@@ -452,17 +470,19 @@ class XYFit(FitBase):
         inverse of the total *xy* covariance matrix (projected onto the *y* axis, ``None`` if
         singular)
         """
+        if not self.has_x_errors:
+            return self.y_total_cov_mat_inverse
         return invert_matrix(self.total_cov_mat)
 
     @property
     def x_total_cor_mat(self):
         """the total *x* correlation matrix"""
-        return CovMat(self.x_total_cov_mat).cor_mat
+        return CovMat(self.x_total_cov_mat, check_symmetry=False).cor_mat
 
     @property
     def y_total_cor_mat(self):
         """the total *y* correlation matrix"""
-        return CovMat(self.y_total_cov_mat).cor_mat
+        return CovMat(self.y_total_cov_mat, check_symmetry=False).cor_mat
 
     @property
     def x_range(self):
@@ -545,7 +565,8 @@ class XYFit(FitBase):
         self._param_model.x = self.x_model
         return self._param_model.eval_model_function(x=x, model_parameters=model_parameters)
 
-    def eval_model_function_derivative_by_parameters(self, x=None, model_parameters=None):
+    def eval_model_function_derivative_by_parameters(self, x=None, model_parameters=None, par_dx=None,
+                                                     method='central'):
         """
         Evaluate the model function derivative for each parameter.
 
@@ -553,9 +574,14 @@ class XYFit(FitBase):
         :type x: iterable of float
         :param model_parameters: the model parameter values (if ``None``, the current values are used)
         :type model_parameters: iterable of float
-        :return: model function values
+        :param par_dx: step size for numeric differentiation (if ``None``, chosen for each parameter)
+        :type par_dx: float or iterable of float
+        :param method: ``'forward'``, ``'central'`` or ``'complex'`` (complex step) differentiation
+        :type method: str
+        :return: model function derivatives, one row per parameter
         :rtype: :py:class:`numpy.ndarray`
         """
         self._param_model.parameters = self.parameter_values  # this is lazy, so just do it
         self._param_model.x = self.x_model
-        return self._param_model.eval_model_function_derivative_by_parameters(x=x, model_parameters=model_parameters)
+        return self._param_model.eval_model_function_derivative_by_parameters(
+            x=x, model_parameters=model_parameters, par_dx=par_dx, method=method)
@@ -1,7 +1,5 @@
 import numpy as np
 
-from scipy.misc import derivative
-
 from .._base import ParametricModelBaseMixin
 from .container import XYContainer, XYContainerException
 from ..util import function_library
@@ -15,6 +13,12 @@ class XYParametricModelException(XYContainerException):
 
 
 class XYParametricModel(ParametricModelBaseMixin, XYContainer):
+    # weights of the central difference stencils used for numeric differentiation by x
+    _CENTRAL_DIFFERENCE_WEIGHTS = {
+        3: (-1.0/2.0, 0.0, 1.0/2.0),
+        5: (1.0/12.0, -2.0/3.0, 0.0, 2.0/3.0, -1.0/12.0),
+    }
+
     #TODO why does model_function get abbreviated as model_func?
     def __init__(self, x_data, model_func=function_library.linear_model, model_parameters=[1.0, 1.0]):
         """
@@ -33,7 +37,7 @@ class XYParametricModel(ParametricModelBaseMixin, XYContainer):
 
     def _recalculate(self):
         # use parent class setter for 'y'
-        XYContainer.y.fset(self, self.eval_model_function())
+        XYContainer.y.fset(self, self._get_cached_model_values(self.eval_model_function))
         self._pm_calculation_stale = False
 
 
@@ -57,10 +61,12 @@ class XYParametricModel(ParametricModelBaseMixin, XYContainer):
 
     @x.setter
     def x(self, new_x):
+        if np.array_equal(new_x, self._data[0]):
+            return  # nothing to do, keep model values and cached errors
         # resetting 'x' -> must reset entire data array
         self._data = np.zeros((2, len(new_x)))
         self._data[0] = new_x
-        self._pm_calculation_stale = True
+        self._on_support_change()
         self._clear_total_error_cache()
 
     @property
@@ -91,7 +97,8 @@ class XYParametricModel(ParametricModelBaseMixin, XYContainer):
         _pars = model_parameters if model_parameters is not None else self._model_parameters
         return self._model_function_object(_x, *_pars)
 
-    def eval_model_function_derivative_by_parameters(self, x=None, model_parameters=None, par_dx=None):
+    def eval_model_function_derivative_by_parameters(self, x=None, model_parameters=None, par_dx=None,
+                                                     method='central'):
         """
         Evaluate the derivative of the model function with respect to the model parameters.
 
@@ -100,52 +107,60 @@ class XYParametricModel(ParametricModelBaseMixin, XYContainer):
         :param model_parameters: values of the model parameters (if ``None``, the current values are used)
         :type model_parameters: list or ``None``
         :param par_dx: step size for numeric differentiation
-        :type par_dx: float
-        :return: value(s) of the model function derivative for the given parameters
+        :type par_dx: float or iterable of float
+        :param method: ``'forward'``, ``'central'`` or ``'complex'`` (complex step) differentiation
+        :type method: str
+        :return: value(s) of the model function derivative for the given parameters, one row per parameter
         :rtype: :py:obj:`numpy.ndarray`
         """
-        _x = x if x is not None else self.x
+        _x = np.asarray(x if x is not None else self.x)
         _pars = model_parameters if model_parameters is not None else self._model_parameters
-        _pars = np.asarray(_pars)
-        _par_dxs = par_dx if par_dx is not None else 1e-2 * (np.abs(_pars) + 1.0/(1.0+np.abs(_pars)))
+        return self._eval_jacobian(
+            func=lambda *pars: self._model_function_object(_x, *pars),
+            model_parameters=_pars, par_dx=par_dx, method=method, cache_key=(_x.shape, _x.tobytes())
+        )
 
-        _ret = []
-        for _par_idx, (_par_val, _par_dx) in enumerate(zip(_pars, _par_dxs)):
-            def _chipped_func(par):
-                _chipped_pars = _pars.copy()
-                _chipped_pars[_par_idx] = par
-                return self._model_function_object(_x, *_chipped_pars)
-
-            _der_val = derivative(_chipped_func, _par_val, dx=_par_dx)
-            _ret.append(_der_val)
-        return np.array(_ret)
-
-    def eval_model_function_derivative_by_x(self, x=None, model_parameters=None, dx=None):
+    def eval_model_function_derivative_by_x(self, x=None, model_parameters=None, dx=None, order=3):
         """
         Evaluate the derivative of the model function with respect to the independent variable (*x*).
 
+        If an analytic derivative has been assigned to the model function
+        (:py:attr:`~kafe2.fit._base.ModelFunctionBase.derivative_by_x`), it is used. Otherwise, the
+        derivative is calculated with a central difference stencil. The model function is evaluated for
+        all support points at once, so it must accept a :py:obj:`numpy.ndarray` for *x*.
+
         :param x: *x* values of the support points (if ``None``, the model *x* values are used)
         :type x: list or ``None``
         :param model_parameters: values of the model parameters (if ``None``, the current values are used)
         :type model_parameters: list or ``None``
         :param dx: step size for numeric differentiation
-        :type dx: float
+        :type dx: float or iterable of float
+        :param order: number of points of the central difference stencil, either ``3`` or ``5``
+        :type order: int
         :return: value(s) of the model function derivative
         :rtype: :py:obj:`numpy.ndarray`
         """
-        _x = x if x is not None else self.x
+        _x = np.asarray(x if x is not None else self.x, dtype=float)
         _pars = model_parameters if model_parameters is not None else self._model_parameters
-        _dxs = dx if dx is not None else 1e-2 * (np.abs(_x) + 1.0/(1.0+np.abs(_x)))
+
+        _derivative_by_x = self._model_function_object.derivative_by_x
+        if _derivative_by_x is not None:
+            return np.ones_like(_x) * _derivative_by_x(_x, *_pars)
+
         try:
-            iter(_dxs)
-        except TypeError:
-            _dxs = np.ones_like(_x)*_dxs
-
-        _ret = []
-        for _x_idx, (_x_val, _dx) in enumerate(zip(_x, _dxs)):
-            def _chipped_func(x):
-                return self._model_function_object(x, *_pars)
-
-            _der_val = derivative(_chipped_func, _x_val, dx=_dx)
-            _ret.append(_der_val)
-        return np.array(_ret)
+            _weights = self._CENTRAL_DIFFERENCE_WEIGHTS[order]
+        except KeyError:
+            raise XYParametricModelException(
+                "Unsupported order %r for numeric differentiation, must be one of %r!"
+                % (order, sorted(self._CENTRAL_DIFFERENCE_WEIGHTS.keys())))
+        _dxs = dx if dx is not None else 1e-2 * (np.abs(_x) + 1.0/(1.0+np.abs(_x)))
+        _dxs = np.ones_like(_x) * _dxs
+
+        # evaluate the model at the points of the stencil for all support points at once
+        _half_width = len(_weights) // 2
+        _ret = np.zeros_like(_x)
+        for _i, _weight in enumerate(_weights):
+            if _weight == 0:
+                continue
+            _ret += _weight * self._model_function_object(_x + (_i - _half_width) * _dxs, *_pars)
+        return _ret / _dxs
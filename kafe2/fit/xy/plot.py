@@ -120,14 +120,10 @@ class XYPlotAdapter(PlotAdapterBase):
             model_parameters=self._fit.parameter_values)
         # here: df/dp[par_idx]|x=x[x_idx] = _f_deriv_by_params[par_idx][x_idx]
 
-        _f_deriv_by_params = _f_deriv_by_params.T
-        # here: df/dp[par_idx]|x=x[x_idx] = _f_deriv_by_params[x_idx][par_idx]
-
-        _band_y = np.zeros_like(_band_x)
         _n_poi = len(self._fit.parameter_values)
-        for _x_idx, _x_val in enumerate(_band_x):
-            _p_res = _f_deriv_by_params[_x_idx]
-            _band_y[_x_idx] = _p_res.dot(self._fit.parameter_cov_mat[:_n_poi, :_n_poi]).dot(_p_res)
+        _par_cov_mat = self._fit.parameter_cov_mat[:_n_poi, :_n_poi]
+        # for each x: (df/dp)^T * V_p * (df/dp)
+        _band_y = np.sum(_f_deriv_by_params * _par_cov_mat.dot(_f_deriv_by_params), axis=0)
 
         return np.sqrt(_band_y)
 
@@ -1,8 +1,9 @@
 import unittest2 as unittest
 
 import numpy as np
+from scipy import linalg, sparse
 
-from kafe2.core.error import CovMat, cov_mat_from_float_list, cov_mat_from_float
+from kafe2.core.error import CovMat, BlockCovMat, cov_mat_from_float_list, cov_mat_from_float
 
 
 class TestCovMat(unittest.TestCase):
@@ -39,6 +40,21 @@ class TestCovMat(unittest.TestCase):
         with self.assertRaises(ValueError):
             CovMat(np.arange(10))
 
+    def test_not_symmetric_raise(self):
+        _mat = [[1.0, 0.5], [0.0, 1.0]]
+        with self.assertRaises(ValueError):
+            CovMat(_mat)
+        self.assertTrue(np.all(CovMat(_mat, check_symmetry=False).mat == _mat))
+
+    def test_read_only(self):
+        for _mat in (self.cm.mat, self.cm.I, self.cm.chol, self.cm.cor_mat):
+            self.assertFalse(_mat.flags.writeable)
+            with self.assertRaises(ValueError):
+                _mat[0, 0] = 0.0
+        _mat = self.cm.mat.copy()
+        _mat[0, 0] = 0.0
+        self.assertEqual(self.cm.mat[0, 0], 1.0e-02)
+
     def test_rescale(self):
         self.cm.rescale(self.reference, [3, 2, 1, 9, 2])
         _ref = np.array([
@@ -50,6 +66,41 @@ class TestCovMat(unittest.TestCase):
         ])
         self.assertTrue(np.allclose(self.cm.mat, _ref))
 
+    def test_rescale_cached_inverse(self):
+        _ = self.cm.I, self.cm.chol
+        _new_reference = [3, -2, 1, 9, 2]
+        self.cm.rescale(self.reference, _new_reference)
+        self.assertTrue(np.allclose(self.cm.I, np.linalg.inv(self.cm.mat)))
+        self.assertTrue(np.allclose(self.cm.chol, np.linalg.cholesky(self.cm.mat)))
+
+    def test_scaled(self):
+        _scale = np.array([0.5, -2.0, 1.0, 3.0, 2.0])
+        _scaled = self.cm.scaled(_scale)
+        _ref = self.cm.mat * np.outer(_scale, _scale)
+        self.assertTrue(np.allclose(_scaled.mat, _ref))
+        self.assertTrue(np.allclose(_scaled.I, np.linalg.inv(_ref)))
+        self.assertTrue(np.allclose(_scaled.chol, np.linalg.cholesky(_ref)))
+        self.assertIs(self.cm.scaled(np.zeros(5)).I, None)
+
+    def test_scaled_rescale(self):
+        _scaled = self.cm.scaled([0.5, -2.0, 1.0, 3.0, 2.0])
+        _scaled.rescale(self.reference, [3, -2, 1, 9, 2])
+        self.assertTrue(np.allclose(_scaled.I, np.linalg.inv(_scaled.mat)))
+        self.assertTrue(np.allclose(_scaled.chol, np.linalg.cholesky(_scaled.mat)))
+        _factor = _scaled.low_rank_factor
+        self.assertTrue(np.allclose(_factor.dot(_factor.T), _scaled.mat))
+
+    def test_scaled_low_rank_factor(self):
+        _scale = np.array([0.5, -2.0, 1.0, 3.0, 2.0])
+        _factor = self.cm.low_rank_factor
+        _scaled = self.cm.scaled(_scale)
+        _ = _scaled.I  # the factors are inherited before the low-rank factor is requested
+        self.assertTrue(np.array_equal(_scaled.low_rank_factor, (_factor.T * _scale).T))
+        self.assertTrue(np.allclose(_scaled.low_rank_factor.dot(_scaled.low_rank_factor.T), _scaled.mat))
+        # the factor of this matrix is calculated once and shared by all scaled matrices
+        _scaled_again = self.cm.scaled(2.0 * _scale)
+        self.assertTrue(np.array_equal(_scaled_again.low_rank_factor, (_factor.T * 2.0 * _scale).T))
+
     def test_inverse(self):
         self.assertTrue(np.allclose(self.cm.I.dot(self.cm.mat), np.eye(self.cm.mat.shape[0])))
 
@@ -64,6 +115,118 @@ class TestCovMat(unittest.TestCase):
         self.assertIs(self._cm_chol_fail.split_svd, None)
 
 
+class TestCovMatSparse(unittest.TestCase):
+
+    def setUp(self):
+        _size = 50
+        _diag = np.linspace(1.0, 2.0, _size)
+        _off = 0.3 * np.ones(_size - 1)
+        self.dense_band = np.diag(_diag) + np.diag(_off, 1) + np.diag(_off, -1)
+        self.dense_general = self.dense_band.copy()
+        self.dense_general[0, -1] = self.dense_general[-1, 0] = 0.2
+        self.cm_band = CovMat(sparse.csr_matrix(self.dense_band))
+        self.cm_general = CovMat(sparse.csr_matrix(self.dense_general))
+        self.vector = np.sin(np.arange(_size))
+
+    def test_stays_sparse(self):
+        self.assertTrue(self.cm_band.sparse)
+        self.assertTrue(sparse.issparse(self.cm_band.mat))
+        self.assertFalse(CovMat(self.dense_band).sparse)
+
+    def test_inverse_banded(self):
+        self.assertTrue(np.allclose(self.cm_band.I.dot(self.vector),
+                                    np.linalg.solve(self.dense_band, self.vector)))
+        self.assertTrue(np.allclose(self.cm_band.I.toarray(), np.linalg.inv(self.dense_band)))
+
+    def test_inverse_general(self):
+        self.assertTrue(np.allclose(self.cm_general.I.dot(self.vector),
+                                    np.linalg.solve(self.dense_general, self.vector)))
+
+    def test_chol_banded(self):
+        _chol = self.cm_band.chol
+        self.assertTrue(np.allclose(_chol.dot(_chol.T).toarray(), self.dense_band))
+
+    def test_inverse_singular(self):
+        self.assertIs(CovMat(sparse.csr_matrix((4, 4))).I, None)
+
+    def test_rescale(self):
+        _old_ref = np.ones(50)
+        _new_ref = np.linspace(1.0, 3.0, 50)
+        _dense = CovMat(self.dense_band)
+        _dense.rescale(_old_ref, _new_ref)
+        self.cm_band.rescale(_old_ref, _new_ref)
+        self.assertTrue(self.cm_band.sparse)
+        self.assertTrue(np.allclose(self.cm_band.mat.toarray(), _dense.mat))
+
+    def test_scaled(self):
+        _scale = np.linspace(-1.0, 2.0, 50)
+        for _cm, _dense in ((self.cm_band, self.dense_band), (self.cm_general, self.dense_general)):
+            _scaled = _cm.scaled(_scale)
+            _ref = _dense * np.outer(_scale, _scale)
+            self.assertTrue(_scaled.sparse)
+            self.assertTrue(np.allclose(_scaled.I.dot(self.vector), np.linalg.solve(_ref, self.vector)))
+        _chol = self.cm_band.scaled(_scale).chol
+        self.assertTrue(np.allclose(_chol.toarray(), np.linalg.cholesky(self.dense_band * np.outer(_scale, _scale))))
+
+    def test_add(self):
+        _sum = self.cm_band + self.cm_band
+        self.assertTrue(_sum.sparse)
+        self.assertTrue(np.allclose(_sum.mat.toarray(), 2 * self.dense_band))
+        _sum_mixed = self.cm_band + CovMat(self.dense_band)
+        self.assertFalse(_sum_mixed.sparse)
+        self.assertTrue(np.allclose(_sum_mixed.mat, 2 * self.dense_band))
+
+
+class TestBlockCovMat(unittest.TestCase):
+
+    def setUp(self):
+        self.blocks = [
+            np.diag([1.0, 2.0, 3.0]),
+            np.array([[2.0, 0.5], [0.5, 1.0]]),
+            sparse.csr_matrix(np.diag([0.5, 1.5, 2.5, 3.5]))
+        ]
+        _shared = cov_mat_from_float_list([0.3, 0.4], correlation=0.5)
+        self.coupling = np.zeros((9, 3))
+        self.coupling[[0, 1, 2], 0] = 0.7  # fully correlated within first block
+        self.coupling[3:5, 1:] = _shared.low_rank_factor
+        self.coupling[7:9, 1:] = _shared.low_rank_factor
+        self.dense = linalg.block_diag(self.blocks[0], self.blocks[1], self.blocks[2].toarray())
+        self.dense += self.coupling.dot(self.coupling.T)
+        self.cm = BlockCovMat(self.blocks, self.coupling)
+        self.vector = np.sin(np.arange(9))
+
+    def test_mat(self):
+        self.assertEqual(len(self.cm), 9)
+        self.assertTrue(np.allclose(self.cm.mat, self.dense))
+        self.assertTrue(np.allclose(self.cm.diagonal(), np.diag(self.dense)))
+
+    def test_low_rank_factor(self):
+        _factor = cov_mat_from_float_list([0.3, 0.4, 0.2], correlation=1.0).low_rank_factor
+        self.assertEqual(_factor.shape, (3, 1))
+        self.assertTrue(np.allclose(_factor.dot(_factor.T), np.outer([0.3, 0.4, 0.2], [0.3, 0.4, 0.2])))
+
+    def test_inverse(self):
+        self.assertTrue(np.allclose(self.cm.I.dot(self.vector), np.linalg.solve(self.dense, self.vector)))
+        self.assertTrue(np.allclose(self.cm.I.toarray(), np.linalg.inv(self.dense)))
+
+    def test_inverse_singular_blocks(self):
+        _blocks = [np.zeros((3, 3)), self.blocks[1], self.blocks[2]]
+        _coupling = np.zeros((9, 3))
+        _coupling[:3] = np.eye(3)
+        _cm = BlockCovMat(_blocks, _coupling)
+        self.assertTrue(np.allclose(_cm.I.dot(self.vector), np.linalg.solve(_cm.mat, self.vector)))
+        self.assertIs(BlockCovMat(_blocks).I, None)
+
+    def test_scaled_add(self):
+        _scale = np.linspace(-1.0, 2.0, 9)
+        _sum = self.cm + self.cm.scaled(_scale)
+        _ref = self.dense + self.dense * np.outer(_scale, _scale)
+        self.assertTrue(np.allclose(_sum.mat, _ref))
+        self.assertTrue(np.allclose(_sum.I.dot(self.vector), np.linalg.solve(_ref, self.vector)))
+        with self.assertRaises(ValueError):
+            self.cm + BlockCovMat(self.blocks[:2])
+
+
 class TestCovMatHelperFunctions(unittest.TestCase):
 
     def setUp(self):
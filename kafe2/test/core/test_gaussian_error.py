@@ -114,6 +114,22 @@ class TestMatrixGaussianError(unittest.TestCase):
         self.assertTrue(np.allclose(self.ge_cor_noref.cov_mat_inverse, self.ref_cov_mat_inverse))
         self.assertTrue(np.allclose(self.ge_cor_wref.cov_mat_inverse, self.ref_cov_mat_inverse))
 
+    def test_compare_cov_mat_inverse_relative_new_reference(self):
+        # ref_cov_mat_rel is not positive definite, use a well-defined relative matrix instead
+        _cov_mat_rel = np.array([[0.04, 0.01, 0.00],
+                                 [0.01, 0.09, 0.02],
+                                 [0.00, 0.02, 0.01]])
+        _reference = [np.array([1.0, 2.0, 3.0])]
+        _err = MatrixGaussianError(_cov_mat_rel, 'cov', relative=True, reference=lambda: _reference[0])
+        for _new_reference in ([1.0, 2.0, 3.0], [-4.0, 0.5, 2.0], [2.0, 2.0, 7.0]):
+            _reference[0] = np.array(_new_reference)
+            _ref_cov_mat = _cov_mat_rel * np.outer(_new_reference, _new_reference)
+            self.assertTrue(np.allclose(_err.cov_mat, _ref_cov_mat))
+            self.assertTrue(np.allclose(_err.cov_mat_inverse, np.linalg.inv(_ref_cov_mat)))
+            self.assertTrue(np.allclose(_err.get_cov_mat_object().chol, np.linalg.cholesky(_ref_cov_mat)))
+        # the relative matrix has been factorized only once, its inverse is reused for all references
+        self.assertIsNotNone(_err._cov_mat_rel._inverse)
+
     def test_convert_cov_from_cov_rel_wref(self):
         self.assertTrue(np.allclose(self.ge_cov_rel_wref.cov_mat, self.ref_cov_mat, atol=1e-3))
 
@@ -419,6 +435,15 @@ class TestSimpleGaussianError(unittest.TestCase):
                 self.sge_rel_noref.cov_mat_inverse, self.ref_cov_mat_inverse))
         self.assertTrue(np.allclose(self.sge_rel_wref.cov_mat_inverse, self.ref_cov_mat_inverse))
 
+    def test_compare_cov_mat_inverse_new_reference(self):
+        for _new_reference in (2 * self.ref_reference, -self.ref_reference):
+            self.sge_rel_wref.reference = _new_reference
+            _ref_cov_mat = self.ref_cov_mat_rel * np.outer(_new_reference, _new_reference)
+            self.assertTrue(np.allclose(self.sge_rel_wref.cov_mat, _ref_cov_mat))
+            self.assertTrue(np.allclose(self.sge_rel_wref.cov_mat_inverse, np.linalg.inv(_ref_cov_mat)))
+            self.assertTrue(np.allclose(
+                self.sge_rel_wref.cov_mat_uncor + self.sge_rel_wref.cov_mat_cor, _ref_cov_mat))
+
     def test_compare_cov_mat_rel_inverse(self):
         with self.assertRaises(AttributeError):
             self.assertTrue(np.allclose(
@@ -0,0 +1,112 @@
+import unittest2 as unittest
+import numpy as np
+
+from kafe2.fit import HistContainer, HistFit, IndexedFit, UnbinnedFit, XYFit
+from kafe2.fit.histogram.cost import HistCostFunction_Chi2
+from kafe2.fit.tools.bootstrap import Bootstrap, BootstrapException
+
+
+def linear_model(x, a=1.0, b=0.0):
+    return a * x + b
+
+
+def indexed_model(a=1.0):
+    return a * np.arange(5.0)
+
+
+class TestBootstrapXY(unittest.TestCase):
+
+    def setUp(self):
+        _random_state = np.random.RandomState(7)
+        self._x = np.linspace(0.0, 10.0, 20)
+        self._y = 2.0 * self._x + 1.0 + _random_state.normal(0.0, 0.5, size=20)
+        self._fit = XYFit(xy_data=[self._x, self._y], model_function=linear_model)
+        self._fit.add_error('y', 0.5)
+        self._fit.do_fit()
+        self._nominal = np.array(self._fit.parameter_values)
+        self._bootstrap = Bootstrap(self._fit, n_replicates=60)
+
+    def test_replicates(self):
+        _replicates = self._bootstrap.run(seed=1)
+        self.assertEqual(_replicates.shape, (60, 2))
+        self.assertEqual(self._bootstrap.n_failed, 0)
+        self.assertTrue(np.all(np.std(_replicates, axis=0) > 0))
+        self.assertTrue(np.allclose(np.mean(_replicates, axis=0), self._nominal, atol=0.3))
+
+    def test_fit_restored(self):
+        self._bootstrap.run(seed=1)
+        self.assertTrue(np.all(self._fit.data_container.x == self._x))
+        self.assertTrue(np.all(self._fit.data_container.y == self._y))
+        self.assertTrue(np.allclose(self._fit.parameter_values, self._nominal))
+        self.assertTrue(np.allclose(self._fit.y_data_error, 0.5))
+
+    def test_reproducible(self):
+        _replicates = self._bootstrap.run(seed=5)
+        self.assertTrue(np.all(self._bootstrap.run(seed=5) == _replicates))
+        self.assertTrue(np.all(self._bootstrap.run(seed=5, n_jobs=2) == _replicates))
+        self.assertFalse(np.all(self._bootstrap.run(seed=6) == _replicates))
+
+    def test_intervals(self):
+        self._bootstrap.run(seed=1)
+        for _method in ('percentile', 'bca'):
+            _intervals = self._bootstrap.get_intervals(method=_method)
+            self.assertEqual(_intervals.shape, (2, 2))
+            self.assertTrue(np.all(_intervals[:, 0] < self._nominal))
+            self.assertTrue(np.all(_intervals[:, 1] > self._nominal))
+        self.assertTrue(np.all(np.diff(self._bootstrap.get_intervals(cl=0.95), axis=1)
+                               > np.diff(self._bootstrap.get_intervals(cl=0.5), axis=1)))
+
+    def test_raise_no_run(self):
+        with self.assertRaises(BootstrapException):
+            self._bootstrap.get_intervals()
+
+    def test_raise_unknown_method(self):
+        self._bootstrap.run(seed=1)
+        with self.assertRaises(BootstrapException):
+            self._bootstrap.get_intervals(method='jackknife')
+
+    def test_raise_correlated_errors(self):
+        self._fit.add_error('y', 0.1, correlation=0.5)
+        with self.assertRaises(BootstrapException):
+            Bootstrap(self._fit)
+
+    def test_raise_unsupported_fit(self):
+        _fit = IndexedFit(data=np.arange(5.0), model_function=indexed_model)
+        with self.assertRaises(BootstrapException):
+            Bootstrap(_fit)
+
+
+class TestBootstrapHist(unittest.TestCase):
+
+    def setUp(self):
+        _container = HistContainer(10, (-3.0, 3.0))
+        _container.fill(np.random.RandomState(3).normal(0.0, 1.0, size=400))
+        self._data = _container.data.copy()
+        self._fit = HistFit(data=_container)
+        self._bootstrap = Bootstrap(self._fit, n_replicates=30)
+
+    def test_replicates(self):
+        _replicates = self._bootstrap.run(seed=2)
+        self.assertEqual(_replicates.shape, (30, 2))
+        self.assertTrue(np.all(np.std(_replicates, axis=0) > 0))
+        self.assertTrue(np.all(self._fit.data == self._data))
+        self.assertTrue(np.allclose(self._fit.parameter_values, self._bootstrap.nominal_parameter_values))
+
+    def test_raise_weighted(self):
+        _container = HistContainer(5, (0.0, 1.0))
+        _container.fill([0.1, 0.3, 0.5], weights=[1.0, 2.0, 0.5])
+        with self.assertRaises(BootstrapException):
+            Bootstrap(HistFit(data=_container, cost_function=HistCostFunction_Chi2()))
+
+
+class TestBootstrapUnbinned(unittest.TestCase):
+
+    def test_replicates(self):
+        _events = np.random.RandomState(4).normal(0.0, 1.0, size=200)
+        _fit = UnbinnedFit(data=_events)
+        _bootstrap = Bootstrap(_fit, n_replicates=30)
+        _replicates = _bootstrap.run(seed=3)
+        self.assertEqual(_replicates.shape, (30, 2))
+        self.assertTrue(np.all(np.std(_replicates, axis=0) > 0))
+        self.assertTrue(np.all(_fit.data == _events))
+        self.assertTrue(np.all(np.isfinite(_bootstrap.get_intervals(method='bca'))))
@@ -90,11 +90,84 @@ class TestDatastoreHistogram(unittest.TestCase):
             np.allclose(self.hist_cont_binedges_auto.data, self._ref_data_manual_variablespacing)
         )
 
+    def test_fill_underflow_overflow(self):
+        self.hist_cont_binedges_manual_equal.fill(self._ref_entries)
+        self.hist_cont_binedges_manual_equal.fill(0.0)  # lower edge belongs to the first bin
+        self.assertEqual(self.hist_cont_binedges_manual_equal.underflow, 2)
+        self.assertEqual(self.hist_cont_binedges_manual_equal.overflow, 4)  # upper edge is an overflow
+        self.assertEqual(self.hist_cont_binedges_manual_equal.data[0], 1)
+        self.assertEqual(self.hist_cont_binedges_manual_equal.n_entries, len(self._ref_entries) + 1)
+
+    def test_fill_stream_compare_data(self):
+        self.hist_cont_binedges_manual_variable.fill_stream(
+            np.array(self._ref_entries[_i:_i + 3]) for _i in range(0, len(self._ref_entries), 3))
+        self.assertTrue(
+            np.allclose(self.hist_cont_binedges_manual_variable.data, self._ref_data_manual_variablespacing)
+        )
+        self.assertTrue(np.all(self.hist_cont_binedges_manual_variable.raw_data == self._ref_entries))
+
+    def test_raise_rebin_without_raw_data(self):
+        _hc = HistContainer(self._ref_n_bins_auto, self._ref_n_bin_range, store_raw_data=False)
+        _hc.fill_stream([self._ref_entries, self._ref_entries])
+        self.assertTrue(np.allclose(_hc.data, 2 * self._ref_data_auto))
+        with self.assertRaises(HistContainerException):
+            _hc.raw_data
+        with self.assertRaises(HistContainerException):
+            _hc.rebin(self._ref_bin_edges_manual_equalspacing)
+
+    def test_fill_weighted(self):
+        _weights = np.arange(1, len(self._ref_entries) + 1) * 0.5
+        self.hist_cont_binedges_manual_equal.fill(self._ref_entries[:4], weights=_weights[:4])
+        self.hist_cont_binedges_manual_equal.fill(self._ref_entries[4:], weights=_weights[4:])
+        self.hist_cont_binedges_manual_equal.fill(3.5)
+        # 3.3 -> bin 3 (w=1.5), 3.5 -> bin 3 (w=1), 5.5 -> bin 5 (w=2), 2.2 -> bin 2 (w=2.5), 8.5 -> bin 8 (w=3)
+        _ref_data = np.array([0, 0, 2.5, 2.5, 0, 2.0, 0, 0, 3.0, 0])
+        _ref_sum_w2 = np.array([0, 0, 6.25, 3.25, 0, 4.0, 0, 0, 9.0, 0])
+        self.assertTrue(self.hist_cont_binedges_manual_equal.weighted)
+        self.assertTrue(np.allclose(self.hist_cont_binedges_manual_equal.data, _ref_data))
+        self.assertTrue(np.allclose(self.hist_cont_binedges_manual_equal.sum_of_squared_weights, _ref_sum_w2))
+        self.assertTrue(np.allclose(self.hist_cont_binedges_manual_equal.underflow, 1.5))
+        self.assertTrue(np.allclose(self.hist_cont_binedges_manual_equal.err, np.sqrt(_ref_sum_w2)))
+        self.assertTrue(np.allclose(self.hist_cont_binedges_manual_equal.raw_weights[-1], 1.0))
+
+    def test_fill_weighted_rebin(self):
+        self.hist_cont_binedges_auto.fill_stream([self._ref_entries], weight_chunks=[2.0])
+        self.hist_cont_binedges_auto.rebin(self._ref_bin_edges_manual_variablespacing)
+        self.assertTrue(
+            np.allclose(self.hist_cont_binedges_auto.data, 2 * self._ref_data_manual_variablespacing)
+        )
+        self.assertTrue(
+            np.allclose(self.hist_cont_binedges_auto.err, 2 * self._ref_data_manual_variablespacing)
+        )
+
+    def test_raise_fill_wrong_number_of_weights(self):
+        with self.assertRaises(HistContainerException):
+            self.hist_cont_binedges_auto.fill(self._ref_entries, weights=[1.0, 2.0])
+
     def test_manual_bin_height(self):
         self.hist_cont_binedges_manual_equal.set_bins(self._ref_bin_heights_manual)
         self.assertTrue(np.alltrue(self.hist_cont_binedges_manual_equal.data == self._ref_bin_heights_manual))
         self.assertTrue(self.hist_cont_binedges_manual_equal._manual_heights)
 
+    def test_manual_bin_height_weighted(self):
+        _hc = self.hist_cont_binedges_manual_equal
+        _hc.fill(self._ref_entries, weights=2.0)
+        _sum_w2 = 0.25 * self._ref_bin_heights_manual
+        _hc.set_bins(0.5 * self._ref_bin_heights_manual, sum_of_squared_weights=_sum_w2)
+        self.assertTrue(_hc.weighted)
+        self.assertTrue(np.allclose(_hc.sum_of_squared_weights, _sum_w2))
+        self.assertTrue(np.allclose(_hc.err, np.sqrt(_sum_w2)))
+
+    def test_raise_manual_bin_height_weighted_without_sum_of_squared_weights(self):
+        self.hist_cont_binedges_manual_equal.fill(self._ref_entries, weights=2.0)
+        with self.assertRaises(HistContainerException):
+            self.hist_cont_binedges_manual_equal.set_bins(self._ref_bin_heights_manual)
+
+    def test_raise_manual_bin_height_wrong_sum_of_squared_weights(self):
+        with self.assertRaises(HistContainerException):
+            self.hist_cont_binedges_manual_equal.set_bins(self._ref_bin_heights_manual,
+                                                          sum_of_squared_weights=[1.0, 2.0])
+
     def test_construct_bin_edges_variablespacing_withedges(self):
         _hc = HistContainer(self._ref_n_bins_manual, self._ref_n_bin_range, bin_edges=self._probe_bin_edges_variablespacing_withedges)
 
@@ -304,3 +377,44 @@ class TestQuadrature(unittest.TestCase):
         self.assertTrue(np.allclose(
             self._sinus_model_limit_numerical.data, _sinus_model_limit_simpson.data
         ))
+
+    def test_gauss(self):
+        for _bin_evaluation in ("gauss3", "gauss5", "Gauss5_adaptive"):
+            for _model_numerical, _model_gauss in zip(
+                    (self._linear_model_numerical, self._quadratic_model_numerical,
+                     self._quadratic_model_limit_numerical, self._sinus_model_limit_numerical),
+                    TestQuadrature._get_models(_bin_evaluation)):
+                self.assertTrue(np.allclose(_model_numerical.data, _model_gauss.data, rtol=1e-10))
+
+    def test_gauss_adaptive(self):
+        def _narrow_peak(x, mu):
+            return stats.norm(mu, 0.01).pdf(x)
+        _ref = np.diff(stats.norm(0.3, 0.01).cdf(np.linspace(0, 1, 6)))
+        _model_gauss = HistParametricModel(
+            n_bins=5, bin_range=(0, 1), model_density_func=_narrow_peak, model_parameters=[0.3],
+            bin_evaluation="gauss5")
+        _model_adaptive = HistParametricModel(
+            n_bins=5, bin_range=(0, 1), model_density_func=_narrow_peak, model_parameters=[0.3],
+            bin_evaluation="gauss5_adaptive")
+        self.assertFalse(np.allclose(_model_gauss.data, _ref, atol=1e-6))
+        self.assertTrue(np.allclose(_model_adaptive.data, _ref, atol=1e-8))
+
+    def test_gauss_rebin(self):
+        _model = HistParametricModel(
+            n_bins=10, bin_range=(0, 10), model_density_func=quadratic_model,
+            model_parameters=[-0.1, 1.0, 1.0], bin_evaluation="gauss2")
+        _new_bin_edges = np.linspace(0, 10, 21)
+        _model.rebin(_new_bin_edges)
+        # two-point Gauss-Legendre quadrature is exact for polynomials up to degree 3
+        _antider = -0.1 / 3 * _new_bin_edges ** 3 + 0.5 * _new_bin_edges ** 2 + _new_bin_edges
+        self.assertTrue(np.allclose(_model.data, np.diff(_antider)))
+
+    def test_rebin_updates_bin_geometry(self):
+        _new_bin_edges = np.linspace(0, 10, 21)
+        _antider = -0.1 / 3 * _new_bin_edges ** 3 + 0.5 * _new_bin_edges ** 2 + _new_bin_edges
+        for _bin_evaluation, _rtol in (("rectangle", 1e-2), ("trapezoid", 1e-2), ("simpson", 1e-10)):
+            _model = HistParametricModel(
+                n_bins=10, bin_range=(0, 10), model_density_func=quadratic_model,
+                model_parameters=[-0.1, 1.0, 1.0], bin_evaluation=_bin_evaluation)
+            _model.rebin(_new_bin_edges)
+            self.assertTrue(np.allclose(_model.data, np.diff(_antider), rtol=_rtol))
@@ -110,6 +110,27 @@ class TestDatastoreIndexed(unittest.TestCase):
 
         self.assertTrue(np.allclose(_mat, self._ref_cov_mat + self._ref_cov_mat, atol=1e-5))
 
+    def test_compare_ref_total_err_for_toggling_errors_incrementally(self):
+        self.idx_cont.add_error(self._ref_err_abs_valuearray, name='MyNewError', correlation=0.0)
+        self.idx_cont.add_error(self._ref_err_abs_valuearray, name='MyOtherError', correlation=1.0)
+        _ref_uncor = cov_mat_from_float_list(self._ref_err_abs_valuearray, correlation=0.0).mat
+        _ref_cor = cov_mat_from_float_list(self._ref_err_abs_valuearray, correlation=1.0).mat
+        _ = self.idx_cont.get_total_error()
+        _ref_mats = [
+            ('MyOtherError', False, self._ref_cov_mat + _ref_uncor),
+            ('MyNewError', False, self._ref_cov_mat),
+            ('MyOtherError', True, self._ref_cov_mat + _ref_cor),
+            ('MyNewError', True, self._ref_cov_mat + _ref_uncor + _ref_cor),
+        ]
+        for _name, _enabled, _ref_mat in _ref_mats:
+            if _enabled:
+                self.idx_cont.enable_error(_name)
+            else:
+                self.idx_cont.disable_error(_name)
+            # the cached sum is updated instead of being dropped
+            self.assertIn(None, self.idx_cont._total_cov_mats)
+            self.assertTrue(np.allclose(self.idx_cont.cov_mat, _ref_mat, atol=1e-5))
+
     def test_raise_add_same_error_name_twice(self):
         self.idx_cont.add_error(0.1,
                                 name="MyNewError",
@@ -2,7 +2,7 @@ import unittest2 as unittest
 import numpy as np
 
 from kafe2.fit import XYContainer, XYParametricModel
-from kafe2.fit._base import DataContainerException, ModelFunctionBase
+from kafe2.fit._base import DataContainerException, ModelFunctionBase, ModelFunctionException
 from kafe2.fit.xy.container import XYContainerException
 from kafe2.fit.xy.model import XYParametricModelException
 from kafe2.core.error import cov_mat_from_float_list
@@ -211,6 +211,23 @@ class TestDatastoreXYParametricModel(unittest.TestCase):
             )
         )
 
+    def test_deriv_by_x_nonlinear(self):
+        def exp_model(x, a, b):
+            return a * np.exp(b * x)
+        _model = XYParametricModel(x_data=self._ref_x, model_func=exp_model, model_parameters=(1.2, 0.3))
+        _ref = 1.2 * 0.3 * np.exp(0.3 * self._ref_x)
+        self.assertTrue(np.allclose(_model.eval_model_function_derivative_by_x(dx=1e-3), _ref, rtol=1e-5))
+        self.assertTrue(np.allclose(_model.eval_model_function_derivative_by_x(dx=1e-2, order=5), _ref, rtol=1e-8))
+        with self.assertRaises(XYParametricModelException):
+            _model.eval_model_function_derivative_by_x(order=4)
+
+    def test_deriv_by_x_analytic(self):
+        with self.assertRaises(ModelFunctionException):
+            self.xy_param_model._model_function_object.derivative_by_x = 1.0
+        self.xy_param_model._model_function_object.derivative_by_x = lambda x, slope, intercept: -slope
+        self.assertTrue(np.all(self.xy_param_model.eval_model_function_derivative_by_x() == -1.2))
+        self.assertEqual(self.xy_param_model.eval_model_function_derivative_by_x().shape, self._ref_x.shape)
+
     def test_deriv_by_par(self):
         _dp = [self._ref_model_func_deriv_by_pars(x, *self._ref_params) for x in self._ref_x]
         _dp = np.array(_dp).T
@@ -222,6 +239,32 @@ class TestDatastoreXYParametricModel(unittest.TestCase):
         )
 
 
+    def test_deriv_by_par_methods(self):
+        def exp_model(x, a, b):
+            return np.array([a * np.exp(b * _x) for _x in x])  # does not broadcast over parameters
+        _ref = np.array([np.exp(0.3 * self._ref_x), 1.2 * self._ref_x * np.exp(0.3 * self._ref_x)])
+        _model = XYParametricModel(x_data=self._ref_x, model_func=exp_model, model_parameters=(1.2, 0.3))
+        for _method, _rtol in (('forward', 1e-6), ('central', 1e-3), ('complex', 1e-12)):
+            _deriv = _model.eval_model_function_derivative_by_parameters(method=_method)
+            self.assertTrue(np.allclose(_deriv, _ref, rtol=_rtol, atol=1e-12))
+        self.assertTrue(self.xy_param_model.eval_model_function_derivative_by_parameters() is
+                        self.xy_param_model.eval_model_function_derivative_by_parameters())
+        self.assertTrue(self.xy_param_model._model_function_broadcasts)
+        self.assertFalse(_model._model_function_broadcasts)
+        with self.assertRaises(ValueError):
+            _model.eval_model_function_derivative_by_parameters(method='backward')
+
+    def test_model_cache(self):
+        self.xy_param_model.set_model_cache(max_entries=2)
+        for _params in (self._ref_params, self._test_params, self._ref_params, (0.0, 0.0)):
+            self.xy_param_model.parameters = _params
+            self.assertTrue(np.allclose(self.xy_param_model.y, self._ref_model_func(self._ref_x, *_params)))
+        _info = self.xy_param_model.model_cache_info
+        self.assertEqual((_info['hits'], _info['misses'], _info['entries']), (1, 3, 2))
+        self.xy_param_model.x = self._test_x  # changing the support invalidates the cached values
+        self.assertTrue(np.allclose(self.xy_param_model.y, self._ref_model_func(self._test_x, 0.0, 0.0)))
+        self.assertEqual(self.xy_param_model.model_cache_info['misses'], 4)
+
     def test_change_parameters_test_data(self):
         self.xy_param_model.parameters = self._test_params
         self.assertTrue(np.allclose(self.xy_param_model.y, self._ref_data_ref_x_test_params))
@@ -0,0 +1,180 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest2 as unittest
+import numpy as np
+from scipy import sparse
+
+from kafe2.fit import XYFit
+from kafe2.core.contour import ContourFactory
+from kafe2.core.error import CovMat
+from kafe2.fit.tools.contours_profiler import ContoursProfiler, ContoursProfilerException, _update_hash
+
+
+def linear_model(x, a=1.0, b=0.0):
+    return a * x + b
+
+
+class TestContoursProfilerCompute(unittest.TestCase):
+
+    def setUp(self):
+        _x = np.arange(6.0)
+        _y = 2.0 * _x + 1.0 + np.random.RandomState(1).normal(0.0, 0.3, size=6)
+        self._fit = XYFit(xy_data=[_x, _y], model_function=linear_model)
+        self._fit.add_error('y', 0.3)
+        self._fit.do_fit()
+        self._profiler = ContoursProfiler(self._fit, profile_points=10, contour_sigma_values=(1.0,),
+                                          contour_method_kwargs=dict(iterations=2))
+
+    def test_compute_profiles_contours(self):
+        _profiles, _contours = self._profiler.compute_profiles_contours()
+        self.assertEqual(set(_profiles), {'a', 'b'})
+        self.assertEqual(set(_contours), {('a', 'b')})
+        self.assertTrue(np.allclose(_profiles['a'], self._profiler.get_profile('a')))
+        _cl, _contour = _contours[('a', 'b')][0]
+        self.assertEqual(_cl.sigma, 1.0)
+        self.assertTrue(np.allclose(_contour.grid_z, self._profiler.get_contours('a', 'b')[0][1].grid_z))
+
+    def test_compute_profiles_only(self):
+        _profiles, _contours = self._profiler.compute_profiles_contours(parameters=['b'], compute_contours=False)
+        self.assertEqual(set(_profiles), {'b'})
+        self.assertEqual(_contours, {})
+
+    def test_compute_parallel_independent_of_n_jobs(self):
+        _profiles, _contours = self._profiler.compute_profiles_contours()
+        _profiles_parallel, _contours_parallel = self._profiler.compute_profiles_contours(n_jobs=2)
+        for _par_name, _profile in _profiles.items():
+            self.assertTrue(np.array_equal(_profiles_parallel[_par_name], _profile))
+        self.assertTrue(np.array_equal(_contours_parallel[('a', 'b')][0][1].grid_z,
+                                       _contours[('a', 'b')][0][1].grid_z))
+
+    def test_mirrored_contour(self):
+        _contour = self._profiler.get_contours('a', 'b')[0][1]
+        _mirrored = ContoursProfiler._swap_contour_axes(_contour)
+        self.assertTrue(np.array_equal(_mirrored.grid_x, _contour.grid_y))
+        self.assertTrue(np.array_equal(_mirrored.grid_y, _contour.grid_x))
+        self.assertTrue(np.array_equal(_mirrored.grid_z, _contour.grid_z.T))
+        self.assertEqual(_mirrored.sigma, _contour.sigma)
+
+    def test_raise_unknown_parameter(self):
+        with self.assertRaises(ContoursProfilerException):
+            self._profiler.compute_profiles_contours(parameters=['a', 'c'])
+
+    def test_raise_invalid_n_jobs(self):
+        with self.assertRaises(ContoursProfilerException):
+            self._profiler.compute_profiles_contours(n_jobs=0)
+
+
+class TestContoursProfilerCache(unittest.TestCase):
+
+    def setUp(self):
+        _x = np.arange(6.0)
+        _y = 2.0 * _x + 1.0 + np.random.RandomState(1).normal(0.0, 0.3, size=6)
+        self._fit = XYFit(xy_data=[_x, _y], model_function=linear_model)
+        self._fit.add_error('y', 0.3)
+        self._fit.do_fit()
+        self._temp_dir = tempfile.mkdtemp()
+        self._cache_path = os.path.join(self._temp_dir, 'contours.npz')
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def _get_profiler(self, **kwargs):
+        return ContoursProfiler(self._fit, profile_points=10, contour_sigma_values=(1.0,),
+                                contour_method_kwargs=dict(iterations=2), **kwargs)
+
+    def test_results_reused(self):
+        _profiler = self._get_profiler()
+        _profiles, _contours = _profiler.compute_profiles_contours()
+        self.assertIs(_profiler.get_profile('a'), _profiles['a'])
+        self.assertIs(_profiler.get_contours('a', 'b'), _contours[('a', 'b')])
+        _profiles_again, _ = _profiler.compute_profiles_contours()
+        self.assertIs(_profiles_again['b'], _profiles['b'])
+
+    def test_mirrored_contours_from_cache(self):
+        _profiler = self._get_profiler()
+        _contour = _profiler.get_contours('a', 'b')[0][1]
+        self.assertEqual(len(_profiler._cache), 1)
+        _mirrored = _profiler.get_contours('b', 'a')[0][1]
+        self.assertEqual(len(_profiler._cache), 1)
+        self.assertTrue(np.array_equal(_mirrored.grid_z, _contour.grid_z.T))
+
+    def test_changed_fit_recalculated(self):
+        _profiler = self._get_profiler()
+        _profile = _profiler.get_profile('a')
+        self._fit.add_error('y', 0.2)
+        self._fit.do_fit()
+        _profile_new = _profiler.get_profile('a')
+        self.assertIsNot(_profile_new, _profile)
+        # the result for the previous state of the fit has been removed
+        self.assertEqual(len(_profiler._cache), 1)
+        self.assertFalse(np.allclose(_profile_new, _profile))
+
+    def test_hash_matrix_values(self):
+        def _get_hash(value):
+            _hash = hashlib.sha256()
+            _update_hash(_hash, value)
+            return _hash.hexdigest()
+        _sparse_1 = sparse.diags(np.full(6, 0.09), format='csc')
+        _sparse_2 = sparse.diags(np.full(6, 0.1), format='csc')
+        self.assertNotEqual(_get_hash(_sparse_1), _get_hash(_sparse_2))
+        self.assertEqual(_get_hash(_sparse_1), _get_hash(_sparse_1.copy()))
+        self.assertNotEqual(_get_hash(CovMat(_sparse_1)), _get_hash(CovMat(_sparse_2)))
+        self.assertNotEqual(_get_hash(CovMat(np.eye(3))), _get_hash(CovMat(2 * np.eye(3))))
+
+    def test_changed_settings_recalculated(self):
+        _profiler = self._get_profiler()
+        _profile = _profiler.get_profile('a')
+        _profiler._profile_kwargs['bound'] = 3.0
+        self.assertGreater(np.max(_profiler.get_profile('a')[0]), np.max(_profile[0]))
+        self.assertEqual(len(_profiler._cache), 2)
+
+    def test_clear_cache(self):
+        _profiler = self._get_profiler()
+        _profile = _profiler.get_profile('a')
+        _profiler.clear_cache()
+        self.assertIsNot(_profiler.get_profile('a'), _profile)
+
+    def test_cache_file(self):
+        _profiler = self._get_profiler(cache_path=self._cache_path)
+        _profiles, _contours = _profiler.compute_profiles_contours()
+        self.assertTrue(os.path.exists(self._cache_path))
+        _profiler_loaded = self._get_profiler(cache_path=self._cache_path)
+        self.assertEqual(set(_profiler_loaded._cache), set(_profiler._cache))
+        _profiles_loaded, _contours_loaded = _profiler_loaded.compute_profiles_contours()
+        self.assertTrue(np.array_equal(_profiles_loaded['a'], _profiles['a']))
+        _cl, _contour = _contours_loaded[('a', 'b')][0]
+        self.assertEqual(_cl.sigma, 1.0)
+        self.assertTrue(np.array_equal(_contour.grid_z, _contours[('a', 'b')][0][1].grid_z))
+
+    def test_cache_file_pruned(self):
+        _profiler = self._get_profiler(cache_path=self._cache_path)
+        _profiler.compute_profiles_contours()
+        self._fit.add_error('y', 0.2)
+        self._fit.do_fit()
+        _profiler.get_profile('a')
+        _profiler_loaded = self._get_profiler(cache_path=self._cache_path)
+        self.assertEqual(set(_profiler_loaded._cache), set(_profiler._cache))
+        self.assertEqual(len(_profiler_loaded._cache), 1)
+
+    def test_cache_file_written_once(self):
+        _profiler = self._get_profiler(cache_path=self._cache_path)
+        _n_writes = []
+        _save_cache = _profiler._save_cache
+        _profiler._save_cache = lambda: _n_writes.append(1) or _save_cache()
+        _profiler.compute_profiles_contours()
+        self.assertEqual(len(_n_writes), 1)
+        _profiler.compute_profiles_contours()
+        self.assertEqual(len(_n_writes), 1)
+
+    def test_cache_file_xy_contour(self):
+        _profiler = self._get_profiler(cache_path=self._cache_path)
+        _xy_points = np.array([[0.0, 1.0, 0.0], [1.0, 0.0, -1.0]])
+        _profiler._cache['key'] = [(_profiler._contour_kwargs['confidence_levels'][0],
+                                    ContourFactory.create_xy_contour(_xy_points, sigma=1.0))]
+        _profiler._cache['key_none'] = [(_profiler._contour_kwargs['confidence_levels'][0], None)]
+        _profiler._save_cache()
+        _profiler_loaded = self._get_profiler(cache_path=self._cache_path)
+        self.assertTrue(np.array_equal(_profiler_loaded._cache['key'][0][1].xy_points, _xy_points))
+        self.assertIsNone(_profiler_loaded._cache['key_none'][0][1])
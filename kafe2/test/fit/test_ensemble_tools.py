@@ -1,10 +1,11 @@
 import unittest2 as unittest
+import matplotlib.pyplot as plt
 import numpy as np
 import scipy.stats
 
 from kafe2.fit.tools.ensemble import (broadcast_to_shape,
                                      EnsembleVariable, EnsembleVariableProbabilityDistribution,
-                                     EnsembleError)
+                                     EnsembleVariablePlotter, EnsembleError)
 
 
 class TestCustomBroadcast(unittest.TestCase):
@@ -215,3 +216,91 @@ class TestEnsembleVariable(unittest.TestCase):
                 _eval_y_compare
             )
         )
+
+
+class TestEnsembleVariableAccumulation(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(123456)
+        self._ref_array = np.random.gamma(2.0, size=(1000, 5)) + np.arange(5)
+        self._ref_histogram_ranges = np.array([[0.0, 10.0]] * 5)
+
+        self.ev_stored = EnsembleVariable(ensemble_array=self._ref_array,
+                                          histogram_bins=20, histogram_ranges=self._ref_histogram_ranges)
+        self.ev_accumulated = EnsembleVariable(variable_shape=(5,),
+                                               histogram_bins=20, histogram_ranges=self._ref_histogram_ranges)
+        # merge accumulators filled in batches of different size
+        _ev_other = self.ev_accumulated.empty_copy()
+        self.ev_accumulated.add_values(self._ref_array[:300])
+        for _value in self._ref_array[300:310]:
+            _ev_other.set_value(None, _value)
+        _ev_other.add_values(self._ref_array[310:])
+        self.ev_accumulated.merge(_ev_other)
+
+    def test_compare_size(self):
+        self.assertEqual(self.ev_accumulated.size, 1000)
+
+    def test_compare_statistics(self):
+        for _statistic in ('mean', 'std', 'skew', 'kurtosis', 'cov_mat', 'cor_mat'):
+            self.assertTrue(
+                np.allclose(
+                    getattr(self.ev_accumulated, _statistic),
+                    getattr(self.ev_stored, _statistic),
+                    rtol=1e-10
+                )
+            )
+
+    def test_compare_histograms(self):
+        _ref_counts, _ref_edges = np.histogram(self._ref_array[:, 2], bins=20, range=(0.0, 10.0))
+        self.assertTrue(np.array_equal(self.ev_accumulated.histogram_counts[2], _ref_counts))
+        self.assertTrue(np.array_equal(self.ev_accumulated.histogram_counts, self.ev_stored.histogram_counts))
+        self.assertTrue(np.allclose(self.ev_accumulated.histogram_edges[2], _ref_edges))
+
+    def test_raise_values_not_stored(self):
+        with self.assertRaises(EnsembleError):
+            self.ev_accumulated.values
+
+    def test_raise_merge_different_shape(self):
+        with self.assertRaises(EnsembleError):
+            self.ev_accumulated.merge(EnsembleVariable(variable_shape=(4,)))
+
+
+class TestEnsembleVariableProbabilityDistributionDiscrete(unittest.TestCase):
+
+    def setUp(self):
+        self._ref_mu = np.array([1.0, 2.5, 4.0])
+        self.dist = EnsembleVariableProbabilityDistribution(scipy.stats.poisson, dict(mu=self._ref_mu),
+                                                            variable_shape=(3,))
+
+    def test_compare_eval_pmf_vector_x(self):
+        _x = np.arange(6)
+        self.assertTrue(np.allclose(self.dist.eval(_x), scipy.stats.poisson.pmf(_x, self._ref_mu[:, np.newaxis])))
+
+    def test_compare_eval_pmf_in_shape(self):
+        _x = np.array([[0, 1], [2, 3], [4, 5]])
+        self.assertTrue(np.allclose(self.dist.eval(_x, x_contains_var_shape=True),
+                                    scipy.stats.poisson.pmf(_x, self._ref_mu[:, np.newaxis])))
+
+
+class TestEnsembleVariablePlotter(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(654321)
+        self._ref_array = np.random.normal(size=(500, 4))
+        _ev_stored = EnsembleVariable(ensemble_array=self._ref_array, distribution=scipy.stats.norm,
+                                      distribution_parameters=dict(loc=0, scale=1))
+        _ev_accumulated = EnsembleVariable(variable_shape=(4,), distribution=scipy.stats.norm,
+                                           distribution_parameters=dict(loc=0, scale=1),
+                                           histogram_bins=51, histogram_ranges=(-3, 3))
+        _ev_accumulated.add_values(self._ref_array)
+        self.plotters = [EnsembleVariablePlotter(_ev, value_ranges=(-3, 3)) for _ev in (_ev_stored, _ev_accumulated)]
+
+    def test_compare_plot_hist_counts(self):
+        for _plotter in self.plotters:
+            _fig, _axes = plt.subplots(1, 4)
+            _plotter.plot_hist(np.array(_axes))
+            for _index, _ax in enumerate(_axes):
+                _ref_counts, _ = np.histogram(self._ref_array[:, _index], bins=51, range=(-3, 3))
+                _counts = [_patch.get_height() for _patch in _ax.containers[0]]
+                self.assertTrue(np.array_equal(_counts, _ref_counts))
+            plt.close(_fig)
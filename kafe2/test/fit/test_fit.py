@@ -30,9 +30,9 @@ class AbstractTestFit(object):
                 _attr_2 = getattr(fit_2, _attr)
                 if fit_2_is_double_fit and _attr_2 is not None:
                     if _attr in ["cost_function_value", "parameter_cov_mat"]:
-                        _attr_2 *= 0.5
+                        _attr_2 = _attr_2 * 0.5
                     if _attr in ["parameter_errors"] and fit_2.did_fit:
-                        _attr_2 *= np.sqrt(2)
+                        _attr_2 = _attr_2 * np.sqrt(2)
                 if fit_2_permutation is not None:
                     _attr_2_arr = np.array(_attr_2)
                     if _attr_2_arr.ndim == 1:
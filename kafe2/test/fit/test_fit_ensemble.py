@@ -0,0 +1,345 @@
+import os
+import shutil
+import tempfile
+import unittest2 as unittest
+import numpy as np
+import six
+import matplotlib.pyplot as plt
+from scipy import sparse
+
+from kafe2.core.error import CovMatInverseOperator
+from kafe2.fit.histogram.ensemble import HistFitEnsemble, HistFitEnsembleException
+from kafe2.fit.indexed.ensemble import IndexedFitEnsemble
+from kafe2.fit.unbinned.ensemble import UnbinnedFitEnsemble, UnbinnedFitEnsembleException
+from kafe2.fit.xy.cost import XYCostFunction_NegLogLikelihood
+from kafe2.fit.xy.ensemble import XYFitEnsemble, XYFitEnsembleException, _factorize_cov_mat
+
+
+def linear_model(x, a=1.0, b=0.0):
+    return a * x + b
+
+
+def indexed_linear_model(a=1.0, b=0.0):
+    return a * np.arange(8.0) + b
+
+
+def normal_pdf(x, mu=0.0, sigma=1.0):
+    return np.exp(-0.5 * ((x - mu) / sigma) ** 2) / np.sqrt(2.0 * np.pi) / sigma
+
+
+def exponential_pdf(x, tau=2.0):
+    return np.exp(-x / tau)
+
+
+class TestCovMatFactorization(unittest.TestCase):
+
+    def _assert_factor(self, cov_mat):
+        _factor = _factorize_cov_mat(cov_mat)
+        if _factor.ndim == 1:
+            _factor = np.diag(_factor)
+        self.assertTrue(np.allclose(_factor.dot(_factor.T), cov_mat))
+
+    def test_factorize_diagonal(self):
+        self.assertEqual(_factorize_cov_mat(np.diag([1.0, 4.0, 9.0])).ndim, 1)
+        self._assert_factor(np.diag([1.0, 4.0, 9.0]))
+
+    def test_factorize_positive_definite(self):
+        self._assert_factor(np.array([[2.0, 0.5, 0.1], [0.5, 1.0, 0.2], [0.1, 0.2, 3.0]]))
+
+    def test_factorize_positive_semidefinite(self):
+        # fully correlated errors -> singular matrix, Cholesky decomposition fails
+        self._assert_factor(np.full((3, 3), 0.25))
+
+
+class TestXYFitEnsemble(unittest.TestCase):
+
+    def setUp(self):
+        self._ref_x_support = np.arange(10.0)
+        self._ref_parameters = np.array([1.5, 0.3])
+        self._requested_results = ['parameter_pulls', 'cost', 'y_data']
+
+    def _get_ensemble(self, n_experiments=20, **kwargs):
+        _ensemble = XYFitEnsemble(n_experiments=n_experiments, x_support=self._ref_x_support,
+                                  model_function=linear_model, model_parameters=self._ref_parameters,
+                                  requested_results=self._requested_results, **kwargs)
+        _ensemble.add_error('y', 0.5)
+        _ensemble.add_error('x', 0.1)
+        return _ensemble
+
+    def test_run_pseudodata_varies(self):
+        _ensemble = self._get_ensemble()
+        _ensemble.run(seed=1)
+        _results = _ensemble.get_results()
+        self.assertEqual(_results['parameter_pulls'].shape, (20, 2))
+        self.assertEqual(_results['cost'].shape, (20,))
+        self.assertTrue(np.all(np.std(_results['parameter_pulls'], axis=0) > 0))
+        self.assertTrue(np.all(np.std(_results['y_data'], axis=0) > 0))
+
+    def test_generate_pseudodata_batch_covariance(self):
+        _ensemble = self._get_ensemble()
+        _ensemble.add_error('y', 0.3, correlation=0.5)
+        np.random.seed(0)
+        _x_data, _y_data = _ensemble._generate_pseudodata_batch([None] * 5000)
+        self.assertEqual(_y_data.shape, (5000, 10))
+        self.assertTrue(np.allclose(np.cov(_x_data.T), _ensemble._ref_x_cov_mat, atol=2e-3))
+        # the 'x' errors are projected onto 'y' through the slope of the model
+        _expected_y_cov_mat = _ensemble._ref_y_cov_mat + self._ref_parameters[0] ** 2 * _ensemble._ref_x_cov_mat
+        self.assertTrue(np.allclose(np.cov(_y_data.T), _expected_y_cov_mat, atol=3e-2))
+
+    def test_run_seed_reproducible(self):
+        _ensemble_1 = self._get_ensemble()
+        _ensemble_1.run(seed=42)
+        _ensemble_2 = self._get_ensemble()
+        _ensemble_2.run(seed=42)
+        _ensemble_3 = self._get_ensemble()
+        _ensemble_3.run(seed=43)
+        for _name in self._requested_results:
+            self.assertTrue(np.array_equal(_ensemble_1.get_results()[_name], _ensemble_2.get_results()[_name]))
+        self.assertFalse(np.array_equal(_ensemble_1.get_results()['y_data'], _ensemble_3.get_results()['y_data']))
+
+    def test_run_parallel_independent_of_n_jobs(self):
+        _ensemble_sequential = self._get_ensemble(n_experiments=9)
+        _ensemble_sequential.run(seed=7)
+        _ensemble_parallel = self._get_ensemble(n_experiments=9)
+        _ensemble_parallel.run(n_jobs=2, seed=7)
+        for _name in self._requested_results:
+            self.assertTrue(np.array_equal(_ensemble_sequential.get_results()[_name],
+                                           _ensemble_parallel.get_results()[_name]))
+
+    def test_run_without_storing_results(self):
+        _ensemble_stored = self._get_ensemble()
+        _ensemble_stored.run(seed=5)
+        _ensemble_accumulated = XYFitEnsemble(n_experiments=20, x_support=self._ref_x_support,
+                                              model_function=linear_model, model_parameters=self._ref_parameters,
+                                              requested_results=self._requested_results, store_results=False)
+        _ensemble_accumulated.add_error('y', 0.5)
+        _ensemble_accumulated.add_error('x', 0.1)
+        _ensemble_accumulated.run(n_jobs=2, seed=5)
+        _statistics = ['mean', 'std', 'skew', 'kurtosis', 'cov_mat']
+        _ref_results = _ensemble_stored.get_results_statistics(statistics=_statistics)
+        _results = _ensemble_accumulated.get_results_statistics(statistics=_statistics)
+        for _name in self._requested_results:
+            for _statistic in _statistics:
+                self.assertTrue(np.allclose(_results[_name][_statistic], _ref_results[_name][_statistic],
+                                            rtol=1e-8, atol=1e-12))
+
+    def test_run_storage_resume(self):
+        _ensemble_ref = self._get_ensemble()
+        _ensemble_ref.run(seed=11)
+        _storage_dir = tempfile.mkdtemp()
+        try:
+            _storage_path = os.path.join(_storage_dir, 'ensemble')
+            _ensemble = self._get_ensemble(storage_path=_storage_path)
+            _ensemble._STORAGE_CHUNK_SIZE = 6
+            _write_to_storage = _ensemble._write_to_storage
+
+            # interrupt the run after two chunks have been written
+            def _write_two_chunks(start, chunk_results):
+                if start >= 12:
+                    raise KeyboardInterrupt
+                _write_to_storage(start, chunk_results)
+            _ensemble._write_to_storage = _write_two_chunks
+            with self.assertRaises(KeyboardInterrupt):
+                _ensemble.run(seed=11)
+
+            # partial results can be inspected by a separate ensemble object
+            _ensemble_resumed = self._get_ensemble(storage_path=_storage_path)
+            self.assertEqual(_ensemble_resumed.get_results()['cost'].shape, (12,))
+            with self.assertRaises(XYFitEnsembleException):
+                _ensemble_resumed.run(seed=11)
+            with self.assertRaises(XYFitEnsembleException):
+                _ensemble_resumed.run(seed=12, resume=True)
+            _ensemble_resumed.run(resume=True)
+            for _name in self._requested_results:
+                self.assertTrue(np.array_equal(_ensemble_resumed.get_results()[_name],
+                                               _ensemble_ref.get_results()[_name]))
+            _ref_statistics = _ensemble_ref.get_results_statistics()
+            _statistics = _ensemble_resumed.get_results_statistics()
+            for _name in self._requested_results:
+                for _statistic in ('mean', 'std'):
+                    self.assertTrue(np.allclose(_statistics[_name][_statistic], _ref_statistics[_name][_statistic]))
+
+            # a different configuration cannot be resumed
+            with self.assertRaises(XYFitEnsembleException):
+                self._get_ensemble(n_experiments=21, storage_path=_storage_path).run(resume=True)
+        finally:
+            shutil.rmtree(_storage_dir)
+
+    def test_run_storage_numpy_seed(self):
+        _ensemble_ref = self._get_ensemble()
+        _ensemble_ref.run(seed=11)
+        _storage_dir = tempfile.mkdtemp()
+        try:
+            _storage_path = os.path.join(_storage_dir, 'ensemble')
+            _ensemble = self._get_ensemble(storage_path=_storage_path)
+            _ensemble.run(seed=np.int64(11))
+            for _name in self._requested_results:
+                self.assertTrue(np.array_equal(_ensemble.get_results()[_name], _ensemble_ref.get_results()[_name]))
+            self._get_ensemble(storage_path=_storage_path).run(seed=np.int64(11), resume=True)
+        finally:
+            shutil.rmtree(_storage_dir)
+
+    def test_plot_result_scatter_storage(self):
+        _storage_dir = tempfile.mkdtemp()
+        try:
+            _ensemble = self._get_ensemble(storage_path=os.path.join(_storage_dir, 'ensemble'))
+            _ensemble.run(seed=3)
+            _ensemble.plot_result_scatter(results=['parameter_pulls'])
+        finally:
+            plt.close('all')
+            shutil.rmtree(_storage_dir)
+
+    def test_raise_plot_result_scatter_not_stored(self):
+        _ensemble = self._get_ensemble(store_results=False)
+        _ensemble.run(seed=3)
+        with self.assertRaises(XYFitEnsembleException):
+            _ensemble.plot_result_scatter(results=['parameter_pulls'])
+
+    def test_raise_run_invalid_n_jobs(self):
+        with self.assertRaises(XYFitEnsembleException):
+            self._get_ensemble().run(n_jobs=0)
+
+    def _get_y_error_ensemble(self, **kwargs):
+        _ensemble = XYFitEnsemble(n_experiments=30, x_support=self._ref_x_support,
+                                  model_function=linear_model, model_parameters=self._ref_parameters,
+                                  requested_results=['parameter_pulls', 'cost', 'y_pulls', 'y_model'], **kwargs)
+        _ensemble.add_error('y', 0.5)
+        _ensemble.add_error('y', 0.2, correlation=0.5)
+        return _ensemble
+
+    def test_run_linearized_matches_full(self):
+        # for a linear model, one Gauss-Newton step reaches the minimum
+        _ensemble_full = self._get_y_error_ensemble()
+        _ensemble_full.run(seed=3)
+        _ensemble_linearized = self._get_y_error_ensemble(mode='linearized')
+        _ensemble_linearized.run(seed=3)
+        for _name, _values in six.iteritems(_ensemble_full.get_results()):
+            self.assertTrue(np.allclose(_ensemble_linearized.get_results()[_name], _values, atol=1e-5))
+
+    def test_run_linearized_sparse_cov_mat(self):
+        _cov_mat = sparse.diags([np.full(9, 0.05), np.full(10, 0.25), np.full(9, 0.05)], [-1, 0, 1], format='csc')
+        _ensembles = []
+        for _mode in ('full', 'linearized'):
+            _ensemble = XYFitEnsemble(n_experiments=20, x_support=self._ref_x_support,
+                                      model_function=linear_model, model_parameters=self._ref_parameters,
+                                      requested_results=['parameter_pulls', 'cost'], mode=_mode)
+            _ensemble.add_matrix_error('y', _cov_mat, matrix_type='cov')
+            _ensemble.run(seed=5)
+            _ensembles.append(_ensemble)
+        # the fit provides the inverse as an operator, it is not inverted a second time
+        self.assertIsInstance(_ensembles[1]._lin_weights, CovMatInverseOperator)
+        for _name, _values in six.iteritems(_ensembles[0].get_results()):
+            self.assertTrue(np.allclose(_ensembles[1].get_results()[_name], _values, atol=1e-5))
+
+    def test_run_linearized_refit(self):
+        _ensemble_full = self._get_y_error_ensemble()
+        _ensemble_full.run(seed=4)
+        _ensemble_refit = self._get_y_error_ensemble(mode='linearized', refit_tolerance=0.0)
+        _ensemble_refit.run(seed=4)
+        for _name, _values in six.iteritems(_ensemble_full.get_results()):
+            self.assertTrue(np.array_equal(_ensemble_refit.get_results()[_name], _values))
+
+    def test_raise_unknown_mode(self):
+        with self.assertRaises(XYFitEnsembleException):
+            self._get_ensemble(mode='approximate')
+
+    def test_raise_linearized_not_chi2(self):
+        with self.assertRaises(XYFitEnsembleException):
+            self._get_ensemble(mode='linearized', cost_function=XYCostFunction_NegLogLikelihood('gaussian'))
+
+
+class TestHistFitEnsemble(unittest.TestCase):
+
+    def _get_ensemble(self, **kwargs):
+        return HistFitEnsemble(n_experiments=10, n_bins=8, bin_range=(-3.0, 3.0), model_density_function=normal_pdf,
+                               model_parameters=[0.1, 1.2], n_entries=400,
+                               requested_results=['parameter_pulls', 'cost', 'data'], **kwargs)
+
+    def test_generate_pseudodata_batch_poisson(self):
+        _ensemble = self._get_ensemble()
+        np.random.seed(0)
+        _bin_contents, = _ensemble._generate_pseudodata_batch([None] * 4000)
+        self.assertEqual(_bin_contents.shape, (4000, 8))
+        self.assertTrue(np.allclose(np.mean(_bin_contents, axis=0), _ensemble._ref_data, rtol=0.05))
+        self.assertTrue(np.allclose(np.var(_bin_contents, axis=0), _ensemble._ref_data, rtol=0.1))
+
+    def test_generate_pseudodata_batch_multinomial(self):
+        _ensemble = self._get_ensemble(sampling='multinomial')
+        np.random.seed(0)
+        _bin_contents, = _ensemble._generate_pseudodata_batch([None] * 4000)
+        self.assertTrue(np.allclose(np.mean(_bin_contents, axis=0), _ensemble._ref_data, rtol=0.05))
+        # only the entries outside of the histogram range fluctuate
+        _n_outside = 400 - np.sum(_bin_contents, axis=1)
+        self.assertTrue(np.all(_n_outside >= 0))
+        self.assertAlmostEqual(np.mean(_n_outside), 400 - np.sum(_ensemble._ref_data), delta=0.2)
+
+    def test_run(self):
+        _ensemble = self._get_ensemble()
+        _ensemble.run(seed=1)
+        _results = _ensemble.get_results()
+        self.assertEqual(_results['parameter_pulls'].shape, (10, 2))
+        self.assertTrue(np.all(np.std(_results['data'], axis=0) > 0))
+        self.assertTrue(np.all(np.std(_results['parameter_pulls'], axis=0) > 0))
+
+    def test_raise_unknown_sampling(self):
+        with self.assertRaises(HistFitEnsembleException):
+            self._get_ensemble(sampling='gaussian')
+
+
+class TestIndexedFitEnsemble(unittest.TestCase):
+
+    def test_generate_pseudodata_batch_covariance(self):
+        _ensemble = IndexedFitEnsemble(n_experiments=10, model_function=indexed_linear_model,
+                                       model_parameters=[1.0, 0.5])
+        _ensemble.add_error(0.3, correlation=0.5)
+        np.random.seed(0)
+        _data, = _ensemble._generate_pseudodata_batch([None] * 5000)
+        self.assertEqual(_data.shape, (5000, 8))
+        self.assertTrue(np.allclose(np.cov(_data.T), _ensemble._ref_cov_mat, atol=5e-3))
+
+    def test_run_seed_reproducible(self):
+        _results = []
+        for _ in range(2):
+            _ensemble = IndexedFitEnsemble(n_experiments=10, model_function=indexed_linear_model,
+                                           model_parameters=[1.0, 0.5])
+            _ensemble.add_error(0.3)
+            _ensemble.run(seed=3)
+            _results.append(_ensemble.get_results())
+        for _name in ('data_pulls', 'parameter_pulls', 'cost'):
+            self.assertTrue(np.array_equal(_results[0][_name], _results[1][_name]))
+        self.assertTrue(np.all(np.std(_results[0]['parameter_pulls'], axis=0) > 0))
+
+
+class TestUnbinnedFitEnsemble(unittest.TestCase):
+
+    def _assert_events_distributed(self, generation):
+        _ensemble = UnbinnedFitEnsemble(n_experiments=10, n_events=500, data_range=(0.0, 5.0),
+                                        model_density_function=exponential_pdf, model_parameters=[2.0],
+                                        generation=generation, normalization='numerical')
+        np.random.seed(0)
+        _events, = _ensemble._generate_pseudodata_batch([None] * 20)
+        self.assertEqual(_events.shape, (20, 500))
+        self.assertTrue(np.all((_events >= 0.0) & (_events <= 5.0)))
+        # mean of the truncated exponential distribution
+        self.assertAlmostEqual(np.mean(_events), 2.0 - 5.0 / (np.exp(2.5) - 1.0), delta=0.03)
+
+    def test_generate_events_inverse_cdf(self):
+        self._assert_events_distributed('inverse_cdf')
+
+    def test_generate_events_accept_reject(self):
+        self._assert_events_distributed('accept_reject')
+
+    def test_run(self):
+        _ensemble = UnbinnedFitEnsemble(n_experiments=10, n_events=200, data_range=(0.0, 5.0),
+                                        model_density_function=exponential_pdf, model_parameters=[2.0],
+                                        normalization='numerical')
+        _ensemble.run(seed=2)
+        _pulls = _ensemble.get_results()['parameter_pulls']
+        self.assertEqual(_pulls.shape, (10, 1))
+        self.assertGreater(np.std(_pulls), 0)
+
+    def test_raise_unknown_generation(self):
+        with self.assertRaises(UnbinnedFitEnsembleException):
+            UnbinnedFitEnsemble(n_experiments=10, n_events=200, data_range=(0.0, 5.0),
+                                model_density_function=exponential_pdf, model_parameters=[2.0],
+                                generation='importance')
@@ -1,4 +1,6 @@
 import abc
+import os
+import tempfile
 import unittest2 as unittest
 import numpy as np
 import six
@@ -72,7 +74,7 @@ class TestUnbinnedFitBasicInterface(AbstractTestFit, unittest.TestCase):
             model=self._ref_initial_model,
         )
 
-    def _get_fit(self, model_density_function=None, cost_function=None):
+    def _get_fit(self, model_density_function=None, cost_function=None, data=None, **kwargs):
         '''convenience'''
 
         model_density_function = model_density_function or unbinned_model_density
@@ -81,10 +83,11 @@ class TestUnbinnedFitBasicInterface(AbstractTestFit, unittest.TestCase):
         cost_function = cost_function or UnbinnedCostFunction_NegLogLikelihood()
 
         _fit = UnbinnedFit(
-            data=self._ref_cont,
+            data=data if data is not None else self._ref_cont,
             model_density_function=model_density_function,
             cost_function=cost_function,
-            minimizer=self.MINIMIZER
+            minimizer=self.MINIMIZER,
+            **kwargs
         )
 
         return _fit
@@ -93,6 +96,8 @@ class TestUnbinnedFitBasicInterface(AbstractTestFit, unittest.TestCase):
         return {
             'default': \
                 self._get_fit(),
+            'chunked': \
+                self._get_fit(chunk_size=7, n_workers=3),
         }
 
     def test_initial_state(self):
@@ -109,11 +114,127 @@ class TestUnbinnedFitBasicInterface(AbstractTestFit, unittest.TestCase):
                 did_fit=True,
                 cost_function_value=np.float64(self._nominal_fit_result_cost),
             ),
-            fit_names=['default'],
+            fit_names=['default', 'chunked'],
             call_before_fit=lambda f: f.do_fit(),
             rtol=1e-2
         )
 
+    def test_chunked_thread_pool_reused(self):
+        _fit = self._get_fit(chunk_size=7, n_workers=3)
+        _fit.do_fit()
+        _model = _fit._param_model
+        _pool = _model._thread_pool
+        self.assertIsNotNone(_pool)
+        _model.eval_total_log_likelihood(chunk_size=7, n_workers=3)
+        self.assertIs(_model._thread_pool, _pool)
+        _model.eval_total_log_likelihood(chunk_size=7, n_workers=2)
+        self.assertIsNot(_model._thread_pool, _pool)
+        # the replaced pool has been shut down
+        self.assertTrue(all(not _thread.is_alive() for _thread in _pool._pool))
+
+    def test_binned_approximation(self):
+        _fit_binned = self._get_fit(approximate='binned', n_bins=200)
+        _fit_polished = self._get_fit(approximate='binned', n_bins=200, polish=True)
+        for _fit, _rtol in ((_fit_binned, 1e-2), (_fit_polished, 1e-3)):
+            _fit.do_fit()
+            self._assert_fit_properties(
+                _fit,
+                dict(
+                    parameter_values=self._nominal_fit_result_pars,
+                    cost_function_value=np.float64(self._nominal_fit_result_cost),
+                ),
+                rtol=_rtol
+            )
+        _bias = _fit_binned.estimate_approximation_bias(subsample_size=50, seed=0)
+        self.assertEqual(_bias.shape, self._nominal_fit_result_pars.shape)
+        self.assertTrue(np.all(np.abs(_bias) < _fit_binned.parameter_errors))
+
+    def test_approximation_bias_subsample_fit_settings(self):
+        _fit = self._get_fit(approximate='binned', n_bins=200, chunk_size=16)
+        _fit.add_parameter_constraint('tau', 2.2, 0.1)
+        _fit.fix_parameter('fbg', 0.1)
+        for _approximate in (None, 'binned'):
+            _subsample_fit = _fit._get_subsample_fit(self._ref_data[:50], _approximate)
+            self.assertEqual(_subsample_fit.parameter_constraints, _fit.parameter_constraints)
+            self.assertEqual(_subsample_fit._chunk_size, 16)
+            self.assertEqual(_subsample_fit._fitter.fixed_parameters, _fit._fitter.fixed_parameters)
+
+    def test_raise_unknown_approximation(self):
+        with self.assertRaises(UnbinnedFitException):
+            self._get_fit(approximate='magical')
+
+    def test_memmap_data(self):
+        _file = tempfile.NamedTemporaryFile(delete=False)
+        _file.close()
+        try:
+            _memmap = np.memmap(_file.name, dtype=float, mode='w+', shape=self._ref_data.shape)
+            _memmap[:] = self._ref_data
+            _memmap.flush()
+            _fit = self._get_fit(data=np.memmap(_file.name, dtype=float, mode='r'), chunk_size=16)
+            self.assertIsInstance(_fit._data_container.data, np.memmap)
+            _fit.do_fit()
+            self._assert_fit_properties(
+                _fit,
+                dict(
+                    parameter_values=self._nominal_fit_result_pars,
+                    cost_function_value=np.float64(self._nominal_fit_result_cost),
+                ),
+                rtol=1e-2
+            )
+            del _fit, _memmap
+        finally:
+            os.remove(_file.name)
+
+    def test_normalization(self):
+        # nominal density with a parameter-dependent scale factor
+        def unnormalized_density(x, tau=2.2, fbg=0.1):
+            return tau ** 2 * unbinned_model_density(x, tau, fbg)
+
+        def unnormalized_antiderivative(x, tau=2.2, fbg=0.1):
+            b = 11.5
+            a = 1.
+            cdf1 = (np.exp(-a / tau) - np.exp(-x / tau)) / (np.exp(-a / tau) - np.exp(-b / tau))
+            cdf2 = (x - a) / (b - a)
+            return tau ** 2 * ((1 - fbg) * cdf1 + fbg * cdf2)
+
+        for _normalization in ('numerical', unnormalized_antiderivative):
+            for _kwargs in (dict(), dict(chunk_size=16)):
+                _fit = self._get_fit(model_density_function=unnormalized_density, normalization=_normalization,
+                                     normalization_range=(1., 11.5), **_kwargs)
+                self._assert_fit_properties(
+                    _fit,
+                    dict(
+                        model=self._ref_initial_model,
+                        cost_function_value=np.float64(self._ref_initial_cost),
+                    ),
+                    rtol=1e-6
+                )
+                _fit.do_fit()
+                self._assert_fit_properties(
+                    _fit,
+                    dict(
+                        parameter_values=self._nominal_fit_result_pars,
+                        cost_function_value=np.float64(self._nominal_fit_result_cost),
+                    ),
+                    rtol=1e-3
+                )
+
+    def test_normalization_cache(self):
+        _fit = self._get_fit(normalization='numerical')
+        _model = _fit._param_model
+        self.assertEqual(_model.normalization_range, (self._ref_data.min(), self._ref_data.max()))
+        _first = _model.eval_normalization([2.2, 0.1])
+        _model._calculate_normalization = lambda model_parameters: 2.0
+        self.assertNotEqual(_first, 2.0)
+        self.assertEqual(_model.eval_normalization([2.3, 0.1]), 2.0)
+        self.assertEqual(_model.eval_normalization([2.2, 0.1]), _first)
+
+    def test_raise_normalization_signature_mismatch(self):
+        def wrong_antiderivative(x, tau=2.2):
+            return -np.exp(-x / tau)
+        with self.assertRaises(ValueError):
+            self._get_fit(normalization=wrong_antiderivative)
+
     def test_update_data(self):
         _fit = self._get_fit()
 
@@ -2,6 +2,7 @@ import abc
 import unittest2 as unittest
 import numpy as np
 import six
+from scipy import sparse
 
 from kafe2.core.minimizers import AVAILABLE_MINIMIZERS
 from kafe2.core.fitters import NexusFitterException
@@ -697,6 +698,22 @@ class TestXYFitWithMatrixErrors(AbstractTestFit, unittest.TestCase):
             rtol=1e-2
         )
 
+    def test_sparse_matrix_error(self):
+        _band = np.eye(self._n_points) + 0.3 * np.eye(self._n_points, k=1) + 0.3 * np.eye(self._n_points, k=-1)
+        _fit_dense = self._get_fit(errors=[dict(axis='y', err_matrix=_band, matrix_type='cov')])
+        _fit_sparse = self._get_fit(errors=[
+            dict(axis='y', err_matrix=sparse.csr_matrix(_band), matrix_type='cov'),
+            dict(axis='x', err_matrix=sparse.identity(self._n_points) * 0.01, matrix_type='cov')
+        ])
+        _fit_dense.add_matrix_error(axis='x', err_matrix=np.eye(self._n_points) * 0.01, matrix_type='cov')
+        self.assertTrue(sparse.issparse(_fit_sparse.y_model_cov_mat))
+        _fit_dense.do_fit()
+        _fit_sparse.do_fit()
+        self.assertTrue(sparse.issparse(_fit_sparse.total_cov_mat))
+        self.assertTrue(np.allclose(_fit_sparse.total_cov_mat.toarray(), _fit_dense.total_cov_mat))
+        self.assertTrue(np.allclose(_fit_sparse.parameter_values, _fit_dense.parameter_values, rtol=1e-3))
+        self.assertTrue(np.allclose(_fit_sparse.cost_function_value, _fit_dense.cost_function_value, rtol=1e-3))
+
     def test_get_matching_error_all(self):
         _fit = self._get_test_fits()['named_errors']
         for _mc in (None, dict()):
@@ -721,6 +721,22 @@ class TestHistContainerYamlRepresentation(unittest.TestCase):
             set(_read_container._error_dicts.keys())
         )
 
+    def test_round_trip_with_stringstream_weighted(self):
+        self._container.fill([1.5, 7.5, 12.0], weights=[0.5, 2.0, 1.5])
+        self._roundtrip_streamwriter.write()
+        self._roundtrip_stringstream.seek(0)  # return to beginning
+        _read_container = self._roundtrip_streamreader.read()
+        self.assertTrue(_read_container.weighted)
+        self.assertTrue(np.allclose(self._container.data, _read_container.data))
+        self.assertTrue(np.allclose(self._container.overflow, _read_container.overflow))
+        self.assertTrue(np.allclose(self._container.sum_of_squared_weights,
+                                    _read_container.sum_of_squared_weights))
+        self.assertTrue(np.allclose(self._container.cov_mat, _read_container.cov_mat))
+        self.assertEqual(
+            set(self._container._error_dicts.keys()),
+            set(_read_container._error_dicts.keys())
+        )
+
     def test_round_trip_with_stringstream_manual_heights(self):
         self._container.set_bins(
             self._container.data, self._container.underflow, self._container.overflow)
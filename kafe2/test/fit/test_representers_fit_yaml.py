@@ -15,6 +15,14 @@ from kafe2.fit.histogram.container import HistContainer
 from kafe2.fit.representation._yaml_base import YamlReaderException
 
 
+def unnormalized_exponential(x, tau=2.0):
+    return np.exp(-x / tau)
+
+
+def unnormalized_exponential_antiderivative(x, tau=2.0):
+    return -tau * np.exp(-x / tau)
+
+
 @six.add_metaclass(abc.ABCMeta)
 class AbstractTestFitRepresenter(object):
     FIT_CLASS = None
@@ -865,3 +873,31 @@ class TestUnbinnedFitYamlRepresenter(unittest.TestCase, AbstractTestFitRepresent
         self.assertTrue(np.allclose(self._test_parameters_default, _read_fit.parameter_values))
         _read_fit.do_fit()
         self.assertTrue(np.allclose(self._test_parameters_do_fit, _read_fit.parameter_values))
+
+    def _round_trip(self, fit):
+        _stringstream = IOStreamHandle(StringIO())
+        FitYamlWriter(fit, _stringstream).write()
+        _stringstream.seek(0)
+        return FitYamlReader(_stringstream).read()
+
+    def test_round_trip_normalization(self):
+        _data = np.random.RandomState(0).exponential(2.5, size=200)
+        for _normalization in ('numerical', unnormalized_exponential_antiderivative):
+            _fit = UnbinnedFit(data=_data, model_density_function=unnormalized_exponential,
+                               normalization=_normalization, normalization_range=(0.0, 30.0))
+            _read_fit = self._round_trip(_fit)
+            self.assertEqual(_read_fit._param_model.fixed_normalization_range, [0.0, 30.0])
+            self.assertTrue(callable(_read_fit._param_model.normalization) or _normalization == 'numerical')
+            _fit.do_fit()
+            _read_fit.do_fit()
+            self.assertTrue(np.allclose(_read_fit.parameter_values, _fit.parameter_values, rtol=1e-5))
+
+    def test_round_trip_large_sample_options(self):
+        _fit = UnbinnedFit(data=self._test_data, chunk_size=16, n_workers=2,
+                           approximate='binned', n_bins=20, polish=True)
+        _read_fit = self._round_trip(_fit)
+        self.assertEqual(_read_fit._chunk_size, 16)
+        self.assertEqual(_read_fit._n_workers, 2)
+        self.assertEqual(_read_fit._approximate, 'binned')
+        self.assertEqual(_read_fit._n_bins, 20)
+        self.assertTrue(_read_fit._polish)
@@ -21,6 +21,21 @@ def numpy_print_options(*args, **kwargs):
         np.set_printoptions(**_saved_options)
 
 
+def read_only_view(array):
+    """Get a read-only view of a :py:obj:`numpy.ndarray` without copying it.
+    Call ``copy()`` on the result to get a writable array.
+
+    :param array: the array or :py:obj:`None`
+    :type array: numpy.ndarray or None
+    :rtype: numpy.ndarray or None
+    """
+    if array is None:
+        return None
+    _view = np.asarray(array).view()
+    _view.setflags(write=False)
+    return _view
+
+
 _ALPHANUMERIC = np.array(list(ascii_letters) + list("0123456789"))
 def random_alphanumeric(size):
     return "".join(np.random.choice(_ALPHANUMERIC, size=size))
@@ -53,7 +68,8 @@ def print_dict_as_table(dct, output_stream=sys.stdout, sep='  ', cell_format='%.
     _indent_prefix = indent_char * indent_width * indent_level
 
     _column_heads = list(dct.keys())
-    _column_arrays = list(dct.values())
+    # copy arrays, formatting is done in place and they may be read-only
+    _column_arrays = [np.array(_col) if isinstance(_col, np.ndarray) else _col for _col in dct.values()]
 
     # apply formatting to (numeric) cell contents
     for _icol, _col in enumerate(_column_arrays):